@@ -1,14 +1,24 @@
+import logging
+
 from flask import Flask
 from flasgger import Swagger  # NEW, added swagger
 
 from .config import load_config
-from .extensions import cors, build_repo, build_db
+from .extensions import (
+    cors, build_repo, build_db, build_events, build_indicators, build_jobs, build_metrics,
+    build_profiler,
+)
 from .api import register_blueprints
+from .services.json_provider import PROVIDERS
 
 
 def create_app():
     app = Flask(__name__)
     load_config(app)
+    # no-op when the server (or a test runner) already configured logging
+    logging.basicConfig(format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    logging.getLogger("app").setLevel(app.config["LOG_LEVEL"])
+    app.json = PROVIDERS.get(app.config["JSON_PROVIDER"], PROVIDERS["fast"])(app)
 
     cors.init_app(
         app,
@@ -16,12 +26,18 @@ def create_app():
             r"/api/*": {"origins": app.config["CORS_ORIGINS_LIST"]},
             r"/health/*": {"origins": app.config["CORS_ORIGINS_LIST"]},
         },
+        expose_headers=["X-Next-Cursor", "Link", "Location", "X-Truncated"],
     )
 
     # Custom extensions registry
     app.extensions = getattr(app, "extensions", {})
     app.extensions["repo"] = build_repo(app.config)
-    app.extensions["db"] = build_db(app.config)
+    app.extensions["metrics"] = build_metrics(app.config)
+    app.extensions["profiler"] = build_profiler(app.config)
+    app.extensions["db"] = build_db(app.config, app.extensions["metrics"])
+    app.extensions["indicators"] = build_indicators(app.config)
+    app.extensions["events"] = build_events(app.config)
+    app.extensions["jobs"] = build_jobs(app.config)
 
     # --- Swagger setup ---
     swagger_template = {
@@ -0,0 +1,83 @@
+"""
+Optional async (ASGI) serving mode.
+
+create_asgi_app() builds a Quart app that serves the /api/stocks read
+endpoints as coroutines on an async Postgres pool (see aio.database). Any
+request it has no route for is handed to ``fallback``, normally the
+regular Flask app wrapped as ASGI, so uploads, datasets, health and the
+other endpoints keep working unchanged. See asgi.py for how it is served.
+"""
+
+from quart import Quart, jsonify
+from quart_cors import cors
+from werkzeug.exceptions import HTTPException
+
+from ..api.params import InvalidParam
+from ..config import load_config
+from ..services.json_provider import PROVIDERS
+from .database import AsyncDatabase
+from .stocks import bp as stocks_bp
+
+
+class _Dispatcher:
+    """ASGI app that routes requests Quart can match to it, the rest to ``fallback``."""
+
+    def __init__(self, app, fallback):
+        self.app = app
+        self.fallback = fallback
+        self._urls = app.url_map.bind("localhost")
+
+    def _matches(self, scope):
+        try:
+            self._urls.match(scope["path"], method=scope.get("method", "GET"))
+            return True
+        except HTTPException:
+            return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not self._matches(scope):
+            return await self.fallback(scope, receive, send)
+        # lifespan events go to Quart so the pool is opened and closed
+        return await self.app(scope, receive, send)
+
+
+def build_async_db(config):
+    return AsyncDatabase(
+        db_url=config.get("DATABASE_URL"),
+        pool_min_size=config.get("DB_POOL_MIN_SIZE", 1),
+        pool_max_size=config.get("DB_POOL_MAX_SIZE", 10),
+        pool_timeout=config.get("DB_POOL_TIMEOUT", 5.0),
+        pool_max_idle=config.get("DB_POOL_MAX_IDLE", 300.0),
+        pool_max_lifetime=config.get("DB_POOL_MAX_LIFETIME", 1800.0),
+        rollups=config.get("ROLLUPS_ENABLED", False),
+    )
+
+
+def create_asgi_app(fallback=None):
+    app = Quart(__name__)
+    load_config(app)
+    app.json = PROVIDERS.get(app.config["JSON_PROVIDER"], PROVIDERS["fast"])(app)
+    app = cors(
+        app,
+        allow_origin=app.config["CORS_ORIGINS_LIST"],
+        expose_headers=["X-Next-Cursor", "Link", "X-Truncated"],
+    )
+
+    app.extensions["db"] = build_async_db(app.config)
+    app.register_blueprint(stocks_bp, url_prefix="/api")
+
+    @app.errorhandler(InvalidParam)
+    async def invalid_param(e):
+        return jsonify(error=str(e)), 400
+
+    @app.before_serving
+    async def open_pool():
+        await app.extensions["db"].open()
+
+    @app.after_serving
+    async def close_pool():
+        await app.extensions["db"].close()
+
+    if fallback is None:
+        return app
+    return _Dispatcher(app, fallback)
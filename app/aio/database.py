@@ -0,0 +1,99 @@
+"""
+Async counterpart of app.database for the ASGI serving mode.
+
+Runs the same StockQueries SQL on psycopg 3 with an AsyncConnectionPool, so
+a request waiting on Neon does not hold a worker thread, and independent
+queries of one request can run concurrently (each on its own pooled
+connection).
+"""
+
+import logging
+import os
+
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from ..database import StockQueries
+from ..services.resultset import ResultSet
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabase(StockQueries):
+    """Read-only market-data queries on an async Postgres pool"""
+
+    def __init__(
+        self,
+        db_url: str | None = None,
+        pool_min_size: int = 1,
+        pool_max_size: int = 10,
+        pool_timeout: float = 5.0,
+        pool_max_idle: float = 300.0,
+        pool_max_lifetime: float = 1800.0,
+        rollups: bool = False,
+    ):
+        self.db_url = db_url or os.getenv("DATABASE_URL")
+        if not self.db_url:
+            raise ValueError("DATABASE_URL is not set")
+        self.rollups = rollups
+        # opened in the server's event loop by open(), not here
+        self._pool = AsyncConnectionPool(
+            self.db_url,
+            min_size=pool_min_size,
+            max_size=pool_max_size,
+            timeout=pool_timeout,
+            max_idle=pool_max_idle,
+            max_lifetime=pool_max_lifetime,
+            check=AsyncConnectionPool.check_connection,
+            open=False,
+        )
+        self._pool_max_size = pool_max_size
+
+    async def open(self):
+        await self._pool.open()
+        safe = self.db_url.split("@")[-1].split("?")[0]
+        logger.info("Async database pool open (max=%d): %s", self._pool_max_size, safe)
+
+    async def close(self):
+        await self._pool.close()
+
+    def pool_stats(self):
+        return self._pool.get_stats()
+
+    async def _fetch_all(self, sql, params):
+        async with self._pool.connection() as conn:
+            cur = await conn.execute(sql, params)
+            return ResultSet([c.name for c in cur.description], await cur.fetchall())
+
+    async def _fetch_one(self, sql, params):
+        async with self._pool.connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cur:
+                await cur.execute(sql, params)
+                return await cur.fetchone()
+
+    # ============================================
+    # QUERY FUNCTIONS (same arguments as Database)
+    # ============================================
+
+    async def get_all_stocks(self):
+        return await self._fetch_all(*self._all_stocks_query())
+
+    async def get_stock_data(self, ticker, limit=30, start=None, end=None, interval=None):
+        return await self._fetch_all(*self._stock_data_query(ticker, limit, start, end, interval))
+
+    async def get_latest_prediction(self, ticker):
+        return await self._fetch_one(*self._latest_prediction_query(ticker))
+
+    async def get_recent_news(self, ticker, limit=5, before=None):
+        return await self._fetch_all(*self._recent_news_query(ticker, limit, before))
+
+    async def get_stock_data_version(self, ticker, limit=30, start=None, end=None, interval=None):
+        return await self._fetch_one(
+            *self._stock_data_version_query(ticker, limit, start, end, interval)
+        )
+
+    async def get_latest_prediction_version(self, ticker):
+        return await self._fetch_one(*self._latest_prediction_version_query(ticker))
+
+    async def get_recent_news_version(self, ticker, limit=5, before=None):
+        return await self._fetch_one(*self._recent_news_version_query(ticker, limit, before))
@@ -0,0 +1,102 @@
+"""
+Async versions of the /api/stocks read endpoints.
+
+Request parsing, paging and HTTP validators are shared with the WSGI
+blueprint (app.api.stocks / app.api.conditional); only the database calls
+are awaited. Swagger docs live on the WSGI routes.
+"""
+
+import asyncio
+
+from quart import Blueprint, current_app, jsonify, make_response, request
+
+from ..api.conditional import apply_validators, not_modified, validators
+from ..api.stocks import (
+    history_page,
+    news_page_headers,
+    parse_history_args,
+    parse_news_args,
+    parse_overview_args,
+)
+
+bp = Blueprint("aio_stocks", __name__)
+
+
+async def conditional_response(key, version, build):
+    """Async conditional_response: ``build`` is a coroutine function."""
+    etag, last_modified, cache_control = validators(key, version, current_app.config)
+    if not_modified(request, etag, last_modified):
+        resp = await make_response("", 304)
+    else:
+        resp = await make_response(await build())
+        if resp.status_code != 200:
+            return resp
+    return apply_validators(resp, etag, last_modified, cache_control)
+
+
+@bp.get("/stocks")
+async def list_stocks():
+    db = current_app.extensions["db"]
+    return jsonify(await db.get_all_stocks()), 200
+
+
+@bp.get("/stocks/<ticker>/history")
+async def stock_history(ticker):
+    db = current_app.extensions["db"]
+    ticker = ticker.upper()
+    query, max_points = parse_history_args(ticker, request.args, current_app.config)
+    version = await db.get_stock_data_version(ticker, **query)
+
+    async def build():
+        rows = await db.get_stock_data(ticker, **query)
+        rows, headers = history_page(ticker, rows, query["limit"], max_points, request)
+        return jsonify(rows), 200, headers
+
+    return await conditional_response(
+        ("history", ticker, *query.values(), max_points), version, build
+    )
+
+
+@bp.get("/stocks/<ticker>/prediction")
+async def latest_prediction(ticker):
+    db = current_app.extensions["db"]
+    ticker = ticker.upper()
+    version = await db.get_latest_prediction_version(ticker)
+    if not version:
+        return jsonify(error="No prediction found"), 404
+
+    async def build():
+        pred = await db.get_latest_prediction(ticker)
+        if not pred:
+            return jsonify(error="No prediction found"), 404
+        return jsonify(pred), 200
+
+    return await conditional_response(("prediction", ticker), version, build)
+
+
+@bp.get("/stocks/<ticker>/news")
+async def recent_news(ticker):
+    db = current_app.extensions["db"]
+    ticker = ticker.upper()
+    query = parse_news_args(ticker, request.args, current_app.config)
+    version = await db.get_recent_news_version(ticker, **query)
+
+    async def build():
+        rows = await db.get_recent_news(ticker, **query)
+        return jsonify(rows), 200, news_page_headers(ticker, rows, query["limit"], request)
+
+    return await conditional_response(("news", ticker, *query.values()), version, build)
+
+
+@bp.get("/stocks/<ticker>/overview")
+async def stock_overview(ticker):
+    db = current_app.extensions["db"]
+    ticker = ticker.upper()
+    limit, news_limit = parse_overview_args(request.args, current_app.config)
+    # three pooled connections, one round trip of latency instead of three
+    history, prediction, news = await asyncio.gather(
+        db.get_stock_data(ticker, limit=limit),
+        db.get_latest_prediction(ticker),
+        db.get_recent_news(ticker, limit=news_limit),
+    )
+    return jsonify(ticker=ticker, history=history, prediction=prediction, news=news), 200
@@ -1,6 +1,12 @@
+from flask import jsonify
+
 from .health import bp as health_bp
 from .upload import bp as upload_bp
 from .stocks import bp as stocks_bp
+from .datasets import bp as datasets_bp
+from .users import bp as users_bp
+from .metrics import bp as metrics_bp
+from .params import InvalidParam
 
 
 def register_blueprints(app):
@@ -10,8 +16,18 @@ def register_blueprints(app):
       - /api/health
       - /api/upload/csv
       - /api/stocks
+      - /api/datasets
+      - /api/users/<id>/dashboard
+      - /api/metrics (also times every request)
       - (any other future endpoints)
     """
     app.register_blueprint(health_bp, url_prefix="/api")
     app.register_blueprint(upload_bp, url_prefix="/api")
     app.register_blueprint(stocks_bp, url_prefix="/api")
+    app.register_blueprint(datasets_bp, url_prefix="/api")
+    app.register_blueprint(users_bp, url_prefix="/api")
+    app.register_blueprint(metrics_bp, url_prefix="/api")
+
+    @app.errorhandler(InvalidParam)
+    def invalid_param(e):
+        return jsonify(error=str(e)), 400
@@ -0,0 +1,80 @@
+"""
+Conditional GET helpers (ETag / Last-Modified / 304) for polled endpoints.
+
+Endpoints pass a cheap "version" row from one of the Database
+``get_*_version`` methods. The ETag is derived from the version and the
+request parameters, so a matching If-None-Match is answered with 304
+before the real query runs or the JSON body is built.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+
+from flask import current_app, make_response, request
+
+
+def _as_utc(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def make_etag(key, version):
+    """Stable ETag value for a request ``key`` and a version row."""
+    if version is not None:
+        version = sorted(dict(version).items())
+    digest = hashlib.blake2b(repr((key, version)).encode("utf-8"), digest_size=12)
+    return digest.hexdigest()
+
+
+def not_modified(req, etag, last_modified):
+    """True when ``req``'s If-None-Match / If-Modified-Since match."""
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+    if req.if_none_match:
+        return req.if_none_match.contains(etag)
+    if last_modified is not None and req.if_modified_since is not None:
+        return last_modified <= _as_utc(req.if_modified_since)
+    return False
+
+
+def validators(key, version, config):
+    """``(etag, last_modified, cache_control)`` for a request key and version row."""
+    etag = make_etag(key, version)
+    last_modified = _as_utc(version.get("last_modified")) if version else None
+    max_age = config.get("HTTP_CACHE_MAX_AGE", 5)
+    return etag, last_modified, f"public, max-age={max_age}, must-revalidate"
+
+
+def apply_validators(resp, etag, last_modified, cache_control):
+    resp.set_etag(etag)
+    if last_modified is not None:
+        resp.last_modified = last_modified
+    resp.headers["Cache-Control"] = cache_control
+    return resp
+
+
+def conditional_response(key, version, build):
+    """
+    Return 304 when the client's validators match ``version``, otherwise
+    call ``build()`` (which returns the usual ``(body, status)`` tuple) and
+    attach ETag, Last-Modified and Cache-Control headers to a 200 response.
+    """
+    etag, last_modified, cache_control = validators(key, version, current_app.config)
+
+    if not_modified(request, etag, last_modified):
+        resp = make_response("", 304)
+    else:
+        resp = make_response(build())
+        if resp.status_code != 200:
+            return resp
+    return apply_validators(resp, etag, last_modified, cache_control)
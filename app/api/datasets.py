@@ -0,0 +1,133 @@
+from flask import Blueprint, current_app, jsonify, request
+
+from .params import InvalidParam, int_arg, limit_arg, list_arg
+
+bp = Blueprint("datasets", __name__)
+
+
+@bp.get("/datasets")
+def list_datasets():
+    """
+    List uploaded datasets
+    ---
+    tags:
+      - Upload
+    summary: Paginated list of stored datasets
+    parameters:
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+      - name: offset
+        in: query
+        type: integer
+        required: false
+        default: 0
+      - name: sort
+        in: query
+        type: string
+        required: false
+        default: created_at
+        enum: [created_at, name, rows, id]
+      - name: order
+        in: query
+        type: string
+        required: false
+        default: desc
+        enum: [asc, desc]
+    responses:
+      200:
+        description: Dataset records (without rows)
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              id:
+                type: string
+                example: "3f2a9c..."
+              name:
+                type: string
+                example: "aapl_history.csv"
+              meta:
+                type: object
+      400:
+        description: Invalid paging or sort parameters
+    """
+    repo = current_app.extensions["repo"]
+    limit = limit_arg(50)
+    offset = int_arg("offset", 0, minimum=0)
+    try:
+        datasets = repo.list_datasets(
+            limit=limit,
+            offset=offset,
+            sort=request.args.get("sort", "created_at"),
+            order=request.args.get("order", "desc"),
+        )
+    except ValueError as e:
+        raise InvalidParam(str(e))
+    return jsonify(datasets), 200
+
+
+@bp.get("/datasets/<dataset_id>/rows")
+def dataset_rows(dataset_id):
+    """
+    Read a page of rows from a stored dataset
+    ---
+    tags:
+      - Upload
+    summary: Random-access row reads (cost does not grow with offset)
+    parameters:
+      - name: dataset_id
+        in: path
+        type: string
+        required: true
+      - name: offset
+        in: query
+        type: integer
+        required: false
+        default: 0
+        description: Index of the first row to return
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 100
+        description: Number of rows to return (capped by MAX_PAGE_SIZE)
+      - name: columns
+        in: query
+        type: string
+        required: false
+        description: Comma-separated column names to return (default all)
+    responses:
+      200:
+        description: Requested rows
+        schema:
+          type: object
+          properties:
+            rows:
+              type: array
+              items:
+                type: object
+            offset:
+              type: integer
+              example: 1000000
+            limit:
+              type: integer
+              example: 100
+            total:
+              type: integer
+              example: 5000000
+      400:
+        description: Invalid offset/limit
+      404:
+        description: Dataset not found
+    """
+    repo = current_app.extensions["repo"]
+    offset = int_arg("offset", 0, minimum=0)
+    limit = limit_arg(100)
+    page = repo.get_rows(dataset_id, offset=offset, limit=limit, columns=list_arg("columns"))
+    if page is None:
+        return jsonify(error="Dataset not found"), 404
+    return jsonify(page), 200
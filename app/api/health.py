@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, current_app, jsonify
 
 bp = Blueprint("health", __name__)
 
@@ -25,3 +25,169 @@ def health():
               example: feather-backend
     """
     return jsonify(status="ok", service="feather-backend"), 200
+
+
+@bp.get("/health/pool")
+def pool_health():
+    """
+    Database connection pool statistics
+    ---
+    tags:
+      - Internal
+    summary: Connection pool usage for this worker process
+    responses:
+      200:
+        description: Pool statistics (pooled is false when pooling is disabled)
+        schema:
+          type: object
+          properties:
+            pooled:
+              type: boolean
+              example: true
+            stats:
+              type: object
+              properties:
+                in_use:
+                  type: integer
+                  example: 2
+                idle:
+                  type: integer
+                  example: 3
+                checkouts:
+                  type: integer
+                  example: 1532
+                wait_time_avg:
+                  type: number
+                  example: 0.0004
+    """
+    stats = current_app.extensions["db"].pool_stats()
+    return jsonify(pooled=stats is not None, stats=stats), 200
+
+
+@bp.get("/health/queries")
+def query_health():
+    """
+    Per-query execution statistics
+    ---
+    tags:
+      - Internal
+    summary: Calls and database time per read query in this worker
+    description: >
+      Time is measured around statement execution (including the round
+      trip), not result decoding. prepared_calls counts calls that ran as a
+      prepared statement (DB_PREPARED_STATEMENTS).
+    responses:
+      200:
+        description: Statistics keyed by Database method, largest total_ms first
+        schema:
+          type: object
+          properties:
+            prepare:
+              type: boolean
+              example: true
+            statements:
+              type: integer
+              description: Distinct SQL texts prepared so far
+              example: 9
+            queries:
+              type: object
+              additionalProperties:
+                type: object
+                properties:
+                  calls:
+                    type: integer
+                    example: 5120
+                  prepared_calls:
+                    type: integer
+                    example: 5120
+                  total_ms:
+                    type: number
+                    example: 7020.5
+                  mean_ms:
+                    type: number
+                    example: 1.371
+                  max_ms:
+                    type: number
+                    example: 48.2
+    """
+    return jsonify(current_app.extensions["db"].query_stats()), 200
+
+
+@bp.get("/health/cache")
+def cache_health():
+    """
+    Query cache statistics
+    ---
+    tags:
+      - Internal
+    summary: Hit/miss/eviction counters of this worker's query cache
+    responses:
+      200:
+        description: Cache statistics (enabled is false when caching is off)
+        schema:
+          type: object
+          properties:
+            enabled:
+              type: boolean
+              example: true
+            stats:
+              type: object
+              properties:
+                hits:
+                  type: integer
+                  example: 9120
+                misses:
+                  type: integer
+                  example: 311
+                evictions:
+                  type: integer
+                  example: 0
+                entries:
+                  type: integer
+                  example: 87
+                rows:
+                  type: integer
+                  description: Rows held across all entries (bounded by max_rows)
+                  example: 4210
+    """
+    db = current_app.extensions["db"]
+    stats = db.cache_stats() if hasattr(db, "cache_stats") else None
+    return jsonify(enabled=stats is not None, stats=stats), 200
+
+
+@bp.get("/health/repo")
+def repo_health():
+    """
+    Dataset repository memory usage
+    ---
+    tags:
+      - Internal
+    summary: Memory held by the in-memory dataset repository of this worker
+    responses:
+      200:
+        description: Usage (tracked is false for repositories that do not report it)
+        schema:
+          type: object
+          properties:
+            tracked:
+              type: boolean
+              example: true
+            usage:
+              type: object
+              properties:
+                bytes:
+                  type: integer
+                  example: 52428800
+                max_bytes:
+                  type: integer
+                  example: 268435456
+                datasets:
+                  type: integer
+                  example: 12
+                evictions:
+                  type: integer
+                  example: 3
+    """
+    repo = current_app.extensions["repo"]
+    usage = repo.memory_usage() if hasattr(repo, "memory_usage") else None
+    return jsonify(tracked=usage is not None, usage=usage), 200
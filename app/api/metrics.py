@@ -0,0 +1,85 @@
+import logging
+import time
+
+from flask import Blueprint, Response, abort, current_app, g, request
+
+bp = Blueprint("metrics", __name__)
+logger = logging.getLogger(__name__)
+
+
+def _route():
+    """URL rule of the request (``/api/stocks/<ticker>/history``), bounded cardinality."""
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+@bp.before_app_request
+def start_timer():
+    g.request_started = time.perf_counter()
+    profiler = current_app.extensions.get("profiler")
+    if profiler is not None:
+        g.profile_token = profiler.begin()
+
+
+@bp.after_app_request
+def record_request(response):
+    metrics = current_app.extensions.get("metrics")
+    started = g.get("request_started")
+    if metrics is None or started is None:
+        return response
+    route = _route()
+    metrics.http_requests.inc(request.method, route, response.status_code)
+    metrics.http_latency.observe(request.method, route, value=time.perf_counter() - started)
+    if request.content_length:
+        metrics.request_bytes.observe(route, value=request.content_length)
+    if not response.is_streamed and response.content_length is not None:
+        metrics.response_bytes.observe(route, value=response.content_length)
+    return response
+
+
+@bp.teardown_app_request
+def stop_profiler(exc):
+    token = g.pop("profile_token", None)
+    if token is None:
+        return
+    seconds = time.perf_counter() - g.request_started
+    path = current_app.extensions["profiler"].end(token, seconds, request.endpoint or "unmatched")
+    if path is not None:
+        logger.warning("Slow request %s %s (%.0f ms), profile: %s",
+                       request.method, request.path, seconds * 1000, path)
+
+
+@bp.get("/metrics")
+def metrics():
+    """
+    Prometheus metrics
+    ---
+    tags:
+      - Internal
+    summary: Request, query and connection metrics of this worker (Prometheus text format)
+    description: >
+      feather_http_* series are labelled by method, URL rule and status;
+      feather_db_* series by Database method. Values are per worker process.
+      Disabled (404) with METRICS_ENABLED=false.
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Prometheus text exposition format 0.0.4
+      404:
+        description: Metrics are disabled
+    """
+    metrics = current_app.extensions.get("metrics")
+    if metrics is None:
+        abort(404)
+    db = current_app.extensions["db"]
+    pool = db.pool_stats() if hasattr(db, "pool_stats") else None
+    if pool is not None:
+        for state in ("in_use", "idle"):
+            metrics.pool.set(state, value=pool[state])
+    cache = db.cache_stats() if hasattr(db, "cache_stats") else None
+    if cache is not None:
+        for stat in ("hits", "misses", "evictions", "expirations", "invalidations", "entries",
+                     "rows", "oversized"):
+            if stat in cache:
+                metrics.cache.set(stat, value=cache[stat])
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,91 @@
+"""
+Opaque keyset cursors for paginated endpoints.
+
+A cursor is the sort key of the last row of a page, tagged with the
+endpoint kind and ticker and base64url-encoded. The next page is a seek past
+that key (``WHERE key < cursor``) instead of an OFFSET, so every page costs
+the same. Clients get it back in the ``X-Next-Cursor`` header and a
+``Link: <...>; rel="next"`` header, and pass it as ``?cursor=``.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from urllib.parse import urlencode
+
+from flask import request
+
+from .params import InvalidParam
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _load(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+        raise ValueError("unknown cursor value")
+    return value
+
+
+def encode_cursor(kind, ticker, values):
+    payload = json.dumps([kind, ticker, [_dump(v) for v in values]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def _matches(values, shape):
+    """True when ``values`` has one value per ``shape`` entry, of its type(s)."""
+    if not isinstance(values, list) or len(values) != len(shape):
+        return False
+    # a JSON true/false is not an id
+    return all(
+        isinstance(v, types) and not isinstance(v, bool) for v, types in zip(values, shape)
+    )
+
+
+def cursor_arg(kind, ticker, shape, name="cursor", *, args=None):
+    """
+    Decode ``?cursor=`` for this endpoint and ticker; None when absent.
+
+    ``shape`` lists the type (or tuple of types) of each key value, e.g.
+    ``(datetime,)``; a cursor holding anything else is rejected.
+    """
+    raw = (request.args if args is None else args).get(name)
+    if raw is None or raw == "":
+        return None
+    try:
+        padded = raw + "=" * (-len(raw) % 4)
+        got_kind, got_ticker, values = json.loads(base64.urlsafe_b64decode(padded))
+        if got_kind != kind or got_ticker != ticker:
+            raise ValueError("cursor belongs to another listing")
+        values = [_load(v) for v in values] if isinstance(values, list) else values
+        if not _matches(values, shape):
+            raise ValueError("cursor does not hold this listing's sort key")
+        return values
+    except (ValueError, TypeError):
+        raise InvalidParam(f"{name} is not a valid cursor for this listing")
+
+
+def next_page_headers(cursor, name="cursor", *, req=None):
+    """Response headers pointing at the page after ``cursor`` ({} if None)."""
+    if cursor is None:
+        return {}
+    req = request if req is None else req
+    args = {**req.args.to_dict(), name: cursor}
+    return {
+        "X-Next-Cursor": cursor,
+        "Link": f'<{req.base_url}?{urlencode(args)}>; rel="next"',
+    }
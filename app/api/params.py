@@ -0,0 +1,78 @@
+"""
+Query-string parsing helpers shared by the API blueprints.
+
+Invalid values raise InvalidParam, which register_blueprints turns into a
+``{"error": ...}`` JSON response with status 400. The helpers read Flask's
+``request.args`` unless another mapping is passed as ``args`` (the async
+app passes Quart's).
+"""
+
+from datetime import datetime, timezone
+
+from flask import current_app, request
+
+
+class InvalidParam(ValueError):
+    """A query parameter is missing, malformed or out of range."""
+
+
+def _raw(name, args):
+    return (request.args if args is None else args).get(name)
+
+
+def int_arg(name, default, minimum=None, maximum=None, *, args=None):
+    raw = _raw(name, args)
+    if raw is None or raw == "":
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise InvalidParam(f"{name} must be an integer")
+    if minimum is not None and value < minimum:
+        raise InvalidParam(f"{name} must be >= {minimum}")
+    if maximum is not None and value > maximum:
+        raise InvalidParam(f"{name} must be <= {maximum}")
+    return value
+
+
+def limit_arg(default, name="limit", *, args=None, maximum=None):
+    """Page size, capped by the MAX_PAGE_SIZE setting (or ``maximum``)."""
+    if maximum is None:
+        maximum = current_app.config.get("MAX_PAGE_SIZE", 1000)
+    return int_arg(name, default, minimum=1, maximum=maximum, args=args)
+
+
+def list_arg(name, *, args=None):
+    """Comma-separated list (``?columns=a,b``); None when the parameter is absent."""
+    raw = _raw(name, args)
+    if raw is None:
+        return None
+    return [v.strip() for v in raw.split(",") if v.strip()]
+
+
+def choice_arg(name, choices, default=None, *, args=None):
+    raw = _raw(name, args)
+    if raw is None or raw == "":
+        return default
+    if raw not in choices:
+        raise InvalidParam(f"{name} must be one of {', '.join(choices)}")
+    return raw
+
+
+def datetime_arg(name, *, args=None):
+    """
+    ISO-8601 timestamp (``2025-11-18``, ``2025-11-18T20:00:00Z``) or Unix
+    seconds, returned as an aware UTC datetime; None when absent.
+    """
+    raw = _raw(name, args)
+    if raw is None or raw == "":
+        return None
+    try:
+        if raw.lstrip("-").replace(".", "", 1).isdigit():
+            return datetime.fromtimestamp(float(raw), tz=timezone.utc)
+        value = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except (ValueError, OverflowError, OSError):
+        raise InvalidParam(f"{name} must be an ISO-8601 timestamp or Unix seconds")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
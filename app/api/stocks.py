@@ -1,4 +1,15 @@
-from flask import Blueprint, current_app, jsonify, request
+from datetime import datetime, timezone
+
+from flask import Blueprint, Response, current_app, jsonify, request
+
+from ..database import EXPORT_COLUMNS, INTERVALS
+from ..services import export
+from ..services.downsample import downsample_rows
+from ..services.events import TooManySubscribers, format_sse
+from ..services.indicators import UnknownIndicator, parse_names
+from .conditional import conditional_response
+from .pagination import cursor_arg, encode_cursor, next_page_headers
+from .params import InvalidParam, choice_arg, datetime_arg, int_arg, limit_arg, list_arg
 
 bp = Blueprint("stocks", __name__)
 
@@ -34,6 +45,129 @@ def list_stocks():
     return jsonify(stocks), 200
 
 
+def _tickers_arg():
+    """Deduplicated, upper-cased ``?tickers=`` (required, MAX_BATCH_TICKERS at most)."""
+    tickers = list(dict.fromkeys(t.upper() for t in (list_arg("tickers") or [])))
+    if not tickers:
+        raise InvalidParam("tickers is required")
+    max_tickers = current_app.config.get("MAX_BATCH_TICKERS", 50)
+    if len(tickers) > max_tickers:
+        raise InvalidParam(f"at most {max_tickers} tickers per request")
+    return tickers
+
+
+@bp.get("/stocks/history")
+def batch_history():
+    """
+    Get recent OHLCV history for several tickers at once
+    ---
+    tags:
+      - Stocks
+    summary: Latest price history for a list of tickers in one request
+    parameters:
+      - name: tickers
+        in: query
+        type: string
+        required: true
+        description: Comma-separated ticker symbols, e.g. AAPL,MSFT,NVDA
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 30
+        description: Number of most recent rows to return per ticker
+    responses:
+      200:
+        description: OHLCV rows grouped by ticker (empty list for unknown tickers)
+        schema:
+          type: object
+          additionalProperties:
+            type: array
+            items:
+              type: object
+          example:
+            AAPL: [{"timestamp": "2025-11-18T20:00:00Z", "close": 186.2}]
+            MSFT: []
+      400:
+        description: Missing tickers, too many tickers or invalid limit
+    """
+    db = current_app.extensions["db"]
+    tickers = _tickers_arg()
+    limit = limit_arg(30)
+    return jsonify(db.get_stock_data_batch(tickers, limit=limit)), 200
+
+
+@bp.get("/stocks/stream")
+def stream():
+    """
+    Stream live price, prediction and news updates (Server-Sent Events)
+    ---
+    tags:
+      - Stocks
+    summary: Push updates for a list of tickers as they are written
+    description: >
+      Keeps the connection open and sends one SSE message per change:
+      ``event: price`` (count of new rows and the newest bar), ``event:
+      prediction`` and ``event: news`` (count and the newest row). A client
+      that reads slower than updates arrive receives only the latest event
+      per type and ticker, with ``coalesced`` set to the number it skipped.
+      Idle streams get a comment line every STREAM_HEARTBEAT seconds.
+      Updates missed while disconnected are not replayed; refetch the REST
+      endpoints after reconnecting.
+    produces:
+      - text/event-stream
+    parameters:
+      - name: tickers
+        in: query
+        type: string
+        required: true
+        description: Comma-separated ticker symbols, e.g. AAPL,MSFT,NVDA
+    responses:
+      200:
+        description: >
+          Event stream, e.g.
+          ``event: price`` / ``data: {"type": "price", "ticker": "AAPL",
+          "count": 1, "bar": {...}}``
+      400:
+        description: Missing or too many tickers
+      503:
+        description: >
+          This worker already serves STREAM_MAX_CLIENTS streams, or the
+          database backend (sqlite) has no change notifications
+    """
+    tickers = _tickers_arg()
+    heartbeat = current_app.config.get("STREAM_HEARTBEAT", 15.0)
+    events = current_app.extensions["events"]
+    if events is None:
+        return jsonify(error="live updates need the postgres backend"), 503
+    try:
+        sub = events.subscribe(tickers)
+    except TooManySubscribers as e:
+        return jsonify(error=str(e)), 503, {"Retry-After": "5"}
+
+    def generate():
+        yield f"retry: 3000\n: subscribed to {','.join(sub.tickers)}\n\n"
+        event_id = 0
+        while not sub.closed:
+            events = sub.get(heartbeat)
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            chunk = []
+            for event in events:
+                event_id += 1
+                chunk.append(format_sse(event, event_id))
+            yield "".join(chunk)
+
+    resp = Response(generate(), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    # stop nginx from buffering the stream
+    resp.headers["X-Accel-Buffering"] = "no"
+    # the server closes the response when the client goes away
+    resp.call_on_close(sub.close)
+    return resp
+
+
 @bp.get("/stocks/<ticker>/history")
 def stock_history(ticker):
     """
@@ -53,10 +187,49 @@ def stock_history(ticker):
         type: integer
         required: false
         default: 30
-        description: Number of most recent rows to return
+        description: >
+          Number of most recent rows (or bars, with interval) to return.
+          With max_points it bounds the rows read before downsampling
+          (default and maximum MAX_DOWNSAMPLE_ROWS); only the most recent
+          rows are kept and X-Truncated is set when the range holds more.
+      - name: from
+        in: query
+        type: string
+        required: false
+        description: Inclusive start, ISO-8601 or Unix seconds
+      - name: to
+        in: query
+        type: string
+        required: false
+        description: Exclusive end, ISO-8601 or Unix seconds
+      - name: interval
+        in: query
+        type: string
+        required: false
+        enum: [1m, 5m, 1h, 1d, 1w]
+        description: Resample into OHLCV bars of this size (computed in SQL)
+      - name: max_points
+        in: query
+        type: integer
+        required: false
+        description: >
+          Downsample the result to at most this many points (LTTB on close).
+          With from and no interval, long ranges are first resampled in SQL
+          into the finest interval giving at most 25 bars per point.
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: >
+          Opaque cursor from the X-Next-Cursor header of the previous page
+          (not used with max_points)
     responses:
       200:
-        description: List of OHLCV rows
+        description: >
+          List of OHLCV rows, newest first. When more rows may follow, the
+          X-Next-Cursor and Link (rel="next") headers point at the next page.
+          With max_points, X-Truncated: true means the range was cut to its
+          most recent limit rows before downsampling.
         schema:
           type: array
           items:
@@ -84,11 +257,172 @@ def stock_history(ticker):
               volume:
                 type: number
                 example: 1200345
+      304:
+        description: Not modified (If-None-Match / If-Modified-Since matched)
     """
     db = current_app.extensions["db"]
-    limit = int(request.args.get("limit", 30))
-    rows = db.get_stock_data(ticker.upper(), limit=limit)
-    return jsonify(rows), 200
+    ticker = ticker.upper()
+    query, max_points = parse_history_args(ticker, request.args, current_app.config)
+    version = db.get_stock_data_version(ticker, **query)
+
+    def build():
+        rows = db.get_stock_data(ticker, **query)
+        rows, headers = history_page(ticker, rows, query["limit"], max_points, request)
+        return jsonify(rows), 200, headers
+
+    return conditional_response(("history", ticker, *query.values(), max_points), version, build)
+
+
+@bp.get("/stocks/<ticker>/history/export")
+def export_history(ticker):
+    """
+    Download a ticker's full OHLCV history
+    ---
+    tags:
+      - Stocks
+    summary: Stream every OHLCV row of a ticker as CSV, NDJSON or Parquet
+    description: >
+      Rows are read from a server-side cursor and written out batch by
+      batch, oldest first, so any range can be exported in constant memory.
+      The response is chunked; there is no Content-Length.
+    produces:
+      - text/csv
+      - application/x-ndjson
+      - application/vnd.apache.parquet
+      - application/gzip
+    parameters:
+      - name: ticker
+        in: path
+        type: string
+        required: true
+        description: Stock ticker symbol, e.g. AAPL
+      - name: format
+        in: query
+        type: string
+        required: false
+        enum: [csv, ndjson, parquet]
+        default: csv
+        description: Output format (parquet needs pyarrow on the server)
+      - name: compress
+        in: query
+        type: string
+        required: false
+        enum: [none, gzip]
+        default: none
+        description: Gzip the file on the fly (adds .gz to the file name)
+      - name: from
+        in: query
+        type: string
+        required: false
+        description: Inclusive start, ISO-8601 or Unix seconds
+      - name: to
+        in: query
+        type: string
+        required: false
+        description: Exclusive end, ISO-8601 or Unix seconds
+      - name: itersize
+        in: query
+        type: integer
+        required: false
+        description: >
+          Rows fetched from the database (and written out) per batch
+          (default EXPORT_ITERSIZE)
+    responses:
+      200:
+        description: >
+          The file, as an attachment named <TICKER>_history.<format>[.gz].
+          Columns: ticker, timestamp, open, high, low, close, volume.
+      400:
+        description: Invalid parameter, or parquet requested without pyarrow installed
+    """
+    db = current_app.extensions["db"]
+    ticker = ticker.upper()
+    fmt = choice_arg("format", list(export.FORMATS), default="csv")
+    compress = choice_arg("compress", ["none", "gzip"], default="none")
+    start = datetime_arg("from")
+    end = datetime_arg("to")
+    itersize = int_arg(
+        "itersize", current_app.config.get("EXPORT_ITERSIZE", 5000), minimum=1, maximum=100_000
+    )
+    if fmt == "parquet" and export.pa is None:
+        return jsonify(error="parquet export requires pyarrow on the server"), 400
+
+    batches = db.iter_stock_data(ticker, start=start, end=end, batch_size=itersize)
+    body = export.encode(fmt, EXPORT_COLUMNS, batches, current_app.json.dumps)
+    content_type, extension = export.FORMATS[fmt]
+    filename = f"{ticker}_history.{extension}"
+    if compress == "gzip":
+        body = export.gzip_stream(body)
+        content_type = "application/gzip"
+        filename += ".gz"
+
+    resp = Response(body, content_type=content_type)
+    resp.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    # let each batch through reverse proxies as soon as it is written
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
+
+
+@bp.get("/stocks/<ticker>/indicators")
+def stock_indicators(ticker):
+    """
+    Get technical indicators for a ticker
+    ---
+    tags:
+      - Stocks
+    summary: SMA / EMA / RSI / MACD / Bollinger bands computed server-side
+    description: >
+      Indicators are computed over close prices with vectorized NumPy and
+      then updated incrementally as new bars arrive. Values are null until
+      an indicator has a full window.
+    parameters:
+      - name: ticker
+        in: path
+        type: string
+        required: true
+        description: Stock ticker symbol, e.g. AAPL
+      - name: names
+        in: query
+        type: string
+        required: true
+        description: >
+          Comma-separated indicators: smaN, emaN, rsiN, bbN (Bollinger, 2σ)
+          and macd (12/26/9), e.g. sma20,ema50,rsi14,macd
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 30
+        description: Number of most recent bars to return
+    responses:
+      200:
+        description: >
+          Rows of timestamp, close and one column per indicator output
+          (macd adds macd_signal/macd_hist, bbN adds _upper/_middle/_lower),
+          newest first
+      304:
+        description: Not modified (If-None-Match / If-Modified-Since matched)
+      400:
+        description: Missing or unknown indicator name
+    """
+    db = current_app.extensions["db"]
+    engine = current_app.extensions["indicators"]
+    ticker = ticker.upper()
+    names = list_arg("names")
+    if not names:
+        raise InvalidParam("names is required, e.g. names=sma20,rsi14")
+    try:
+        specs = parse_names(names)
+    except UnknownIndicator as e:
+        raise InvalidParam(str(e))
+    limit = limit_arg(30)
+
+    version = db.get_stock_data_version(ticker, limit=limit)
+    return conditional_response(
+        ("indicators", ticker, limit, tuple(specs)),
+        version,
+        lambda: (jsonify(engine.series(db, ticker, specs, limit)), 200),
+    )
 
 
 @bp.get("/stocks/<ticker>/prediction")
@@ -127,6 +461,8 @@ def latest_prediction(ticker):
             created_at:
               type: string
               example: "2025-11-18T21:00:00Z"
+      304:
+        description: Not modified (If-None-Match / If-Modified-Since matched)
       404:
         description: No prediction exists for this ticker
         schema:
@@ -137,10 +473,18 @@ def latest_prediction(ticker):
               example: No prediction found
     """
     db = current_app.extensions["db"]
-    pred = db.get_latest_prediction(ticker.upper())
-    if not pred:
+    ticker = ticker.upper()
+    version = db.get_latest_prediction_version(ticker)
+    if not version:
         return jsonify(error="No prediction found"), 404
-    return jsonify(pred), 200
+
+    def build():
+        pred = db.get_latest_prediction(ticker)
+        if not pred:
+            return jsonify(error="No prediction found"), 404
+        return jsonify(pred), 200
+
+    return conditional_response(("prediction", ticker), version, build)
 
 
 @bp.get("/stocks/<ticker>/news")
@@ -162,10 +506,17 @@ def recent_news(ticker):
         type: integer
         required: false
         default: 5
-        description: Maximum number of news items to return
+        description: Maximum number of news items to return (at most MAX_PAGE_SIZE)
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Opaque cursor from the X-Next-Cursor header of the previous page
     responses:
       200:
-        description: List of recent news stories
+        description: >
+          List of recent news stories, newest first. When more may follow,
+          the X-Next-Cursor and Link (rel="next") headers point at the next page.
         schema:
           type: array
           items:
@@ -186,8 +537,158 @@ def recent_news(ticker):
               summary:
                 type: string
                 example: "Short summary of the article..."
+      304:
+        description: Not modified (If-None-Match / If-Modified-Since matched)
+    """
+    db = current_app.extensions["db"]
+    ticker = ticker.upper()
+    query = parse_news_args(ticker, request.args, current_app.config)
+    version = db.get_recent_news_version(ticker, **query)
+
+    def build():
+        rows = db.get_recent_news(ticker, **query)
+        return jsonify(rows), 200, news_page_headers(ticker, rows, query["limit"], request)
+
+    return conditional_response(("news", ticker, *query.values()), version, build)
+
+
+@bp.get("/stocks/<ticker>/overview")
+def stock_overview(ticker):
+    """
+    Get history, latest prediction and news for a ticker in one response
+    ---
+    tags:
+      - Stocks
+    summary: Combined ticker view (history + prediction + news)
+    description: >
+      The async app (asgi.py) runs the three queries concurrently; this WSGI
+      version runs them one after another.
+    parameters:
+      - name: ticker
+        in: path
+        type: string
+        required: true
+        description: Stock ticker symbol, e.g. AAPL
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 30
+        description: Number of most recent OHLCV rows
+      - name: news_limit
+        in: query
+        type: integer
+        required: false
+        default: 5
+        description: Number of most recent news items
+    responses:
+      200:
+        description: >
+          Object with ticker, history (OHLCV rows, newest first), prediction
+          (null if there is none) and news
     """
     db = current_app.extensions["db"]
-    limit = int(request.args.get("limit", 5))
-    news = db.get_recent_news(ticker.upper(), limit=limit)
-    return jsonify(news), 200
+    ticker = ticker.upper()
+    limit, news_limit = parse_overview_args(request.args, current_app.config)
+    return jsonify(
+        ticker=ticker,
+        history=db.get_stock_data(ticker, limit=limit),
+        prediction=db.get_latest_prediction(ticker),
+        news=db.get_recent_news(ticker, limit=news_limit),
+    ), 200
+
+
+# ============================================
+# Argument parsing and paging shared with the async app (app.aio)
+# ============================================
+
+
+# Bars read per max_points point when /history picks a SQL bucket on its own.
+# INTERVALS steps grow by at most 24x (1h -> 1d), so the finest bucket that
+# fits this budget still leaves more than max_points bars for LTTB.
+DOWNSAMPLE_OVERSAMPLE = 25
+
+
+def downsample_interval(start, end, max_points):
+    """
+    Finest INTERVALS bucket that covers ``[start, end)`` in at most
+    ``DOWNSAMPLE_OVERSAMPLE * max_points`` bars, or None when the span is
+    short enough to read raw rows.
+    """
+    span = (end - start).total_seconds()
+    budget = DOWNSAMPLE_OVERSAMPLE * max_points
+    steps = sorted(INTERVALS.items(), key=lambda item: item[1])
+    if span / steps[0][1] <= budget:
+        return None
+    for name, step in steps:
+        if span / step <= budget:
+            return name
+    return steps[-1][0]
+
+
+def parse_history_args(ticker, args, config):
+    """
+    Query-string arguments of /stocks/<ticker>/history as
+    ``(get_stock_data kwargs, max_points)``.
+
+    With max_points, a ``from`` bound and no interval, the range is first
+    resampled in SQL (see downsample_interval) so LTTB runs over a few
+    thousand bars instead of every raw row.
+    """
+    start = datetime_arg("from", args=args)
+    end = datetime_arg("to", args=args)
+    interval = choice_arg("interval", list(INTERVALS), args=args)
+    max_page = config.get("MAX_PAGE_SIZE", 1000)
+    max_points = int_arg("max_points", None, minimum=3, maximum=max_page, args=args)
+    if max_points is None:
+        limit = limit_arg(30, args=args, maximum=max_page)
+    else:
+        max_rows = config.get("MAX_DOWNSAMPLE_ROWS", 50_000)
+        limit = int_arg("limit", max_rows, minimum=1, maximum=max_rows, args=args)
+        if interval is None and start is not None:
+            interval = downsample_interval(start, end or datetime.now(timezone.utc), max_points)
+
+    cursor = cursor_arg("history", ticker, (datetime,), args=args)
+    if cursor is not None:
+        # rows come newest first: the next page ends where the last one began
+        (before,) = cursor
+        if before.tzinfo is None:
+            before = before.replace(tzinfo=timezone.utc)
+        end = before if end is None else min(end, before)
+    return dict(limit=limit, start=start, end=end, interval=interval), max_points
+
+
+def history_page(ticker, rows, limit, max_points, req):
+    """Downsampled rows, or the rows plus next-page headers."""
+    if max_points is not None:
+        # a full read means older rows of the range were cut off
+        headers = {"X-Truncated": "true"} if len(rows) >= limit else {}
+        return downsample_rows(rows, max_points), headers
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = encode_cursor("history", ticker, [rows[-1]["timestamp"]])
+    return rows, next_page_headers(next_cursor, req=req)
+
+
+def parse_news_args(ticker, args, config):
+    """Query-string arguments of /stocks/<ticker>/news as get_recent_news kwargs."""
+    limit = limit_arg(5, args=args, maximum=config.get("MAX_PAGE_SIZE", 1000))
+    cursor = cursor_arg("news", ticker, ((datetime, type(None)), int), args=args)
+    return dict(limit=limit, before=tuple(cursor) if cursor is not None else None)
+
+
+def news_page_headers(ticker, rows, limit, req):
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = encode_cursor("news", ticker, [last["published_at"], last["id"]])
+    return next_page_headers(next_cursor, req=req)
+
+
+def parse_overview_args(args, config):
+    """``(history limit, news limit)`` for /stocks/<ticker>/overview."""
+    max_page = config.get("MAX_PAGE_SIZE", 1000)
+    return (
+        limit_arg(30, args=args, maximum=max_page),
+        limit_arg(5, name="news_limit", args=args, maximum=max_page),
+    )
@@ -1,7 +1,11 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, url_for
 from werkzeug.utils import secure_filename
-import io
-import pandas as pd
+
+from ..services.ingest import CSVIngestError, ingest_csv
+from ..services.jobs import FINISHED, QueueFull
+from ..services.ohlcv_loader import OHLCVLoadError, load_ohlcv
+from ..services.repository import DatasetTooLarge
+from .params import InvalidParam, choice_arg
 
 bp = Blueprint("upload", __name__)
 
@@ -22,6 +26,33 @@ def upload_csv():
         type: file
         required: true
         description: "CSV file with historical stock data (e.g. columns: timestamp, open, high, low, close, volume)"
+      - name: mode
+        in: query
+        type: string
+        enum: [sync, async]
+        default: sync
+        required: false
+        description: >
+          async spools the file, returns 202 with a job right away and
+          processes it in the background; poll GET /upload/jobs/{job_id}
+      - name: target
+        in: query
+        type: string
+        enum: [dataset, stock_data]
+        default: dataset
+        required: false
+        description: >
+          stock_data validates the rows as OHLCV bars (columns timestamp or
+          date, open, high, low, close, volume) and loads them into the
+          stock_data table instead of creating a dataset; rows whose
+          (ticker, timestamp) already exist are skipped
+      - name: ticker
+        in: query
+        type: string
+        required: false
+        description: >
+          Ticker of every row (target=stock_data); without it the file needs
+          a ticker column
     responses:
       200:
         description: File processed and stored successfully
@@ -49,9 +80,27 @@ def upload_csv():
                   type: array
                   items:
                     type: object
+          description: >
+            With target=stock_data the body is the load report instead:
+            rows, inserted, duplicates, rejected, rejections (count per
+            failed check), examples (first rejected rows), seconds and
+            rows_per_sec
+      202:
+        description: >
+          Upload accepted (mode=async); the body is the job status (see
+          GET /upload/jobs/{job_id}), the Location header points to it
       400:
         description: Missing file or invalid CSV
+      413:
+        description: Dataset does not fit in the in-memory repository budget
+      503:
+        description: UPLOAD_QUEUE_DEPTH uploads are already queued (mode=async)
     """
+    mode = choice_arg("mode", ["sync", "async"], default="sync")
+    target = choice_arg("target", ["dataset", "stock_data"], default="dataset")
+    ticker = (request.args.get("ticker") or "").strip().upper() or None
+    if ticker is not None and (len(ticker) > 10 or not ticker.replace(".", "").isalnum()):
+        raise InvalidParam("ticker must be a ticker symbol, e.g. AAPL")
     if "file" not in request.files:
         return jsonify(error="No file part"), 400
     f = request.files["file"]
@@ -59,25 +108,148 @@ def upload_csv():
         return jsonify(error="No selected file"), 400
 
     filename = secure_filename(f.filename)
-    raw = f.read()
+
+    # Werkzeug spools the multipart body to a temporary file while parsing,
+    # so f.stream can be read in chunks without holding the upload in memory.
+    repo = current_app.extensions["repo"]
+    chunk_rows = current_app.config.get("UPLOAD_CHUNK_ROWS", 50_000)
+
+    if target == "stock_data":
+        return _load_stock_data(f, filename, ticker, mode)
+
+    if mode == "async":
+
+        def task(stream, on_chunk):
+            return ingest_csv(stream, filename, repo, chunk_rows=chunk_rows, on_chunk=on_chunk)
+
+        return _submit_job(f, filename, task)
 
     try:
-        df = pd.read_csv(io.BytesIO(raw))
-    except Exception as e:
+        dataset_id, summary = ingest_csv(f.stream, filename, repo, chunk_rows=chunk_rows)
+    except CSVIngestError as e:
         return jsonify(error=f"Failed to parse CSV: {e}"), 400
+    except DatasetTooLarge as e:
+        return jsonify(error=str(e)), 413
 
-    preview = df.head(5).to_dict(orient="records")
-    meta = {
-        "rows": int(df.shape[0]),
-        "columns": df.columns.tolist(),
-        "filename": filename,
-    }
+    return jsonify(dataset_id=dataset_id, summary=summary), 200
+
+
+def _load_stock_data(f, filename, ticker, mode):
+    """target=stock_data: run the OHLCV loader in the request or as a job."""
+    db = current_app.extensions["db"]
+    workers = current_app.config.get("LOADER_WORKERS", 2)
+    chunk_bytes = current_app.config.get("LOADER_CHUNK_BYTES", 8 * 1024 * 1024)
+
+    def task(stream, on_chunk):
+        report = load_ohlcv(
+            stream, db, ticker=ticker, workers=workers, chunk_bytes=chunk_bytes,
+            on_chunk=on_chunk,
+        )
+        return None, {**report, "filename": filename}
+
+    if mode == "async":
+        return _submit_job(f, filename, task)
+
+    try:
+        _, report = task(f.stream, None)
+    except OHLCVLoadError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(report), 200
+
+
+def _submit_job(f, filename, task):
+    try:
+        job = current_app.extensions["jobs"].submit(f, filename, task)
+    except QueueFull as e:
+        return jsonify(error=str(e)), 503, {"Retry-After": "5"}
+    location = url_for("upload.upload_job", job_id=job["job_id"])
+    return jsonify(job), 202, {"Location": location}
 
-    repo = current_app.extensions["repo"]
-    dataset_id = repo.save_dataset(
-        name=filename,
-        meta=meta,
-        rows=df.to_dict(orient="records"),
-    )
 
-    return jsonify(dataset_id=dataset_id, summary={**meta, "preview": preview}), 200
+@bp.get("/upload/jobs/<job_id>")
+def upload_job(job_id):
+    """
+    Get the status of an async upload
+    ---
+    tags:
+      - Upload
+    summary: Progress and result of a mode=async upload
+    parameters:
+      - name: job_id
+        in: path
+        type: string
+        required: true
+    responses:
+      200:
+        description: Job status
+        schema:
+          type: object
+          properties:
+            job_id:
+              type: string
+              example: "job_3f2b..."
+            state:
+              type: string
+              enum: [queued, running, succeeded, failed, cancelled]
+            filename:
+              type: string
+            bytes_total:
+              type: integer
+            bytes_processed:
+              type: integer
+            rows_processed:
+              type: integer
+            progress:
+              type: number
+              example: 0.42
+            eta_seconds:
+              type: number
+              description: Estimated seconds left while running, else null
+            dataset_id:
+              type: string
+              description: Set once the job succeeded
+            summary:
+              type: object
+              description: Same summary as a synchronous upload
+            error:
+              type: string
+      404:
+        description: Unknown job
+    """
+    job = current_app.extensions["jobs"].get(job_id)
+    if job is None:
+        return jsonify(error="Job not found"), 404
+    return jsonify(job), 200
+
+
+@bp.delete("/upload/jobs/<job_id>")
+def cancel_upload_job(job_id):
+    """
+    Cancel an async upload
+    ---
+    tags:
+      - Upload
+    summary: Stop a queued or running upload and discard its partial dataset
+    description: >
+      A running job stops after its current chunk, so the state may still be
+      "running" in this response. Poll the job until it is "cancelled".
+    parameters:
+      - name: job_id
+        in: path
+        type: string
+        required: true
+    responses:
+      202:
+        description: Cancellation requested; body is the job status
+      404:
+        description: Unknown job
+      409:
+        description: The job already finished
+    """
+    jobs = current_app.extensions["jobs"]
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify(error="Job not found"), 404
+    if job["state"] in FINISHED:
+        return jsonify(error=f"Job already {job['state']}", job=job), 409
+    return jsonify(jobs.cancel(job_id)), 202
@@ -0,0 +1,88 @@
+from flask import Blueprint, current_app, jsonify
+
+from .params import int_arg
+
+bp = Blueprint("users", __name__)
+
+
+@bp.get("/users/<int:user_id>/dashboard")
+def user_dashboard(user_id):
+    """
+    Watchlist dashboard for a user
+    ---
+    tags:
+      - Users
+    summary: Latest bar, day change, prediction and headlines for every watchlist ticker
+    description: >
+      Served by a single SQL query regardless of the watchlist size and
+      cached per user; writes to the user's watchlist or to any of its
+      tickers invalidate the cached entry.
+    parameters:
+      - name: user_id
+        in: path
+        type: integer
+        required: true
+      - name: news_limit
+        in: query
+        type: integer
+        required: false
+        default: 3
+        description: Headlines per ticker (0-20)
+    responses:
+      200:
+        description: One entry per watchlist ticker, most recently added first
+        schema:
+          type: object
+          properties:
+            user_id:
+              type: integer
+              example: 1
+            watchlist:
+              type: array
+              items:
+                type: object
+                properties:
+                  ticker:
+                    type: string
+                    example: AAPL
+                  name:
+                    type: string
+                  sector:
+                    type: string
+                  added_at:
+                    type: string
+                  timestamp:
+                    type: string
+                    description: Time of the latest bar (null without data)
+                  open:
+                    type: number
+                  high:
+                    type: number
+                  low:
+                    type: number
+                  close:
+                    type: number
+                  volume:
+                    type: integer
+                  prev_close:
+                    type: number
+                    description: Last close of the previous day
+                  change:
+                    type: number
+                  change_pct:
+                    type: number
+                    example: 1.25
+                  prediction:
+                    type: object
+                    description: Latest prediction, null if there is none
+                  news:
+                    type: array
+                    items:
+                      type: object
+      400:
+        description: Invalid news_limit
+    """
+    db = current_app.extensions["db"]
+    news_limit = int_arg("news_limit", 3, minimum=0, maximum=20)
+    rows = db.get_user_dashboard(user_id, news_limit=news_limit)
+    return jsonify(user_id=user_id, watchlist=rows), 200
@@ -1,6 +1,10 @@
 import os
 from dotenv import load_dotenv
 
+def _getenv_bool(name, default):
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
 def load_config(app):
     load_dotenv() 
 
@@ -11,9 +15,104 @@ def load_config(app):
 
     mb = float(os.getenv("MAX_CONTENT_LENGTH_MB", "10"))
     app.config["MAX_CONTENT_LENGTH"] = int(mb * 1024 * 1024)
+    # Largest page any list/rows endpoint will return
+    app.config["MAX_PAGE_SIZE"] = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+    # Most raw rows /history reads before downsampling to max_points
+    app.config["MAX_DOWNSAMPLE_ROWS"] = int(os.getenv("MAX_DOWNSAMPLE_ROWS", "50000"))
+    # Most tickers accepted by /api/stocks/history?tickers=...
+    app.config["MAX_BATCH_TICKERS"] = int(os.getenv("MAX_BATCH_TICKERS", "50"))
+    # Rows per server-side cursor fetch (and per written batch) in /history/export
+    app.config["EXPORT_ITERSIZE"] = int(os.getenv("EXPORT_ITERSIZE", "5000"))
+    # Uploads are parsed and stored this many rows at a time
+    app.config["UPLOAD_CHUNK_ROWS"] = int(os.getenv("UPLOAD_CHUNK_ROWS", "50000"))
+    # Background uploads (?mode=async): worker threads and queued+running limit per process
+    app.config["UPLOAD_WORKERS"] = int(os.getenv("UPLOAD_WORKERS", "2"))
+    app.config["UPLOAD_QUEUE_DEPTH"] = int(os.getenv("UPLOAD_QUEUE_DEPTH", "16"))
+    # Status files of finished jobs are deleted after this long
+    app.config["UPLOAD_JOB_TTL_HOURS"] = float(os.getenv("UPLOAD_JOB_TTL_HOURS", "24"))
+    # OHLCV loads (?target=stock_data): parser processes and split size
+    app.config["LOADER_WORKERS"] = int(os.getenv("LOADER_WORKERS", "2"))
+    app.config["LOADER_CHUNK_BYTES"] = int(float(os.getenv("LOADER_CHUNK_MB", "8")) * 1024 * 1024)
 
     app.config["PERSIST_MODE"] = os.getenv("PERSIST_MODE", "files").lower()
     app.config["DATA_DIR"] = os.getenv("DATA_DIR", "./data")
+    # memory mode: typed column storage and an LRU-evicted budget (0 = unbounded)
+    app.config["MEMORY_REPO_COMPACT"] = _getenv_bool("MEMORY_REPO_COMPACT", "true")
+    app.config["MEMORY_REPO_MAX_MB"] = float(os.getenv("MEMORY_REPO_MAX_MB", "256"))
+    # On-disk layout for new datasets in files mode: jsonl | columnar
+    app.config["DATASET_FORMAT"] = os.getenv("DATASET_FORMAT", "jsonl").lower()
 
     # NEW: Neon/Postgres connection string
     app.config["DATABASE_URL"] = os.getenv("DATABASE_URL")
+
+    # postgres | sqlite (embedded file: WAL, per-thread readers, one writer;
+    # no /api/stocks/stream or rollups)
+    app.config["DB_BACKEND"] = os.getenv("DB_BACKEND", "postgres").lower()
+    app.config["SQLITE_PATH"] = os.getenv("SQLITE_PATH", "./feather.db")
+    app.config["SQLITE_MMAP_MB"] = int(os.getenv("SQLITE_MMAP_MB", "256"))
+    app.config["SQLITE_CACHE_MB"] = int(os.getenv("SQLITE_CACHE_MB", "64"))
+    app.config["SQLITE_BUSY_TIMEOUT"] = float(os.getenv("SQLITE_BUSY_TIMEOUT", "5"))
+
+    # Connection pooling (one pool per gunicorn worker process)
+    app.config["DB_POOL_ENABLED"] = _getenv_bool("DB_POOL_ENABLED", "true")
+    app.config["DB_POOL_MIN_SIZE"] = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+    app.config["DB_POOL_MAX_SIZE"] = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    app.config["DB_POOL_TIMEOUT"] = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+    app.config["DB_POOL_MAX_IDLE"] = float(os.getenv("DB_POOL_MAX_IDLE", "300"))
+    app.config["DB_POOL_MAX_LIFETIME"] = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))
+    app.config["DB_POOL_CHECK_INTERVAL"] = float(os.getenv("DB_POOL_CHECK_INTERVAL", "30"))
+
+    # Run the hot read queries as server-side prepared statements. Needs a
+    # session-level connection: not behind PgBouncer / Neon's -pooler endpoint
+    app.config["DB_PREPARED_STATEMENTS"] = _getenv_bool("DB_PREPARED_STATEMENTS", "false")
+    prepared = os.getenv("DB_PREPARED_QUERIES", "")
+    app.config["DB_PREPARED_QUERIES"] = [q.strip() for q in prepared.split(",") if q.strip()]
+
+    # Precomputed 1h/1d/1w OHLCV bars (run rebuild_rollups.py before enabling)
+    app.config["ROLLUPS_ENABLED"] = _getenv_bool("ROLLUPS_ENABLED", "false")
+
+    # Live updates: inserts pg_notify on STREAM_CHANNEL, /api/stocks/stream
+    # relays them as Server-Sent Events through one LISTEN connection per worker
+    app.config["DB_NOTIFY_ENABLED"] = _getenv_bool("DB_NOTIFY_ENABLED", "true")
+    app.config["STREAM_CHANNEL"] = os.getenv("STREAM_CHANNEL", "feather_events")
+    app.config["STREAM_MAX_CLIENTS"] = int(os.getenv("STREAM_MAX_CLIENTS", "1000"))
+    app.config["STREAM_HEARTBEAT"] = float(os.getenv("STREAM_HEARTBEAT", "15"))
+
+    # Read-through query cache in front of Database (per worker process)
+    app.config["QUERY_CACHE_ENABLED"] = _getenv_bool("QUERY_CACHE_ENABLED", "true")
+    app.config["QUERY_CACHE_MAX_ENTRIES"] = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "2048"))
+    # total rows held across entries; larger single results are not cached
+    app.config["QUERY_CACHE_MAX_ROWS"] = int(os.getenv("QUERY_CACHE_MAX_ROWS", "100000"))
+    app.config["QUERY_CACHE_MAX_ENTRY_ROWS"] = int(os.getenv("QUERY_CACHE_MAX_ENTRY_ROWS", "10000"))
+    app.config["QUERY_CACHE_TTLS"] = {
+        "get_all_stocks": float(os.getenv("QUERY_CACHE_TTL_STOCKS", "300")),
+        "get_stock_data": float(os.getenv("QUERY_CACHE_TTL_HISTORY", "30")),
+        "get_latest_prediction": float(os.getenv("QUERY_CACHE_TTL_PREDICTION", "60")),
+        "get_recent_news": float(os.getenv("QUERY_CACHE_TTL_NEWS", "60")),
+        "get_user_watchlist": float(os.getenv("QUERY_CACHE_TTL_WATCHLIST", "60")),
+        "get_user_dashboard": float(os.getenv("QUERY_CACHE_TTL_DASHBOARD", "15")),
+    }
+
+    # Tickers whose indicator state is kept for incremental updates
+    app.config["INDICATOR_CACHE_ENTRIES"] = int(os.getenv("INDICATOR_CACHE_ENTRIES", "256"))
+
+    # JSON encoding: "fast" (orjson, ISO dates, Decimal as number) or "flask"
+    app.config["JSON_PROVIDER"] = os.getenv("JSON_PROVIDER", "fast").lower()
+
+    # Cache-Control max-age (seconds) for the conditional market-data endpoints
+    app.config["HTTP_CACHE_MAX_AGE"] = int(os.getenv("HTTP_CACHE_MAX_AGE", "5"))
+
+    # Logging level of the app's loggers (app.database, app.services.*, ...)
+    app.config["LOG_LEVEL"] = os.getenv("LOG_LEVEL", "INFO").upper()
+
+    # Prometheus metrics at /api/metrics (per worker process)
+    app.config["METRICS_ENABLED"] = _getenv_bool("METRICS_ENABLED", "true")
+
+    # Sampling profiler: requests slower than PROFILE_THRESHOLD_MS leave
+    # collapsed stacks (flamegraph.pl / speedscope input) in PROFILE_DIR
+    app.config["PROFILE_SLOW_REQUESTS"] = _getenv_bool("PROFILE_SLOW_REQUESTS", "false")
+    app.config["PROFILE_THRESHOLD_MS"] = float(os.getenv("PROFILE_THRESHOLD_MS", "500"))
+    app.config["PROFILE_INTERVAL_MS"] = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    app.config["PROFILE_DIR"] = os.getenv(
+        "PROFILE_DIR", os.path.join(app.config["DATA_DIR"], "profiles")
+    )
@@ -2,43 +2,515 @@
 Database manager for Feather Finance App (Neon PostgreSQL version)
 """
 
+import io
+import logging
 import os
+import time
+import uuid
 from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import islice
 
 import psycopg2
+import psycopg2.errors
 import psycopg2.extras
 
+from .services.events import DEFAULT_CHANNEL
+from .services.pool import ConnectionPool
+from .services.resultset import ResultSet
+from .services.statements import DEFAULT_HOT_QUERIES, StatementRegistry
 
-class Database:
+logger = logging.getLogger(__name__)
+
+# Supported resampling intervals for get_stock_data, in seconds
+INTERVALS = {
+    "1m": 60,
+    "5m": 5 * 60,
+    "1h": 60 * 60,
+    "1d": 24 * 60 * 60,
+    "1w": 7 * 24 * 60 * 60,
+}
+# date_bin origin for resampled bars (a Monday, so weekly bars start on Monday)
+BUCKET_ORIGIN = "2000-01-03 00:00:00+00"
+_BUCKET_ORIGIN_DT = datetime(2000, 1, 3, tzinfo=timezone.utc)
+# Resolutions kept precomputed in stock_rollups (see ROLLUP FUNCTIONS)
+ROLLUP_RESOLUTIONS = ("1h", "1d", "1w")
+# Columns streamed by iter_stock_data, in order
+EXPORT_COLUMNS = ("ticker", "timestamp", "open", "high", "low", "close", "volume")
+
+
+def _aligned(value, seconds):
+    """True when ``value`` falls on a bucket boundary of the given size."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _BUCKET_ORIGIN_DT).total_seconds() % seconds == 0
+
+
+def _chunked(iterable, size):
+    """Yield lists of at most ``size`` items without materializing the input."""
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class StockQueries:
+    """
+    SQL builders for the market-data reads.
+
+    Each ``_*_query`` method returns ``(sql, params)``; Database runs them on
+    psycopg2 and aio.AsyncDatabase on psycopg 3, so both serving modes issue
+    exactly the same queries. ``self.rollups`` selects the rollup tables
+    for resampled history.
+    """
+
+    rollups = False
+
+    def _stock_data_range(self, ticker, start, end):
+        """WHERE clause and params for a ticker's rows in [start, end)."""
+        where = ["ticker = %s"]
+        params = [ticker]
+        if start is not None:
+            where.append("timestamp >= %s")
+            params.append(start)
+        if end is not None:
+            where.append("timestamp < %s")
+            params.append(end)
+        return " AND ".join(where), params
+
+    def _stock_data_query(self, ticker, limit, start, end, interval):
+        resolution = self._rollup_for(interval, start, end)
+        if resolution is not None:
+            return self._rollup_bars_query(ticker, limit, start, end, interval, resolution)
+        where, params = self._stock_data_range(ticker, start, end)
+        if interval is None:
+            sql = f"""
+                SELECT *
+                FROM stock_data
+                WHERE {where}
+                ORDER BY timestamp DESC
+                LIMIT %s
+            """
+        else:
+            sql = f"""
+                SELECT %s AS ticker,
+                       date_bin(%s::interval, timestamp, '{BUCKET_ORIGIN}') AS timestamp,
+                       (array_agg(open ORDER BY timestamp ASC))[1] AS open,
+                       MAX(high) AS high,
+                       MIN(low) AS low,
+                       (array_agg(close ORDER BY timestamp DESC))[1] AS close,
+                       SUM(volume) AS volume
+                FROM stock_data
+                WHERE {where}
+                GROUP BY 2
+                ORDER BY 2 DESC
+                LIMIT %s
+            """
+            params = [ticker, f"{INTERVALS[interval]} seconds", *params]
+        return sql, (*params, limit)
+
+    def _latest_prediction_query(self, ticker):
+        return (
+            """
+            SELECT *
+            FROM predictions
+            WHERE ticker = %s
+            ORDER BY created_at DESC
+            LIMIT 1
+            """,
+            (ticker,),
+        )
+
+    def _news_seek(self, ticker, before):
+        """
+        WHERE clause and params for a ticker's news after the keyset
+        ``before`` = (published_at, id) in (published_at DESC NULLS LAST,
+        id DESC) order.
+        """
+        if before is None:
+            return "ticker = %s", [ticker]
+        published_at, last_id = before
+        if published_at is None:
+            return "ticker = %s AND published_at IS NULL AND id < %s", [ticker, last_id]
+        return (
+            "ticker = %s AND (published_at < %s"
+            " OR (published_at = %s AND id < %s) OR published_at IS NULL)",
+            [ticker, published_at, published_at, last_id],
+        )
+
+    def _recent_news_query(self, ticker, limit, before):
+        where, params = self._news_seek(ticker, before)
+        return (
+            f"""
+            SELECT *
+            FROM news_articles
+            WHERE {where}
+            ORDER BY published_at DESC NULLS LAST, id DESC
+            LIMIT %s
+            """,
+            (*params, limit),
+        )
+
+    def _all_stocks_query(self):
+        return "SELECT * FROM stocks ORDER BY ticker", ()
+
+    def _dashboard_query(self, user_id, news_limit):
+        """
+        Every watchlist ticker of a user with its latest bar, the change since
+        the previous day's last close, the latest prediction and the newest
+        ``news_limit`` headlines. Each LATERAL subquery is a LIMIT-ed scan of
+        one (ticker, ...) index, so this is one round trip whatever the size
+        of the watchlist.
+        """
+        return (
+            """
+            SELECT w.ticker, s.name, s.sector, w.added_at,
+                   bar.timestamp, bar.open, bar.high, bar.low, bar.close, bar.volume,
+                   prev.close AS prev_close,
+                   bar.close - prev.close AS change,
+                   ROUND((bar.close - prev.close) * 100 / NULLIF(prev.close, 0), 2)
+                       AS change_pct,
+                   pred.prediction,
+                   COALESCE(news.items, '[]'::json) AS news
+            FROM watchlists w
+            JOIN stocks s ON s.ticker = w.ticker
+            LEFT JOIN LATERAL (
+                SELECT sd.timestamp, sd.open, sd.high, sd.low, sd.close, sd.volume
+                FROM stock_data sd
+                WHERE sd.ticker = w.ticker
+                ORDER BY sd.timestamp DESC
+                LIMIT 1
+            ) bar ON TRUE
+            LEFT JOIN LATERAL (
+                SELECT sd.close
+                FROM stock_data sd
+                WHERE sd.ticker = w.ticker
+                  AND sd.timestamp < date_trunc('day', bar.timestamp)
+                ORDER BY sd.timestamp DESC
+                LIMIT 1
+            ) prev ON TRUE
+            LEFT JOIN LATERAL (
+                SELECT json_build_object(
+                    'id', p.id, 'predicted_trend', p.predicted_trend,
+                    'confidence', p.confidence, 'predicted_change', p.predicted_change,
+                    'model_version', p.model_version, 'created_at', p.created_at
+                ) AS prediction
+                FROM predictions p
+                WHERE p.ticker = w.ticker
+                ORDER BY p.created_at DESC
+                LIMIT 1
+            ) pred ON TRUE
+            LEFT JOIN LATERAL (
+                SELECT json_agg(json_build_object(
+                    'id', n.id, 'headline', n.headline, 'sentiment', n.sentiment,
+                    'source', n.source, 'url', n.url, 'published_at', n.published_at
+                ) ORDER BY n.published_at DESC NULLS LAST, n.id DESC) AS items
+                FROM (
+                    SELECT *
+                    FROM news_articles na
+                    WHERE na.ticker = w.ticker
+                    ORDER BY na.published_at DESC NULLS LAST, na.id DESC
+                    LIMIT %s
+                ) n
+            ) news ON TRUE
+            WHERE w.user_id = %s
+            ORDER BY w.added_at DESC, w.ticker
+            """,
+            (news_limit, user_id),
+        )
+
+    # Versions: cheap summaries of what the matching query would return, used
+    # to build ETag / Last-Modified headers without fetching the full rows.
+    # They only touch the (ticker, ...) indexes and a few narrow columns.
+
+    def _stock_data_version_query(self, ticker, limit, start, end, interval):
+        resolution = self._rollup_for(interval, start, end)
+        if resolution is not None:
+            return self._rollup_version_query(ticker, start, end, resolution)
+        where, params = self._stock_data_range(ticker, start, end)
+        # resampled bars depend on every raw row in the range
+        limit_sql = "" if interval is not None else "LIMIT %s"
+        if interval is None:
+            params.append(limit)
+        return (
+            f"""
+            SELECT COUNT(*) AS rows, MAX(id) AS max_id,
+                   MAX(timestamp) AS max_timestamp,
+                   MAX(created_at) AS last_modified
+            FROM (
+                SELECT id, timestamp, created_at
+                FROM stock_data
+                WHERE {where}
+                ORDER BY timestamp DESC
+                {limit_sql}
+            ) latest
+            """,
+            params,
+        )
+
+    def _latest_prediction_version_query(self, ticker):
+        return (
+            """
+            SELECT id AS max_id, created_at AS last_modified
+            FROM predictions
+            WHERE ticker = %s
+            ORDER BY created_at DESC
+            LIMIT 1
+            """,
+            (ticker,),
+        )
+
+    def _recent_news_version_query(self, ticker, limit, before):
+        where, params = self._news_seek(ticker, before)
+        return (
+            f"""
+            SELECT COUNT(*) AS rows, MAX(id) AS max_id,
+                   MAX(created_at) AS last_modified
+            FROM (
+                SELECT id, created_at
+                FROM news_articles
+                WHERE {where}
+                ORDER BY published_at DESC NULLS LAST, id DESC
+                LIMIT %s
+            ) latest
+            """,
+            (*params, limit),
+        )
+
+    # Rollups (see Database's ROLLUP FUNCTIONS for how they are maintained)
+
+    def _rollup_for(self, interval, start, end):
+        """
+        Coarsest rollup resolution that can answer a resampled query exactly:
+        it must divide the interval and both range bounds must fall on its
+        bucket boundaries. None means read raw stock_data.
+        """
+        if not self.rollups or interval is None:
+            return None
+        step = INTERVALS[interval]
+        for resolution in sorted(ROLLUP_RESOLUTIONS, key=INTERVALS.get, reverse=True):
+            size = INTERVALS[resolution]
+            if step % size:
+                continue
+            if all(b is None or _aligned(b, size) for b in (start, end)):
+                return resolution
+        return None
+
+    def _rollup_range(self, ticker, start, end, resolution):
+        where = ["ticker = %s", "resolution = %s"]
+        params = [ticker, resolution]
+        if start is not None:
+            where.append("bucket >= %s")
+            params.append(start)
+        if end is not None:
+            where.append("bucket < %s")
+            params.append(end)
+        return " AND ".join(where), params
+
+    def _rollup_bars_query(self, ticker, limit, start, end, interval, resolution):
+        where, params = self._rollup_range(ticker, start, end, resolution)
+        return (
+            f"""
+            SELECT %s AS ticker,
+                   date_bin(%s::interval, bucket, '{BUCKET_ORIGIN}') AS timestamp,
+                   (array_agg(open ORDER BY bucket ASC))[1] AS open,
+                   MAX(high) AS high,
+                   MIN(low) AS low,
+                   (array_agg(close ORDER BY bucket DESC))[1] AS close,
+                   SUM(volume) AS volume
+            FROM stock_rollups
+            WHERE {where}
+            GROUP BY 2
+            ORDER BY 2 DESC
+            LIMIT %s
+            """,
+            (ticker, f"{INTERVALS[interval]} seconds", *params, limit),
+        )
+
+    def _rollup_version_query(self, ticker, start, end, resolution):
+        where, params = self._rollup_range(ticker, start, end, resolution)
+        return (
+            f"""
+            SELECT COALESCE(SUM(rows), 0) AS rows, MAX(max_id) AS max_id,
+                   MAX(last_ts) AS max_timestamp,
+                   MAX(last_modified) AS last_modified
+            FROM stock_rollups
+            WHERE {where}
+            """,
+            params,
+        )
+
+
+class Database(StockQueries):
     """PostgreSQL database wrapper for Neon"""
 
-    def __init__(self, db_url: str | None = None):
+    # driver errors counted as query_errors (SQLiteDatabase: sqlite3.Error)
+    Error = psycopg2.Error
+
+    def __init__(
+        self,
+        db_url: str | None = None,
+        pooled: bool = False,
+        pool_min_size: int = 1,
+        pool_max_size: int = 10,
+        pool_timeout: float = 5.0,
+        pool_max_idle: float = 300.0,
+        pool_max_lifetime: float = 1800.0,
+        pool_check_interval: float = 30.0,
+        rollups: bool = False,
+        notify: bool = False,
+        notify_channel: str = DEFAULT_CHANNEL,
+        prepare_statements: bool = False,
+        hot_queries=DEFAULT_HOT_QUERIES,
+        metrics=None,
+    ):
         self.db_url = db_url or os.getenv("DATABASE_URL")
         if not self.db_url:
             raise ValueError("DATABASE_URL is not set")
+        # Maintain stock_rollups on insert and read resampled history from it
+        self.rollups = rollups
+        # pg_notify inserted rows for /api/stocks/stream (see CHANGE NOTIFICATIONS)
+        self.notify = notify
+        self.notify_channel = notify_channel
+        # Per-query timings; hot queries run as prepared statements if enabled
+        self.statements = StatementRegistry(prepare=prepare_statements, hot=hot_queries)
+        # Prometheus series (services.metrics.Metrics) for reads and checkouts
+        self.metrics = metrics
+
+        # Connections are opened lazily, so a pool built before gunicorn forks
+        # its workers never shares sockets between processes.
+        self._pool = None
+        if pooled:
+            self._pool = ConnectionPool(
+                lambda: psycopg2.connect(self.db_url),
+                min_size=pool_min_size,
+                max_size=pool_max_size,
+                timeout=pool_timeout,
+                max_idle=pool_max_idle,
+                max_lifetime=pool_max_lifetime,
+                check_interval=pool_check_interval,
+            )
 
         # Print a safe, shortened identifier so you can see it's using Neon
         safe = self.db_url.split("@")[-1]
         safe = safe.split("?")[0]
-        print(f"[OK] Database initialized (Neon Postgres): {safe}")
+        mode = f"pooled, max={pool_max_size}" if pooled else "connect-per-call"
+        logger.info("Database initialized (Neon Postgres, %s): %s", mode, safe)
 
     @contextmanager
     def get_connection(self):
         """Safe database connection with automatic commit/rollback"""
-        conn = psycopg2.connect(self.db_url)
+        started = time.perf_counter()
+        if self._pool is not None:
+            conn = self._pool.acquire()
+        else:
+            conn = psycopg2.connect(self.db_url)
+        if self.metrics is not None:
+            self.metrics.connection_acquire.observe(value=time.perf_counter() - started)
+        broken = False
         try:
             yield conn
             conn.commit()
         except Exception as e:
-            conn.rollback()
-            print(f"[ERROR] {e}")
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+            if isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+                broken = True
+            logger.error("Database transaction failed: %s", e)
             raise
         finally:
-            conn.close()
+            if self._pool is not None:
+                self._pool.release(conn, broken=broken)
+            else:
+                conn.close()
+
+    def pool_stats(self):
+        """
+        Connection pool statistics (None when pooling is disabled)
+        """
+        return self._pool.stats() if self._pool is not None else None
+
+    def close(self):
+        """
+        Close idle pooled connections
+        """
+        if self._pool is not None:
+            self._pool.close()
 
     def _dict_cursor(self, conn):
         return conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
+    def _execute(self, conn, cur, sql, params, label):
+        """
+        Run a read on ``cur``, timed into query_stats() when ``label`` is
+        given and prepared when it names a hot query (see services.statements)
+        """
+        if label is None:
+            cur.execute(sql, params)
+            return
+        started = time.perf_counter()
+        statement = self.statements.statement(label, sql)
+        try:
+            if statement is None:
+                cur.execute(sql, params)
+            else:
+                self._execute_prepared(conn, cur, statement, params)
+        except self.Error:
+            if self.metrics is not None:
+                self.metrics.query_errors.inc(label)
+            raise
+        seconds = time.perf_counter() - started
+        self.statements.record(label, seconds, statement is not None)
+        if self.metrics is not None:
+            self.metrics.query_latency.observe(label, value=seconds)
+
+    def _execute_prepared(self, conn, cur, statement, params):
+        name, prepare_sql, execute_sql = statement
+        prepared = self.statements.prepared_on(conn)
+        if name not in prepared:
+            cur.execute(prepare_sql)
+            prepared.add(name)
+        try:
+            cur.execute(execute_sql, params)
+        except psycopg2.errors.InvalidSqlStatementName:
+            # the session lost its statements (DISCARD ALL, a pooler
+            # switching sessions): prepare again and retry once
+            conn.rollback()
+            prepared.clear()
+            cur.execute(prepare_sql)
+            prepared.add(name)
+            cur.execute(execute_sql, params)
+
+    def _record_rows(self, label, rows):
+        if label is not None and self.metrics is not None:
+            self.metrics.query_rows.observe(label, value=rows)
+
+    def _fetch_all(self, sql, params, label=None):
+        with self.get_connection() as conn:
+            cur = conn.cursor()
+            self._execute(conn, cur, sql, params, label)
+            result = ResultSet.from_cursor(cur)
+        self._record_rows(label, len(result))
+        return result
+
+    def _fetch_one(self, sql, params, label=None):
+        with self.get_connection() as conn:
+            cur = self._dict_cursor(conn)
+            self._execute(conn, cur, sql, params, label)
+            row = cur.fetchone()
+        self._record_rows(label, 0 if row is None else 1)
+        return row
+
+    def query_stats(self):
+        """
+        Calls and execution time (ms) per read query, largest total first
+        """
+        return self.statements.stats()
+
     # ============================================
     # INSERT FUNCTIONS
     # ============================================
@@ -68,8 +540,10 @@ class Database:
                 ),
             )
             row = cur.fetchone()
-            print(f"[OK] Inserted stock data for {data['ticker']}")
-            return row["id"] if row else None
+            if row:
+                self._after_stock_data(cur, [row[0]])
+            logger.debug("Inserted stock data for %s", data["ticker"])
+            return row[0] if row else None
 
     def insert_prediction(self, prediction):
         """
@@ -94,8 +568,10 @@ class Database:
                 ),
             )
             row = cur.fetchone()
-            print(f"[OK] Inserted prediction for {prediction['ticker']}")
-            return row["id"]
+            if self.notify:
+                self._notify(cur, "predictions", [row[0]])
+            logger.debug("Inserted prediction for %s", prediction["ticker"])
+            return row[0]
 
     def insert_news_article(self, article):
         """
@@ -121,8 +597,10 @@ class Database:
                 ),
             )
             row = cur.fetchone()
-            print(f"[OK] Inserted news: {article['headline'][:50]}...")
-            return row["id"] if row else None
+            if row and self.notify:
+                self._notify(cur, "news_articles", [row[0]])
+            logger.debug("Inserted news: %s...", article["headline"][:50])
+            return row[0] if row else None
 
     def add_to_watchlist(self, user_id, ticker):
         """
@@ -140,95 +618,584 @@ class Database:
                 (user_id, ticker),
             )
             row = cur.fetchone()
-            print(f"[OK] Added {ticker} to user {user_id}'s watchlist")
-            return row["id"] if row else None
+            logger.debug("Added %s to user %s's watchlist", ticker, user_id)
+            return row[0] if row else None
 
     # ============================================
-    # QUERY FUNCTIONS
+    # BULK INSERT FUNCTIONS
     # ============================================
+    # Each call runs in a single transaction and writes multi-row
+    # INSERT ... VALUES statements of ``page_size`` rows. The result is
+    # {"inserted_ids": [...], "skipped": n} where skipped counts rows that
+    # hit the same ON CONFLICT clause as the single-row variant.
+    # ``on_chunk(cur, ids)`` runs after each page inside the same transaction.
+
+    def _insert_many(self, sql, values, page_size, on_chunk=None):
+        inserted_ids = []
+        total = 0
+        with self.get_connection() as conn:
+            cur = conn.cursor()
+            for chunk in _chunked(values, page_size):
+                total += len(chunk)
+                returned = psycopg2.extras.execute_values(
+                    cur, sql, chunk, page_size=page_size, fetch=True
+                )
+                ids = [r[0] for r in returned]
+                if on_chunk is not None and ids:
+                    on_chunk(cur, ids)
+                inserted_ids.extend(ids)
+        return {"inserted_ids": inserted_ids, "skipped": total - len(inserted_ids)}
 
-    def get_stock_data(self, ticker, limit=30):
+    def insert_stock_data_bulk(self, rows, page_size=1000):
         """
-        Get historical stock data for a ticker
+        Insert many OHLCV rows (iterable of dicts like insert_stock_data)
+        """
+        result = self._insert_many(
+            """
+            INSERT INTO stock_data
+                (ticker, open, high, low, close, volume, timestamp)
+            VALUES %s
+            ON CONFLICT (ticker, timestamp) DO NOTHING
+            RETURNING id
+            """,
+            (
+                (
+                    d["ticker"],
+                    d["open"],
+                    d["high"],
+                    d["low"],
+                    d["close"],
+                    d["volume"],
+                    d["timestamp"],
+                )
+                for d in rows
+            ),
+            page_size,
+            on_chunk=self._after_stock_data,
+        )
+        logger.info(
+            "Bulk inserted %d stock rows (%d skipped)",
+            len(result["inserted_ids"]), result["skipped"],
+        )
+        return result
+
+    def insert_predictions_bulk(self, predictions, page_size=1000):
+        """
+        Insert many ML predictions (iterable of dicts like insert_prediction)
+        """
+        result = self._insert_many(
+            """
+            INSERT INTO predictions
+                (ticker, predicted_trend, confidence,
+                 predicted_change, model_version)
+            VALUES %s
+            RETURNING id
+            """,
+            (
+                (
+                    p["ticker"],
+                    p["predicted_trend"],
+                    p["confidence"],
+                    p.get("predicted_change"),
+                    p["model_version"],
+                )
+                for p in predictions
+            ),
+            page_size,
+            on_chunk=self._notifier("predictions"),
+        )
+        logger.info("Bulk inserted %d predictions", len(result["inserted_ids"]))
+        return result
+
+    def insert_news_articles_bulk(self, articles, page_size=1000):
+        """
+        Insert many news articles (iterable of dicts like insert_news_article)
+        """
+        result = self._insert_many(
+            """
+            INSERT INTO news_articles
+                (ticker, headline, summary, sentiment, source, url)
+            VALUES %s
+            ON CONFLICT (url) DO NOTHING
+            RETURNING id
+            """,
+            (
+                (
+                    a["ticker"],
+                    a["headline"],
+                    a.get("summary"),
+                    a.get("sentiment"),
+                    a.get("source"),
+                    a.get("url"),
+                )
+                for a in articles
+            ),
+            page_size,
+            on_chunk=self._notifier("news_articles"),
+        )
+        logger.info(
+            "Bulk inserted %d news articles (%d skipped)",
+            len(result["inserted_ids"]), result["skipped"],
+        )
+        return result
+
+    def insert_stocks_bulk(self, stocks, page_size=1000):
+        """
+        Insert many tracked stocks (iterable of {"ticker", "name", "sector"} dicts)
+        """
+        result = self._insert_many(
+            """
+            INSERT INTO stocks (ticker, name, sector)
+            VALUES %s
+            ON CONFLICT (ticker) DO NOTHING
+            RETURNING id
+            """,
+            ((s["ticker"], s["name"], s.get("sector")) for s in stocks),
+            page_size,
+        )
+        logger.info(
+            "Bulk inserted %d stocks (%d skipped)",
+            len(result["inserted_ids"]), result["skipped"],
+        )
+        return result
+
+    def insert_users_bulk(self, users, page_size=1000):
+        """
+        Insert many users (iterable of {"username", "email", "password_hash"}
+        dicts). Existing usernames are kept, and inserted_ids holds the id of
+        every user in input order, existing ones included.
+        """
+        result = self._insert_many(
+            """
+            INSERT INTO users (username, email, password_hash)
+            VALUES %s
+            ON CONFLICT (username) DO UPDATE SET username = EXCLUDED.username
+            RETURNING id
+            """,
+            ((u["username"], u["email"], u["password_hash"]) for u in users),
+            page_size,
+        )
+        logger.info("Bulk upserted %d users", len(result["inserted_ids"]))
+        return result
+
+    def add_to_watchlist_bulk(self, entries, page_size=1000):
+        """
+        Add many watchlist entries (iterable of {"user_id", "ticker"} dicts)
         """
+        result = self._insert_many(
+            """
+            INSERT INTO watchlists (user_id, ticker)
+            VALUES %s
+            ON CONFLICT (user_id, ticker) DO NOTHING
+            RETURNING id
+            """,
+            ((e["user_id"], e["ticker"]) for e in entries),
+            page_size,
+        )
+        logger.info(
+            "Bulk added %d watchlist entries (%d skipped)",
+            len(result["inserted_ids"]), result["skipped"],
+        )
+        return result
+
+    # ============================================
+    # COPY LOADER
+    # ============================================
+
+    def copy_stock_data(self, batches, on_batch=None):
+        """
+        Load OHLCV rows through COPY and merge them into stock_data
+
+        ``batches`` yields ``(csv_text, rows, tickers)``, where the CSV has no
+        header and its columns are ticker, open, high, low, close, volume,
+        timestamp (see services.ohlcv_loader). Each batch is copied into a temporary
+        staging table and merged with the same ON CONFLICT clause as
+        insert_stock_data. The whole load is one transaction.
+        ``on_batch(inserted, skipped)`` runs after every merge and may raise
+        to roll it back. Returns {"inserted": n, "skipped": n}.
+        """
+        inserted = skipped = 0
         with self.get_connection() as conn:
-            cur = self._dict_cursor(conn)
+            cur = conn.cursor()
             cur.execute(
                 """
-                SELECT *
-                FROM stock_data
-                WHERE ticker = %s
-                ORDER BY timestamp DESC
-                LIMIT %s
-                """,
-                (ticker, limit),
+                CREATE TEMP TABLE stock_data_staging (
+                    ticker VARCHAR(10),
+                    open NUMERIC,
+                    high NUMERIC,
+                    low NUMERIC,
+                    close NUMERIC,
+                    volume BIGINT,
+                    timestamp TIMESTAMPTZ
+                ) ON COMMIT DROP
+                """
             )
-            rows = cur.fetchall()
-            return rows
+            for text, rows, _tickers in batches:
+                if rows:
+                    cur.copy_expert(
+                        "COPY stock_data_staging "
+                        "(ticker, open, high, low, close, volume, timestamp) "
+                        "FROM STDIN WITH (FORMAT csv)",
+                        io.StringIO(text),
+                    )
+                    cur.execute(
+                        """
+                        INSERT INTO stock_data
+                            (ticker, open, high, low, close, volume, timestamp)
+                        SELECT ticker, open, high, low, close, volume, timestamp
+                        FROM stock_data_staging
+                        -- a fixed order keeps concurrent loads from deadlocking
+                        ORDER BY ticker, timestamp
+                        ON CONFLICT (ticker, timestamp) DO NOTHING
+                        RETURNING id
+                        """
+                    )
+                    ids = [r[0] for r in cur.fetchall()]
+                    if ids:
+                        self._after_stock_data(cur, ids)
+                    cur.execute("TRUNCATE stock_data_staging")
+                    inserted += len(ids)
+                    skipped += rows - len(ids)
+                if on_batch is not None:
+                    on_batch(inserted, skipped)
+        logger.info("Copied %d stock rows (%d skipped)", inserted, skipped)
+        return {"inserted": inserted, "skipped": skipped}
+
+    # ============================================
+    # QUERY FUNCTIONS
+    # ============================================
+    # Multi-row queries return a ResultSet (cursor tuples plus column names,
+    # see services.resultset) instead of one dict per row.
+
+    def get_stock_data(self, ticker, limit=30, start=None, end=None, interval=None):
+        """
+        Get historical stock data for a ticker
+
+        ``start``/``end`` bound the timestamps ([start, end)). With an
+        ``interval`` (a key of INTERVALS) rows are resampled into OHLCV bars
+        in SQL: first open, max high, min low, last close, summed volume.
+        Rows come back newest first; ``limit`` counts rows or bars. With
+        rollups enabled, bars are built from the coarsest stock_rollups
+        resolution that fits the interval and the range bounds.
+        """
+        return self._fetch_all(
+            *self._stock_data_query(ticker, limit, start, end, interval), "get_stock_data"
+        )
 
     def get_latest_prediction(self, ticker):
         """
         Get most recent prediction for a stock
         """
-        with self.get_connection() as conn:
-            cur = self._dict_cursor(conn)
-            cur.execute(
-                """
-                SELECT *
-                FROM predictions
-                WHERE ticker = %s
-                ORDER BY created_at DESC
-                LIMIT 1
-                """,
-                (ticker,),
-            )
-            row = cur.fetchone()
-            return row if row else None
+        return self._fetch_one(*self._latest_prediction_query(ticker), "get_latest_prediction")
 
     def get_user_watchlist(self, user_id):
         """
         Get all stocks in user's watchlist
         """
+        return self._fetch_all(
+            """
+            SELECT w.ticker, s.name, s.sector, w.added_at
+            FROM watchlists w
+            JOIN stocks s ON w.ticker = s.ticker
+            WHERE w.user_id = %s
+            ORDER BY w.added_at DESC
+            """,
+            (user_id,),
+            "get_user_watchlist",
+        )
+
+    def get_user_dashboard(self, user_id, news_limit=3):
+        """
+        Watchlist dashboard rows for a user in a single query
+
+        One row per watchlist ticker (newest first) with name, sector, the
+        latest OHLCV bar, prev_close/change/change_pct against the previous
+        day's last close, the latest prediction (object or None) and the
+        newest ``news_limit`` articles (list).
+        """
+        return self._fetch_all(*self._dashboard_query(user_id, news_limit), "get_user_dashboard")
+
+    def get_recent_news(self, ticker, limit=5, before=None):
+        """
+        Get recent news for a stock
+
+        ``before`` is the (published_at, id) of the last article of the
+        previous page; the next page is a seek on the (ticker, published_at)
+        index, so deep pages cost the same as the first.
+        """
+        return self._fetch_all(*self._recent_news_query(ticker, limit, before), "get_recent_news")
+
+    def get_all_stocks(self):
+        """
+        Get list of all stocks in database
+        """
+        return self._fetch_all(*self._all_stocks_query(), "get_all_stocks")
+
+    def get_stock_data_batch(self, tickers, limit=30):
+        """
+        Get the latest ``limit`` OHLCV rows for several tickers in one query
+
+        Returns {ticker: ResultSet} in the order the tickers were given;
+        tickers without data map to an empty one.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
         with self.get_connection() as conn:
-            cur = self._dict_cursor(conn)
-            cur.execute(
+            cur = conn.cursor()
+            # one index range scan per ticker, all in a single round trip
+            self._execute(
+                conn,
+                cur,
                 """
-                SELECT w.ticker, s.name, s.sector, w.added_at
-                FROM watchlists w
-                JOIN stocks s ON w.ticker = s.ticker
-                WHERE w.user_id = %s
-                ORDER BY w.added_at DESC
+                SELECT latest.*
+                FROM unnest(%s::text[]) AS t(ticker)
+                CROSS JOIN LATERAL (
+                    SELECT *
+                    FROM stock_data sd
+                    WHERE sd.ticker = t.ticker
+                    ORDER BY sd.timestamp DESC
+                    LIMIT %s
+                ) latest
                 """,
-                (user_id,),
+                (tickers, limit),
+                "get_stock_data_batch",
             )
-            rows = cur.fetchall()
-            return rows
+            columns = [d[0] for d in cur.description]
+            key = columns.index("ticker")
+            grouped = {t: [] for t in tickers}
+            found = cur.fetchall()
+            for row in found:
+                grouped[row[key]].append(row)
+        self._record_rows("get_stock_data_batch", len(found))
+        return {t: ResultSet(columns, rows) for t, rows in grouped.items()}
 
-    def get_recent_news(self, ticker, limit=5):
+    def iter_stock_data(self, ticker, start=None, end=None, batch_size=5000):
         """
-        Get recent news for a stock
+        Stream a ticker's OHLCV rows, oldest first, in batches
+
+        Rows come from a named (server-side) cursor, ``batch_size`` at a
+        time, as tuples in EXPORT_COLUMNS order, so memory use does not grow
+        with the size of the range. The connection stays checked out until
+        the generator is exhausted or closed.
         """
+        where, params = self._stock_data_range(ticker, start, end)
         with self.get_connection() as conn:
-            cur = self._dict_cursor(conn)
+            cur = conn.cursor(name=f"export_{uuid.uuid4().hex}")
+            cur.itersize = batch_size
+            try:
+                cur.execute(
+                    f"""
+                    SELECT {", ".join(EXPORT_COLUMNS)}
+                    FROM stock_data
+                    WHERE {where}
+                    ORDER BY timestamp
+                    """,
+                    params,
+                )
+                while True:
+                    batch = cur.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    yield batch
+            except GeneratorExit:
+                # consumer stopped early (client disconnected): end the
+                # transaction, and the cursor with it, before the
+                # connection goes back to the pool
+                conn.rollback()
+                raise
+
+    # ============================================
+    # VERSION FUNCTIONS (HTTP validators)
+    # ============================================
+    # See StockQueries for what the version rows contain.
+
+    def get_stock_data_version(self, ticker, limit=30, start=None, end=None, interval=None):
+        """
+        Version of the rows get_stock_data would read for the same arguments
+        """
+        return self._fetch_one(
+            *self._stock_data_version_query(ticker, limit, start, end, interval),
+            "get_stock_data_version",
+        )
+
+    def get_latest_prediction_version(self, ticker):
+        """
+        Version of the most recent prediction for a ticker (None if there is none)
+        """
+        return self._fetch_one(
+            *self._latest_prediction_version_query(ticker), "get_latest_prediction_version"
+        )
+
+    def get_recent_news_version(self, ticker, limit=5, before=None):
+        """
+        Version of the news page get_recent_news would return
+        """
+        return self._fetch_one(
+            *self._recent_news_version_query(ticker, limit, before), "get_recent_news_version"
+        )
+
+    # ============================================
+    # CHANGE NOTIFICATIONS
+    # ============================================
+    # With ``notify`` on, inserts send one pg_notify per ticker and statement
+    # on ``notify_channel``: the type, the ticker, how many rows were added
+    # and the newest of them. Postgres delivers them only when the inserting
+    # transaction commits; services.events.EventBroker fans them out to
+    # /api/stocks/stream clients. Payloads stay far below the 8000 byte limit
+    # because bulk inserts send only the newest row per ticker.
+
+    _NOTIFY_SQL = {
+        "stock_data": """
+            SELECT pg_notify(%s, json_build_object(
+                'type', 'price', 'ticker', ticker, 'count', COUNT(*),
+                'bar', (array_agg(json_build_object(
+                    'id', id, 'timestamp', timestamp, 'open', open, 'high', high,
+                    'low', low, 'close', close, 'volume', volume
+                ) ORDER BY timestamp DESC))[1]
+            )::text)
+            FROM stock_data WHERE id = ANY(%s) GROUP BY ticker
+        """,
+        "predictions": """
+            SELECT pg_notify(%s, json_build_object(
+                'type', 'prediction', 'ticker', ticker, 'count', COUNT(*),
+                'prediction', (array_agg(json_build_object(
+                    'id', id, 'predicted_trend', predicted_trend,
+                    'confidence', confidence, 'predicted_change', predicted_change,
+                    'model_version', model_version, 'created_at', created_at
+                ) ORDER BY id DESC))[1]
+            )::text)
+            FROM predictions WHERE id = ANY(%s) GROUP BY ticker
+        """,
+        "news_articles": """
+            SELECT pg_notify(%s, json_build_object(
+                'type', 'news', 'ticker', ticker, 'count', COUNT(*),
+                'article', (array_agg(json_build_object(
+                    'id', id, 'headline', left(headline, 300),
+                    'sentiment', sentiment, 'source', source,
+                    'url', left(url, 1000), 'published_at', published_at
+                ) ORDER BY published_at DESC NULLS LAST, id DESC))[1]
+            )::text)
+            FROM news_articles WHERE id = ANY(%s) GROUP BY ticker
+        """,
+    }
+
+    def _notify(self, cur, table, ids):
+        """Queue change notifications for newly inserted rows (by id) of ``table``."""
+        cur.execute(self._NOTIFY_SQL[table], (self.notify_channel, list(ids)))
+
+    def _notifier(self, table):
+        """``on_chunk`` callback for _insert_many (None when notify is off)."""
+        if not self.notify:
+            return None
+        return lambda cur, ids: self._notify(cur, table, ids)
+
+    def _after_stock_data(self, cur, ids):
+        """Rollups and notifications for newly inserted stock_data rows."""
+        if self.rollups:
+            self._update_rollups(cur, ids)
+        if self.notify:
+            self._notify(cur, "stock_data", ids)
+
+    # ============================================
+    # ROLLUP FUNCTIONS
+    # ============================================
+    # stock_rollups holds one OHLCV bar per (ticker, resolution, bucket) for
+    # ROLLUP_RESOLUTIONS. New stock_data rows are merged into their buckets in
+    # the inserting transaction, so a bar never misses a committed row.
+    # first_ts/last_ts decide which open/close wins when rows arrive out of
+    # order; rows/max_id/last_modified let version queries match the ones
+    # computed from raw rows.
+
+    _ROLLUP_UPSERT = f"""
+        INSERT INTO stock_rollups
+            (ticker, resolution, bucket, open, high, low, close, volume,
+             first_ts, last_ts, rows, max_id, last_modified)
+        SELECT s.ticker, r.resolution,
+               date_bin(r.step, s.timestamp, '{BUCKET_ORIGIN}') AS bucket,
+               (array_agg(s.open ORDER BY s.timestamp ASC))[1],
+               MAX(s.high), MIN(s.low),
+               (array_agg(s.close ORDER BY s.timestamp DESC))[1],
+               SUM(s.volume), MIN(s.timestamp), MAX(s.timestamp),
+               COUNT(*), MAX(s.id), MAX(s.created_at)
+        FROM stock_data s
+        CROSS JOIN (VALUES {", ".join(
+            f"('{r}', interval '{INTERVALS[r]} seconds')" for r in ROLLUP_RESOLUTIONS
+        )}) AS r(resolution, step)
+        WHERE {{where}}
+        GROUP BY 1, 2, 3
+        -- a fixed order keeps concurrent upserts from deadlocking
+        ORDER BY 1, 2, 3
+        ON CONFLICT (ticker, resolution, bucket) DO UPDATE SET
+            open = CASE WHEN EXCLUDED.first_ts < stock_rollups.first_ts
+                        THEN EXCLUDED.open ELSE stock_rollups.open END,
+            high = GREATEST(stock_rollups.high, EXCLUDED.high),
+            low = LEAST(stock_rollups.low, EXCLUDED.low),
+            close = CASE WHEN EXCLUDED.last_ts > stock_rollups.last_ts
+                         THEN EXCLUDED.close ELSE stock_rollups.close END,
+            volume = stock_rollups.volume + EXCLUDED.volume,
+            first_ts = LEAST(stock_rollups.first_ts, EXCLUDED.first_ts),
+            last_ts = GREATEST(stock_rollups.last_ts, EXCLUDED.last_ts),
+            rows = stock_rollups.rows + EXCLUDED.rows,
+            max_id = GREATEST(stock_rollups.max_id, EXCLUDED.max_id),
+            last_modified = GREATEST(stock_rollups.last_modified, EXCLUDED.last_modified)
+    """
+
+    def ensure_rollup_schema(self):
+        """
+        Create the stock_rollups table if it does not exist
+        """
+        with self.get_connection() as conn:
+            cur = conn.cursor()
             cur.execute(
                 """
-                SELECT *
-                FROM news_articles
-                WHERE ticker = %s
-                ORDER BY published_at DESC NULLS LAST, created_at DESC
-                LIMIT %s
-                """,
-                (ticker, limit),
+                CREATE TABLE IF NOT EXISTS stock_rollups (
+                    ticker VARCHAR(10) NOT NULL,
+                    resolution VARCHAR(4) NOT NULL,
+                    bucket TIMESTAMPTZ NOT NULL,
+                    open NUMERIC NOT NULL,
+                    high NUMERIC NOT NULL,
+                    low NUMERIC NOT NULL,
+                    close NUMERIC NOT NULL,
+                    volume BIGINT NOT NULL,
+                    first_ts TIMESTAMPTZ NOT NULL,
+                    last_ts TIMESTAMPTZ NOT NULL,
+                    rows INTEGER NOT NULL,
+                    max_id BIGINT NOT NULL,
+                    last_modified TIMESTAMPTZ,
+                    PRIMARY KEY (ticker, resolution, bucket)
+                )
+                """
             )
-            rows = cur.fetchall()
-            return rows
+        logger.info("stock_rollups table ready")
 
-    def get_all_stocks(self):
+    def _update_rollups(self, cur, ids):
+        """Merge newly inserted stock_data rows (by id) into their rollup buckets."""
+        cur.execute(self._ROLLUP_UPSERT.format(where="s.id = ANY(%s)"), (list(ids),))
+
+    def rebuild_rollups(self, tickers=None):
         """
-        Get list of all stocks in database
+        Recompute stock_rollups from stock_data (all tickers by default)
+
+        Each ticker is rebuilt in its own transaction. Returns
+        {ticker: bars written}.
         """
-        with self.get_connection() as conn:
-            cur = self._dict_cursor(conn)
-            cur.execute("SELECT * FROM stocks ORDER BY ticker")
-            rows = cur.fetchall()
-            return rows
+        if tickers is None:
+            with self.get_connection() as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT DISTINCT ticker FROM stock_data ORDER BY ticker")
+                tickers = [r[0] for r in cur.fetchall()]
+
+        written = {}
+        for ticker in tickers:
+            with self.get_connection() as conn:
+                cur = conn.cursor()
+                # block concurrent inserts' rollup upserts until this commits,
+                # and wait for in-flight ones so the recompute sees their rows
+                cur.execute("LOCK TABLE stock_rollups IN SHARE ROW EXCLUSIVE MODE")
+                cur.execute("DELETE FROM stock_rollups WHERE ticker = %s", (ticker,))
+                cur.execute(self._ROLLUP_UPSERT.format(where="s.ticker = %s"), (ticker,))
+                written[ticker] = cur.rowcount
+            logger.info("Rebuilt rollups for %s (%d bars)", ticker, written[ticker])
+        return written
+
@@ -1,23 +1,128 @@
+import os
+
+import psycopg2
 from flask_cors import CORS
 
 from .services.repository import InMemoryRepository, FileRepository
 from .database import Database
+from .sqlite_database import SQLiteDatabase
+from .services.statements import DEFAULT_HOT_QUERIES
+from .services.cache import CachedDatabase, TTLCache
+from .services.events import EventBroker
+from .services.indicators import IndicatorEngine
+from .services.jobs import JobManager
+from .services.metrics import Metrics
+from .services.profiler import SamplingProfiler
 
 cors = CORS()
 
 
+def _memory_repo(config):
+    max_mb = config.get("MEMORY_REPO_MAX_MB")
+    return InMemoryRepository(
+        compact=config.get("MEMORY_REPO_COMPACT", True),
+        max_bytes=int(max_mb * 1024 * 1024) if max_mb else None,
+    )
+
+
 def build_repo(config):
     mode = config.get("PERSIST_MODE", "files")
     if mode == "memory":
-        return InMemoryRepository()
+        return _memory_repo(config)
     elif mode == "files":
-        return FileRepository(base_dir=config.get("DATA_DIR", "./data"))
+        return FileRepository(
+            base_dir=config.get("DATA_DIR", "./data"),
+            dataset_format=config.get("DATASET_FORMAT", "jsonl"),
+        )
     else:
         # Fallback if config is weird
-        return InMemoryRepository()
+        return _memory_repo(config)
+
+
+def build_metrics(config):
+    """Per-process Prometheus series behind /api/metrics (None when disabled)."""
+    return Metrics() if config.get("METRICS_ENABLED", True) else None
 
 
-def build_db(config):
-    """Create a Database instance wired to Neon/Postgres."""
+def build_profiler(config):
+    """Slow-request sampling profiler (None unless PROFILE_SLOW_REQUESTS)."""
+    if not config.get("PROFILE_SLOW_REQUESTS", False):
+        return None
+    return SamplingProfiler(
+        config.get("PROFILE_DIR", "./data/profiles"),
+        interval=config.get("PROFILE_INTERVAL_MS", 5.0) / 1000.0,
+        threshold=config.get("PROFILE_THRESHOLD_MS", 500.0) / 1000.0,
+    )
+
+
+def _postgres_db(config, metrics):
     db_url = config.get("DATABASE_URL")
-    return Database(db_url=db_url)
+    return Database(
+        db_url=db_url,
+        pooled=config.get("DB_POOL_ENABLED", True),
+        pool_min_size=config.get("DB_POOL_MIN_SIZE", 1),
+        pool_max_size=config.get("DB_POOL_MAX_SIZE", 10),
+        pool_timeout=config.get("DB_POOL_TIMEOUT", 5.0),
+        pool_max_idle=config.get("DB_POOL_MAX_IDLE", 300.0),
+        pool_max_lifetime=config.get("DB_POOL_MAX_LIFETIME", 1800.0),
+        pool_check_interval=config.get("DB_POOL_CHECK_INTERVAL", 30.0),
+        rollups=config.get("ROLLUPS_ENABLED", False),
+        notify=config.get("DB_NOTIFY_ENABLED", False),
+        notify_channel=config.get("STREAM_CHANNEL", "feather_events"),
+        prepare_statements=config.get("DB_PREPARED_STATEMENTS", False),
+        hot_queries=config.get("DB_PREPARED_QUERIES") or DEFAULT_HOT_QUERIES,
+        metrics=metrics,
+    )
+
+
+def _sqlite_db(config, metrics):
+    return SQLiteDatabase(
+        path=config.get("SQLITE_PATH", "./feather.db"),
+        mmap_size=config.get("SQLITE_MMAP_MB", 256) * 1024 * 1024,
+        cache_size=config.get("SQLITE_CACHE_MB", 64) * 1024 * 1024,
+        busy_timeout=config.get("SQLITE_BUSY_TIMEOUT", 5.0),
+        metrics=metrics,
+    )
+
+
+def build_db(config, metrics=None):
+    """Create a Database instance wired to Neon/Postgres or SQLite (optionally cached)."""
+    if config.get("DB_BACKEND", "postgres") == "sqlite":
+        db = _sqlite_db(config, metrics)
+    else:
+        db = _postgres_db(config, metrics)
+    if config.get("QUERY_CACHE_ENABLED", False):
+        cache = TTLCache(
+            max_entries=config.get("QUERY_CACHE_MAX_ENTRIES", 2048),
+            max_rows=config.get("QUERY_CACHE_MAX_ROWS", 100_000),
+            max_entry_rows=config.get("QUERY_CACHE_MAX_ENTRY_ROWS", 10_000),
+        )
+        db = CachedDatabase(db, cache, ttls=config.get("QUERY_CACHE_TTLS"))
+    return db
+
+
+def build_indicators(config):
+    """Per-worker indicator state for /stocks/<ticker>/indicators."""
+    return IndicatorEngine(max_entries=config.get("INDICATOR_CACHE_ENTRIES", 256))
+
+
+def build_events(config):
+    """LISTEN connection and subscriber registry behind /api/stocks/stream (None on SQLite)."""
+    if config.get("DB_BACKEND", "postgres") == "sqlite":
+        return None
+    db_url = config.get("DATABASE_URL")
+    return EventBroker(
+        lambda: psycopg2.connect(db_url),
+        channel=config.get("STREAM_CHANNEL", "feather_events"),
+        max_subscribers=config.get("STREAM_MAX_CLIENTS", 1000),
+    )
+
+
+def build_jobs(config):
+    """Background upload jobs; status files live in DATA_DIR/jobs."""
+    return JobManager(
+        os.path.join(config.get("DATA_DIR", "./data"), "jobs"),
+        workers=config.get("UPLOAD_WORKERS", 2),
+        max_pending=config.get("UPLOAD_QUEUE_DEPTH", 16),
+        ttl=config.get("UPLOAD_JOB_TTL_HOURS", 24.0) * 3600,
+    )
@@ -0,0 +1,381 @@
+"""
+Read-through query cache for app.database.Database.
+
+TTLCache is a thread-safe LRU with per-entry TTLs and tag-based
+invalidation. Besides the entry count it bounds the total number of cached
+rows, so a few wide history reads cannot pin hundreds of MB per worker. CachedDatabase wraps a Database, serves the read queries used
+by the stocks blueprint from the cache and drops the affected entries when
+one of the insert_* methods writes to the same ticker.
+
+The cache is per process, so a write made by another gunicorn worker only
+becomes visible here once the entry's TTL runs out.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sized
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+_MISSING = object()
+
+
+def row_count(value) -> int:
+    """Weight of a cached query result: the rows it holds, at least 1."""
+    if isinstance(value, dict):
+        # get_stock_data_batch maps ticker -> rows; anything else is one record
+        if value and all(
+            isinstance(v, Sized) and not isinstance(v, (str, bytes, dict)) for v in value.values()
+        ):
+            return max(1, sum(len(v) for v in value.values()))
+        return 1
+    if isinstance(value, Sized) and not isinstance(value, (str, bytes)):
+        return max(1, len(value))
+    return 1
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after a per-entry TTL.
+
+    ``max_entries`` caps the number of entries and ``max_rows`` the sum of
+    their row_count() weights; the least recently used entries are evicted
+    until both hold. Results heavier than ``max_entry_rows`` are returned to
+    the caller but never stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        max_rows: Optional[int] = None,
+        max_entry_rows: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        if max_rows is not None and max_rows < 1:
+            raise ValueError("max_rows must be >= 1")
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        if max_rows is not None:
+            max_entry_rows = min(max_entry_rows or max_rows, max_rows)
+        self.max_entry_rows = max_entry_rows
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires_at, value, tags, rows)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, Tuple[str, ...], int]]" = OrderedDict()
+        self._rows = 0
+        self._tags: Dict[str, set] = {}
+        # bumped on every invalidation so in-flight loads can't store stale data
+        self._generations: Dict[str, int] = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0,
+                       "oversized": 0}
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return default
+            if entry[0] <= self._clock():
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def set(self, key, value, ttl: float, tags: Iterable[str] = ()):
+        tags = tuple(tags)
+        with self._lock:
+            self._store(key, value, ttl, tags)
+
+    def get_or_load(self, key, loader: Callable[[], Any], ttl: float, tags: Iterable[str] = ()):
+        """Return the cached value for ``key`` or call ``loader`` and cache its result."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        tags = tuple(tags)
+        with self._lock:
+            before = [self._generations.get(t, 0) for t in tags]
+        value = loader()
+        with self._lock:
+            # skip the store if a writer invalidated one of our tags meanwhile
+            if before == [self._generations.get(t, 0) for t in tags]:
+                self._store(key, value, ttl, tags)
+        return value
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Drop every entry carrying ``tag``; returns how many were removed."""
+        with self._lock:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            keys = self._tags.pop(tag, ())
+            for key in list(keys):
+                self._remove(key)
+            if keys:
+                self._stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+            self._tags.clear()
+            self._generations.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "rows": self._rows,
+                "max_rows": self.max_rows,
+                "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    # lock must be held by the caller
+    def _store(self, key, value, ttl, tags):
+        if key in self._entries:
+            self._remove(key)
+        rows = row_count(value)
+        if self.max_entry_rows is not None and rows > self.max_entry_rows:
+            self._stats["oversized"] += 1
+            return
+        self._entries[key] = (self._clock() + ttl, value, tags, rows)
+        self._rows += rows
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries or (
+            self.max_rows is not None and self._rows > self.max_rows
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+    def _remove(self, key):
+        _, _, tags, rows = self._entries.pop(key)
+        self._rows -= rows
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+# Default TTLs (seconds) per cached Database method
+DEFAULT_TTLS = {
+    "get_all_stocks": 300.0,
+    "get_stock_data": 30.0,
+    "get_latest_prediction": 60.0,
+    "get_recent_news": 60.0,
+    "get_user_watchlist": 60.0,
+    "get_user_dashboard": 15.0,
+}
+
+
+class CachedDatabase:
+    """
+    Database proxy that caches read queries and invalidates them on writes.
+
+    Methods that are not wrapped here are forwarded to the underlying
+    Database unchanged.
+    """
+
+    def __init__(self, db, cache: TTLCache, ttls: Dict[str, float] | None = None):
+        self._db = db
+        self.cache = cache
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    def _cached(self, method, args, tags, ttl_key=None):
+        return self.cache.get_or_load(
+            (method, args),
+            lambda: getattr(self._db, method)(*args),
+            ttl=self.ttls[ttl_key or method],
+            tags=tags,
+        )
+
+    def _cached_version(self, method, args, table, ticker, data_method):
+        """
+        Cache a get_*_version result alongside the rows it describes.
+
+        Reloading a version drops the cached rows of that ticker, so an
+        ETag built from a fresh version is never paired with older rows.
+        """
+        value = self.cache.get((method, args), _MISSING)
+        if value is not _MISSING:
+            return value
+        self.cache.invalidate_tag(f"{table}_rows:{ticker}")
+        return self._cached(method, args, (f"{table}:{ticker}",), ttl_key=data_method)
+
+    def cache_stats(self):
+        return self.cache.stats()
+
+    # ============================================
+    # CACHED QUERIES
+    # ============================================
+
+    def get_all_stocks(self):
+        return self._cached("get_all_stocks", (), ("stocks",))
+
+    def get_stock_data(self, ticker, limit=30, start=None, end=None, interval=None):
+        return self._cached(
+            "get_stock_data",
+            (ticker, limit, start, end, interval),
+            (f"stock_data:{ticker}", f"stock_data_rows:{ticker}"),
+        )
+
+    def get_stock_data_batch(self, tickers, limit=30):
+        tickers = tuple(dict.fromkeys(tickers))
+        return self._cached(
+            "get_stock_data_batch",
+            (tickers, limit),
+            tuple(f"stock_data:{t}" for t in tickers),
+            ttl_key="get_stock_data",
+        )
+
+    def get_latest_prediction(self, ticker):
+        return self._cached(
+            "get_latest_prediction",
+            (ticker,),
+            (f"predictions:{ticker}", f"predictions_rows:{ticker}"),
+        )
+
+    def get_recent_news(self, ticker, limit=5, before=None):
+        return self._cached(
+            "get_recent_news",
+            (ticker, limit, before),
+            (f"news:{ticker}", f"news_rows:{ticker}"),
+        )
+
+    def get_user_watchlist(self, user_id):
+        return self._cached("get_user_watchlist", (user_id,), (f"watchlist:{user_id}",))
+
+    def get_user_dashboard(self, user_id, news_limit=3):
+        """
+        Cached per user, tagged with the user's watchlist and every ticker on
+        it, so a write to any of them (or to the watchlist) drops the entry.
+        The tickers come from the cached watchlist, which makes the tags known
+        before the query runs.
+        """
+        tickers = [row["ticker"] for row in self.get_user_watchlist(user_id)]
+        tags = [f"watchlist:{user_id}"]
+        for ticker in tickers:
+            tags += [f"stock_data:{ticker}", f"predictions:{ticker}", f"news:{ticker}"]
+        return self._cached("get_user_dashboard", (user_id, news_limit), tags)
+
+    def get_stock_data_version(self, ticker, limit=30, start=None, end=None, interval=None):
+        return self._cached_version(
+            "get_stock_data_version",
+            (ticker, limit, start, end, interval),
+            "stock_data",
+            ticker,
+            "get_stock_data",
+        )
+
+    def get_latest_prediction_version(self, ticker):
+        return self._cached_version(
+            "get_latest_prediction_version", (ticker,), "predictions", ticker,
+            "get_latest_prediction",
+        )
+
+    def get_recent_news_version(self, ticker, limit=5, before=None):
+        return self._cached_version(
+            "get_recent_news_version", (ticker, limit, before), "news", ticker, "get_recent_news"
+        )
+
+    # ============================================
+    # WRITES (invalidate on the way through)
+    # ============================================
+
+    def _invalidate(self, prefix, keys):
+        for key in set(keys):
+            self.cache.invalidate_tag(f"{prefix}:{key}")
+
+    @staticmethod
+    def _tap(items, field, seen):
+        """Pass ``items`` through while recording ``item[field]`` into ``seen``."""
+        for item in items:
+            seen.append(item[field])
+            yield item
+
+    def insert_stock_data(self, data):
+        try:
+            return self._db.insert_stock_data(data)
+        finally:
+            self._invalidate("stock_data", [data["ticker"]])
+
+    def insert_prediction(self, prediction):
+        try:
+            return self._db.insert_prediction(prediction)
+        finally:
+            self._invalidate("predictions", [prediction["ticker"]])
+
+    def insert_news_article(self, article):
+        try:
+            return self._db.insert_news_article(article)
+        finally:
+            self._invalidate("news", [article["ticker"]])
+
+    def add_to_watchlist(self, user_id, ticker):
+        try:
+            return self._db.add_to_watchlist(user_id, ticker)
+        finally:
+            self._invalidate("watchlist", [user_id])
+
+    def insert_stock_data_bulk(self, rows, page_size=1000):
+        tickers = []
+        try:
+            return self._db.insert_stock_data_bulk(self._tap(rows, "ticker", tickers), page_size)
+        finally:
+            self._invalidate("stock_data", tickers)
+
+    def insert_predictions_bulk(self, predictions, page_size=1000):
+        tickers = []
+        try:
+            return self._db.insert_predictions_bulk(
+                self._tap(predictions, "ticker", tickers), page_size
+            )
+        finally:
+            self._invalidate("predictions", tickers)
+
+    def insert_news_articles_bulk(self, articles, page_size=1000):
+        tickers = []
+        try:
+            return self._db.insert_news_articles_bulk(
+                self._tap(articles, "ticker", tickers), page_size
+            )
+        finally:
+            self._invalidate("news", tickers)
+
+    def copy_stock_data(self, batches, on_batch=None):
+        tickers = []
+
+        def tapped():
+            for batch in batches:
+                tickers.extend(batch[2])
+                yield batch
+
+        try:
+            return self._db.copy_stock_data(tapped(), on_batch)
+        finally:
+            self._invalidate("stock_data", tickers)
+
+    def add_to_watchlist_bulk(self, entries, page_size=1000):
+        users = []
+        try:
+            return self._db.add_to_watchlist_bulk(self._tap(entries, "user_id", users), page_size)
+        finally:
+            self._invalidate("watchlist", users)
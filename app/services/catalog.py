@@ -0,0 +1,139 @@
+"""
+Dataset catalog for FileRepository, backed by an embedded SQLite index.
+
+Replaces the whole-file manifest.json: lookups are primary-key reads,
+inserts are single-row transactions serialized by SQLite's file lock (safe
+across gunicorn workers), and listings are paginated and sorted in SQL.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+SORT_FIELDS = ("created_at", "name", "rows", "id")
+
+
+class DatasetCatalog:
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS datasets (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    rows INTEGER,
+                    record TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_datasets_created ON datasets(created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_datasets_name ON datasets(name)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # one connection per thread (and per process after a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.isolation_level = "IMMEDIATE"
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def add(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a dataset record; sets ``created_at`` if missing."""
+        record = {**record}
+        record.setdefault("created_at", time.time())
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO datasets (id, name, created_at, rows, record) VALUES (?, ?, ?, ?, ?)",
+                self._values(record),
+            )
+        return record
+
+    def get(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute(
+            "SELECT record FROM datasets WHERE id = ?", (dataset_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list(
+        self,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        sort: str = "created_at",
+        order: str = "asc",
+    ) -> List[Dict[str, Any]]:
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_FIELDS)}")
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be asc or desc")
+        direction = order.upper()
+        rows = self._connect().execute(
+            f"SELECT record FROM datasets ORDER BY {sort} {direction}, id {direction} "
+            "LIMIT ? OFFSET ?",
+            (-1 if limit is None else int(limit), int(offset)),
+        ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM datasets").fetchone()[0]
+
+    def migrate_manifest(self, manifest_path: str, base_dir: str) -> int:
+        """
+        One-time import of a legacy manifest.json. The file is renamed to
+        ``manifest.json.migrated`` afterwards; returns the number of records
+        imported (0 if there was nothing to migrate).
+        """
+        if not os.path.exists(manifest_path):
+            return 0
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+
+        records = []
+        for dataset_id, rec in manifest.items():
+            rec = {**rec, "id": rec.get("id", dataset_id)}
+            if "created_at" not in rec:
+                # best guess at the upload time: the data file's mtime
+                rows_path = os.path.join(base_dir, f"{rec['id']}.rows.jsonl")
+                try:
+                    rec["created_at"] = os.path.getmtime(rows_path)
+                except OSError:
+                    rec["created_at"] = os.path.getmtime(manifest_path)
+            records.append(self._values(rec))
+
+        with self._connect() as conn:
+            # OR IGNORE keeps this idempotent if two workers migrate at once
+            conn.executemany(
+                "INSERT OR IGNORE INTO datasets (id, name, created_at, rows, record) "
+                "VALUES (?, ?, ?, ?, ?)",
+                records,
+            )
+        try:
+            os.replace(manifest_path, manifest_path + ".migrated")
+        except FileNotFoundError:
+            pass
+        return len(records)
+
+    @staticmethod
+    def _values(record):
+        rows = (record.get("meta") or {}).get("rows")
+        return (
+            record["id"],
+            record.get("name", ""),
+            record["created_at"],
+            rows if isinstance(rows, int) else None,
+            json.dumps(record, ensure_ascii=False),
+        )
@@ -0,0 +1,217 @@
+"""
+Columnar on-disk format for stored datasets.
+
+A dataset is a directory holding one file per column plus ``schema.json``:
+
+- numeric and boolean columns are raw little-endian arrays (``<i>.bin``)
+  that are opened with np.memmap, so reads are zero-copy and only the
+  requested columns are touched
+- everything else (strings, mixed values) is JSON, one value per line
+  (``<i>.jsonl``) with a byte-offset sidecar (``<i>.jsonl.idx``, see
+  services.lineindex) so any row range can be read directly
+
+Chunks are appended as they arrive. When a later chunk does not fit a
+column's type (ints followed by floats, numbers followed by text), the
+column is widened in place.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .lineindex import LineIndexWriter, read_lines
+
+SCHEMA_FILE = "schema.json"
+OBJECT = "object"
+
+
+def storage_dtype(values: pd.Series) -> str:
+    """Storage type for a pandas column: a numpy dtype string or "object"."""
+    kind = values.dtype.kind
+    if kind == "i":
+        return "<i8"
+    if kind == "u":
+        return "<u8"
+    if kind == "f":
+        return "<f8"
+    if kind == "b":
+        return "|b1"
+    return OBJECT
+
+
+def merge_dtype(current: str, incoming: str) -> str:
+    """Narrowest storage type that can hold values of both types."""
+    if current == incoming:
+        return current
+    numeric = ("<i8", "<u8", "<f8")
+    if current in numeric and incoming in numeric:
+        return "<f8"
+    return OBJECT
+
+
+def _file_name(index: int, dtype: str) -> str:
+    return f"{index}.jsonl" if dtype == OBJECT else f"{index}.bin"
+
+
+def _dump_values(f: LineIndexWriter, values: Iterable[Any]):
+    f.write_lines([json.dumps(v, ensure_ascii=False) + "\n" for v in values])
+
+
+class ColumnarWriter:
+    """Appends DataFrame chunks to a columnar dataset directory."""
+
+    def __init__(self, path: str):
+        os.makedirs(path)
+        self.path = path
+        self.rows = 0
+        self.columns: List[Dict[str, Any]] = []
+        self._files: Dict[str, Any] = {}
+
+    def append(self, df: pd.DataFrame):
+        known = {c["name"] for c in self.columns}
+        for name in df.columns:
+            name = str(name)
+            if name not in known:
+                self._add_column(name, storage_dtype(df[name]) if not self.rows else OBJECT)
+                known.add(name)
+
+        n = int(df.shape[0])
+        for col in self.columns:
+            name = col["name"]
+            if name in df.columns:
+                values = df[name]
+            else:
+                values = pd.Series([None] * n, dtype=object)
+            dtype = merge_dtype(col["dtype"], storage_dtype(values))
+            if dtype != col["dtype"]:
+                self._convert(col, dtype)
+            self._write(col, values)
+        self.rows += n
+
+    def close(self) -> Dict[str, Any]:
+        """Flush all column files and write the schema; returns the schema."""
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+        schema = {"rows": self.rows, "columns": self.columns}
+        with open(os.path.join(self.path, SCHEMA_FILE), "w", encoding="utf-8") as f:
+            json.dump(schema, f)
+        return schema
+
+    def abort(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def _add_column(self, name: str, dtype: str):
+        index = len(self.columns)
+        col = {"name": name, "dtype": dtype, "file": _file_name(index, dtype)}
+        self.columns.append(col)
+        self._files[name] = self._open(col)
+        if self.rows:
+            # column first seen in a later chunk: earlier rows are null
+            _dump_values(self._files[name], [None] * self.rows)
+
+    def _open(self, col):
+        path = os.path.join(self.path, col["file"])
+        if col["dtype"] == OBJECT:
+            return LineIndexWriter(path)
+        return open(path, "wb")
+
+    def _write(self, col, values: pd.Series):
+        f = self._files[col["name"]]
+        if col["dtype"] == OBJECT:
+            _dump_values(f, values.tolist())
+        else:
+            np.ascontiguousarray(values.to_numpy(dtype=col["dtype"])).tofile(f)
+
+    def _convert(self, col, dtype: str):
+        """Rewrite the rows written so far with a wider type."""
+        self._files.pop(col["name"]).close()
+        old_path = os.path.join(self.path, col["file"])
+        existing = read_column(self.path, col, self.rows, mmap=False)
+        os.remove(old_path)
+
+        index = int(col["file"].split(".")[0])
+        col["dtype"] = dtype
+        col["file"] = _file_name(index, dtype)
+        f = self._open(col)
+        if dtype == OBJECT:
+            _dump_values(f, existing.tolist())
+        else:
+            existing.astype(dtype).tofile(f)
+        self._files[col["name"]] = f
+
+
+def read_schema(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, SCHEMA_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_column(path: str, col: Dict[str, Any], rows: int, mmap: bool = True) -> np.ndarray:
+    """Load one column; numeric columns are memory-mapped when ``mmap`` is set."""
+    file_path = os.path.join(path, col["file"])
+    if col["dtype"] == OBJECT:
+        out = np.empty(rows, dtype=object)
+        with open(file_path, "r", encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                out[i] = json.loads(line)
+        return out
+    if rows == 0:
+        return np.empty(0, dtype=col["dtype"])
+    if mmap:
+        return np.memmap(file_path, dtype=col["dtype"], mode="r", shape=(rows,))
+    return np.fromfile(file_path, dtype=col["dtype"], count=rows)
+
+
+def read_columns(path: str, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """Read the named columns (all by default), in schema order."""
+    schema = read_schema(path)
+    wanted = None if columns is None else set(columns)
+    return {
+        col["name"]: read_column(path, col, schema["rows"])
+        for col in schema["columns"]
+        if wanted is None or col["name"] in wanted
+    }
+
+
+def read_rows(
+    path: str, start: int, stop: int, columns: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Rows ``start:stop`` as ``{"columns": {...}, "total": n}``. Numeric
+    columns are sliced from their memory maps, JSON columns are read through
+    their offset index, so the cost does not depend on ``start``.
+    """
+    schema = read_schema(path)
+    total = schema["rows"]
+    start = max(0, min(start, total))
+    stop = max(start, min(stop, total))
+    wanted = None if columns is None else set(columns)
+    out: Dict[str, np.ndarray] = {}
+    for col in schema["columns"]:
+        if wanted is not None and col["name"] not in wanted:
+            continue
+        file_path = os.path.join(path, col["file"])
+        if col["dtype"] == OBJECT:
+            values = np.empty(stop - start, dtype=object)
+            for i, line in enumerate(read_lines(file_path, start, stop)):
+                values[i] = json.loads(line)
+            out[col["name"]] = values
+        else:
+            out[col["name"]] = read_column(path, col, total)[start:stop]
+    return {"columns": out, "total": total}
+
+
+def to_records(columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Turn a column mapping back into a list of row dicts with plain Python values."""
+    names = list(columns)
+    values = [columns[n].tolist() for n in names]
+    return [dict(zip(names, row)) for row in zip(*values)]
@@ -0,0 +1,259 @@
+"""
+Fan-out of database change notifications to streaming clients.
+
+Database.insert_* send ``pg_notify`` events (see Database._notify) that are
+delivered when the inserting transaction commits. EventBroker holds a single
+LISTEN connection per process. A background thread reads notifications from
+it and hands each one to the subscribers of its ticker, so any number of
+open /api/stocks/stream clients cost one database connection.
+
+Slow consumers get backpressure in the form of coalescing. A Subscription
+keeps at most one pending event per (type, ticker), and a newer event
+replaces the one still waiting. A client that falls behind therefore skips
+intermediate ticks and receives the latest state. Its buffer stays bounded
+by the number of tickers it follows, and it never holds up the listener or
+other clients.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import select
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL = "feather_events"
+
+
+class TooManySubscribers(Exception):
+    """Raised when the per-process subscriber limit has been reached."""
+
+
+class Event:
+    """One notification: its type, ticker and the JSON payload as sent by Postgres."""
+
+    __slots__ = ("type", "ticker", "data", "coalesced")
+
+    def __init__(self, type: str, ticker: str, data: str):
+        self.type = type
+        self.ticker = ticker
+        self.data = data
+        # events this one replaced while waiting in a subscriber's buffer
+        self.coalesced = 0
+
+    @classmethod
+    def parse(cls, payload: str) -> Optional["Event"]:
+        try:
+            obj = json.loads(payload)
+            return cls(str(obj["type"]), str(obj["ticker"]).upper(), payload)
+        except (ValueError, TypeError, KeyError):
+            return None
+
+
+class Subscription:
+    """A client's view of the broker: pending events for its tickers."""
+
+    def __init__(self, broker: "EventBroker", tickers: Iterable[str]):
+        self.broker = broker
+        self.tickers = tuple(dict.fromkeys(t.upper() for t in tickers))
+        self._cond = threading.Condition()
+        self._pending: "OrderedDict[Tuple[str, str], Event]" = OrderedDict()
+        self.closed = False
+        self.delivered = 0
+        self.coalesced = 0
+
+    def put(self, event: Event):
+        with self._cond:
+            key = (event.type, event.ticker)
+            previous = self._pending.pop(key, None)
+            if previous is not None:
+                # copy, the same Event instance is shared by all subscribers
+                replacement = Event(event.type, event.ticker, event.data)
+                replacement.coalesced = previous.coalesced + 1
+                event = replacement
+                self.coalesced += 1
+            self._pending[key] = event
+            self._cond.notify()
+
+    def get(self, timeout: float) -> List[Event]:
+        """Wait up to ``timeout`` seconds and return every pending event ([] on timeout)."""
+        with self._cond:
+            if not self._pending and not self.closed:
+                self._cond.wait(timeout)
+            events = list(self._pending.values())
+            self._pending.clear()
+            self.delivered += len(events)
+            return events
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self.broker.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EventBroker:
+    """
+    Per-process LISTEN connection plus in-memory per-ticker subscription sets.
+
+    The listener thread is started by the first subscribe() (after gunicorn
+    has forked) and reconnects with exponential backoff when the connection
+    drops. Notifications sent while it is disconnected are lost, so clients
+    should refetch the REST endpoints after a reconnect.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        channel: str = DEFAULT_CHANNEL,
+        max_subscribers: int = 1000,
+        poll_interval: float = 5.0,
+        max_backoff: float = 30.0,
+    ):
+        if not channel.replace("_", "").isalnum():
+            raise ValueError("channel must be a plain identifier")
+        self._connect = connect
+        self.channel = channel
+        self.max_subscribers = max_subscribers
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._reset_state()
+
+    def _reset_state(self):
+        self._pid = os.getpid()
+        self._subs: Dict[str, Set[Subscription]] = {}
+        self._count = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._connected = False
+        self._stats = {"received": 0, "dispatched": 0, "invalid": 0, "reconnects": 0}
+
+    # ============================================
+    # SUBSCRIPTIONS
+    # ============================================
+
+    def subscribe(self, tickers: Iterable[str]) -> Subscription:
+        sub = Subscription(self, tickers)
+        with self._lock:
+            if self._pid != os.getpid():
+                # inherited through fork(): the parent's thread does not exist here
+                self._reset_state()
+            if self._count >= self.max_subscribers:
+                raise TooManySubscribers(f"at most {self.max_subscribers} streams per worker")
+            for ticker in sub.tickers:
+                self._subs.setdefault(ticker, set()).add(sub)
+            self._count += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="event-broker", daemon=True
+                )
+                self._thread.start()
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            removed = False
+            for ticker in sub.tickers:
+                subs = self._subs.get(ticker)
+                if subs is not None and sub in subs:
+                    subs.discard(sub)
+                    removed = True
+                    if not subs:
+                        del self._subs[ticker]
+            if removed:
+                self._count -= 1
+
+    def publish(self, event: Event):
+        """Hand ``event`` to every subscriber of its ticker."""
+        with self._lock:
+            subs = list(self._subs.get(event.ticker, ()))
+            self._stats["dispatched"] += len(subs)
+        for sub in subs:
+            sub.put(event)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "subscribers": self._count,
+                "tickers": len(self._subs),
+                "connected": self._connected,
+            }
+
+    def close(self):
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=self.poll_interval + 1)
+
+    # ============================================
+    # LISTENER THREAD
+    # ============================================
+
+    def _run(self):
+        backoff = 0.5
+        while not self._stop.is_set():
+            try:
+                self._listen()
+                backoff = 0.5
+            except Exception as e:
+                self._connected = False
+                self._stats["reconnects"] += 1
+                logger.error("Event listener: %s; reconnecting in %.1fs", e, backoff)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    def _listen(self):
+        conn = self._connect()
+        try:
+            conn.autocommit = True
+            conn.cursor().execute(f"LISTEN {self.channel}")
+            self._connected = True
+            logger.info("Listening for '%s' notifications", self.channel)
+            while not self._stop.is_set():
+                ready, _, _ = select.select([conn], [], [], self.poll_interval)
+                if not ready:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self._receive(conn.notifies.pop(0).payload)
+        finally:
+            self._connected = False
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _receive(self, payload: str):
+        self._stats["received"] += 1
+        event = Event.parse(payload)
+        if event is None:
+            self._stats["invalid"] += 1
+            return
+        self.publish(event)
+
+
+def format_sse(event: Event, event_id: Optional[int] = None) -> str:
+    """One Server-Sent Events message (``event:``, optional ``id:``, ``data:``)."""
+    lines = [f"event: {event.type}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    data = event.data
+    if event.coalesced:
+        # the payload is a JSON object, splice the count in without re-encoding
+        data = f'{data[:-1].rstrip()},"coalesced":{event.coalesced}}}'
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
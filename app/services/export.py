@@ -0,0 +1,130 @@
+"""
+Streaming encoders for history exports.
+
+Each encoder turns an iterator of row batches (tuples in a fixed column
+order, see Database.iter_stock_data) into an iterator of byte chunks: one
+chunk per batch, nothing buffered across batches. gzip_stream compresses
+such an iterator on the fly. Together they keep an export's memory use at
+one batch however many rows it covers.
+
+Parquet needs pyarrow (optional, see requirements.txt); every batch becomes
+one row group.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import zlib
+from decimal import Decimal
+from typing import Callable, Iterable, Iterator, List, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency, see requirements.txt
+    pa = pq = None
+
+Batch = List[Tuple]
+
+# format -> (Content-Type, file extension)
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class ExportUnavailable(Exception):
+    """The requested format needs an optional dependency that is not installed."""
+
+
+def csv_stream(columns: Sequence[str], batches: Iterable[Batch]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows(
+            [v.isoformat() if hasattr(v, "isoformat") else v for v in row] for row in batch
+        )
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def ndjson_stream(
+    columns: Sequence[str], batches: Iterable[Batch], dumps: Callable[[object], str]
+) -> Iterator[bytes]:
+    """One JSON object per line, encoded with ``dumps`` (the app's JSON provider)."""
+    for batch in batches:
+        lines = [dumps(dict(zip(columns, row))) for row in batch]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last drain()."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._parts.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def _arrow_value(v):
+    return float(v) if isinstance(v, Decimal) else v
+
+
+def parquet_stream(columns: Sequence[str], batches: Iterable[Batch]) -> Iterator[bytes]:
+    if pa is None:
+        raise ExportUnavailable("parquet export requires pyarrow")
+    sink = _Sink()
+    writer = None
+    for batch in batches:
+        table = pa.table(
+            {name: [_arrow_value(row[i]) for row in batch] for i, name in enumerate(columns)}
+        )
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is None:
+        writer = pq.ParquetWriter(sink, pa.schema([(name, pa.null()) for name in columns]))
+    writer.close()
+    yield sink.drain()
+
+
+def encode(format, columns, batches, dumps) -> Iterator[bytes]:
+    """Byte chunks of ``batches`` in ``format`` (a key of FORMATS)."""
+    if format == "csv":
+        return csv_stream(columns, batches)
+    if format == "ndjson":
+        return ndjson_stream(columns, batches, dumps)
+    if format == "parquet":
+        return parquet_stream(columns, batches)
+    raise ValueError(f"unknown export format {format!r}")
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip ``chunks`` on the fly (a single gzip member)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
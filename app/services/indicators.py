@@ -0,0 +1,427 @@
+"""
+Technical indicators over OHLCV close prices.
+
+Two ways to compute the same numbers:
+
+- vectorized functions (``sma``, ``ema``, ``rsi``, ``macd``, ``bollinger``)
+  that take a whole close series as a NumPy array
+- small state objects that are seeded from a vectorized run and then
+  advanced one bar at a time
+
+IndicatorEngine combines them per ticker: the first request computes the
+series in one vectorized pass, later requests only fetch the bars newer
+than the last one seen and advance the saved state.
+
+Names follow the usual shorthand: ``sma20``, ``ema50``, ``rsi14``, ``bb20``
+(Bollinger bands, 2 standard deviations) and ``macd`` (12/26/9).
+EMA-based indicators depend on where the series starts; every computation
+reads enough extra history (see ``warmup``) for the visible values to
+match a computation over the full history to within about 0.03%.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+MAX_PERIOD = 500
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BOLLINGER_K = 2.0
+
+_NAME = re.compile(r"^(sma|ema|rsi|bb)(\d+)$")
+
+Spec = Tuple[str, int]
+
+
+class UnknownIndicator(ValueError):
+    """An indicator name could not be parsed."""
+
+
+def parse_names(names: Sequence[str]) -> List[Spec]:
+    """``["sma20", "macd"]`` -> ``[("sma", 20), ("macd", 0)]`` (deduplicated, in order)."""
+    specs: List[Spec] = []
+    for raw in names:
+        name = raw.strip().lower()
+        if name == "macd":
+            spec = ("macd", 0)
+        else:
+            m = _NAME.match(name)
+            if not m:
+                raise UnknownIndicator(f"unknown indicator {raw!r}")
+            period = int(m.group(2))
+            if not 2 <= period <= MAX_PERIOD:
+                raise UnknownIndicator(f"{raw}: period must be between 2 and {MAX_PERIOD}")
+            spec = (m.group(1), period)
+        if spec not in specs:
+            specs.append(spec)
+    return specs
+
+
+def spec_name(spec: Spec) -> str:
+    kind, period = spec
+    return "macd" if kind == "macd" else f"{kind}{period}"
+
+
+def output_columns(spec: Spec) -> List[str]:
+    """Response columns produced by one indicator."""
+    kind, name = spec[0], spec_name(spec)
+    if kind == "bb":
+        return [f"{name}_upper", f"{name}_middle", f"{name}_lower"]
+    if kind == "macd":
+        return ["macd", "macd_signal", "macd_hist"]
+    return [name]
+
+
+def warmup(spec: Spec) -> int:
+    """Bars read before the first returned one so the values are settled."""
+    kind, period = spec
+    if kind in ("sma", "bb"):
+        return period - 1
+    if kind == "ema":
+        return 4 * period
+    if kind == "rsi":
+        # Wilder smoothing (alpha = 1/n) converges about twice as slowly
+        return 8 * period
+    return 4 * (MACD_SLOW + MACD_SIGNAL)
+
+
+# ============================================
+# VECTORIZED
+# ============================================
+# Every function returns float arrays aligned with ``close``; values before
+# the indicator has a full window are NaN.
+
+
+def sma(close: np.ndarray, n: int) -> np.ndarray:
+    out = np.full(len(close), np.nan)
+    if len(close) >= n:
+        csum = np.cumsum(np.insert(close, 0, 0.0))
+        out[n - 1:] = (csum[n:] - csum[:-n]) / n
+    return out
+
+
+def _ewm(values: np.ndarray, alpha: float) -> np.ndarray:
+    # recursive form y[i] = a*x[i] + (1-a)*y[i-1], y[0] = x[0]
+    return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def ema(close: np.ndarray, n: int) -> np.ndarray:
+    out = _ewm(close, 2.0 / (n + 1))
+    out[: n - 1] = np.nan
+    return out
+
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        return np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + rs))
+
+
+def rsi(close: np.ndarray, n: int) -> np.ndarray:
+    out = np.full(len(close), np.nan)
+    if len(close) > n:
+        delta = np.diff(close)
+        avg_gain = _ewm(np.clip(delta, 0, None), 1.0 / n)
+        avg_loss = _ewm(np.clip(-delta, 0, None), 1.0 / n)
+        out[n:] = _rsi_from_averages(avg_gain, avg_loss)[n - 1:]
+    return out
+
+
+def macd(close: np.ndarray) -> Dict[str, np.ndarray]:
+    line = _ewm(close, 2.0 / (MACD_FAST + 1)) - _ewm(close, 2.0 / (MACD_SLOW + 1))
+    signal = _ewm(line, 2.0 / (MACD_SIGNAL + 1))
+    hist = line - signal
+    line[: MACD_SLOW - 1] = np.nan
+    ready = MACD_SLOW + MACD_SIGNAL - 2
+    signal[:ready] = np.nan
+    hist[:ready] = np.nan
+    return {"macd": line, "macd_signal": signal, "macd_hist": hist}
+
+
+def bollinger(close: np.ndarray, n: int, k: float = BOLLINGER_K) -> Dict[str, np.ndarray]:
+    middle = sma(close, n)
+    std = np.full(len(close), np.nan)
+    if len(close) >= n:
+        windows = np.lib.stride_tricks.sliding_window_view(close, n)
+        std[n - 1:] = windows.std(axis=1)
+    name = f"bb{n}"
+    return {
+        f"{name}_upper": middle + k * std,
+        f"{name}_middle": middle,
+        f"{name}_lower": middle - k * std,
+    }
+
+
+def compute(close: np.ndarray, spec: Spec) -> Dict[str, np.ndarray]:
+    """Output columns for one indicator over a whole series."""
+    kind, period = spec
+    if kind == "sma":
+        return {spec_name(spec): sma(close, period)}
+    if kind == "ema":
+        return {spec_name(spec): ema(close, period)}
+    if kind == "rsi":
+        return {spec_name(spec): rsi(close, period)}
+    if kind == "bb":
+        return bollinger(close, period)
+    return macd(close)
+
+
+# ============================================
+# INCREMENTAL
+# ============================================
+# ``seed(close)`` runs the vectorized version once and keeps what is needed
+# to continue; ``update(x)`` advances by one bar and returns that bar's
+# output columns.
+
+
+class _Window:
+    def __init__(self, spec: Spec):
+        self.spec = spec
+        self.n = spec[1]
+        self.window: deque = deque(maxlen=self.n)
+
+    def seed(self, close: np.ndarray) -> Dict[str, np.ndarray]:
+        self.window.extend(close[-self.n:].tolist())
+        return compute(close, self.spec)
+
+    def update(self, x: float) -> Dict[str, float]:
+        self.window.append(x)
+        if len(self.window) < self.n:
+            return dict.fromkeys(output_columns(self.spec), np.nan)
+        values = np.fromiter(self.window, dtype=np.float64, count=self.n)
+        mean = values.mean()
+        if self.spec[0] == "sma":
+            return {spec_name(self.spec): mean}
+        std = values.std()
+        name = spec_name(self.spec)
+        return {
+            f"{name}_upper": mean + BOLLINGER_K * std,
+            f"{name}_middle": mean,
+            f"{name}_lower": mean - BOLLINGER_K * std,
+        }
+
+
+class _EMA:
+    def __init__(self, spec: Spec):
+        self.spec = spec
+        self.n = spec[1]
+        self.alpha = 2.0 / (self.n + 1)
+        self.value = None
+        self.count = 0
+
+    def seed(self, close: np.ndarray) -> Dict[str, np.ndarray]:
+        if len(close):
+            self.value = float(_ewm(close, self.alpha)[-1])
+        self.count = len(close)
+        return compute(close, self.spec)
+
+    def update(self, x: float) -> Dict[str, float]:
+        self.value = x if self.value is None else self.alpha * x + (1 - self.alpha) * self.value
+        self.count += 1
+        return {spec_name(self.spec): self.value if self.count >= self.n else np.nan}
+
+
+class _RSI:
+    def __init__(self, spec: Spec):
+        self.spec = spec
+        self.n = spec[1]
+        self.last = None
+        self.avg_gain = self.avg_loss = None
+        self.count = 0
+
+    def seed(self, close: np.ndarray) -> Dict[str, np.ndarray]:
+        if len(close):
+            self.last = float(close[-1])
+        if len(close) > 1:
+            delta = np.diff(close)
+            self.avg_gain = float(_ewm(np.clip(delta, 0, None), 1.0 / self.n)[-1])
+            self.avg_loss = float(_ewm(np.clip(-delta, 0, None), 1.0 / self.n)[-1])
+        self.count = len(close)
+        return compute(close, self.spec)
+
+    def update(self, x: float) -> Dict[str, float]:
+        name = spec_name(self.spec)
+        self.count += 1
+        if self.last is None:
+            self.last = x
+            return {name: np.nan}
+        delta = x - self.last
+        self.last = x
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        if self.avg_gain is None:
+            self.avg_gain, self.avg_loss = gain, loss
+        else:
+            a = 1.0 / self.n
+            self.avg_gain = a * gain + (1 - a) * self.avg_gain
+            self.avg_loss = a * loss + (1 - a) * self.avg_loss
+        if self.count <= self.n:
+            return {name: np.nan}
+        return {name: float(_rsi_from_averages(np.float64(self.avg_gain), np.float64(self.avg_loss)))}
+
+
+class _MACD:
+    def __init__(self, spec: Spec):
+        self.spec = spec
+        self.fast = _EMA(("ema", MACD_FAST))
+        self.slow = _EMA(("ema", MACD_SLOW))
+        self.signal = None
+        self.count = 0
+
+    def seed(self, close: np.ndarray) -> Dict[str, np.ndarray]:
+        if len(close):
+            fast = _ewm(close, self.fast.alpha)
+            slow = _ewm(close, self.slow.alpha)
+            self.fast.value, self.slow.value = float(fast[-1]), float(slow[-1])
+            self.signal = float(_ewm(fast - slow, 2.0 / (MACD_SIGNAL + 1))[-1])
+        self.count = len(close)
+        return macd(close)
+
+    def update(self, x: float) -> Dict[str, float]:
+        self.fast.update(x)
+        self.slow.update(x)
+        self.count += 1
+        line = self.fast.value - self.slow.value
+        a = 2.0 / (MACD_SIGNAL + 1)
+        self.signal = line if self.signal is None else a * line + (1 - a) * self.signal
+        ready = self.count >= MACD_SLOW + MACD_SIGNAL - 1
+        return {
+            "macd": line if self.count >= MACD_SLOW else np.nan,
+            "macd_signal": self.signal if ready else np.nan,
+            "macd_hist": line - self.signal if ready else np.nan,
+        }
+
+
+_STATES = {"sma": _Window, "bb": _Window, "ema": _EMA, "rsi": _RSI, "macd": _MACD}
+
+
+def make_state(spec: Spec):
+    return _STATES[spec[0]](spec)
+
+
+# ============================================
+# ENGINE
+# ============================================
+
+
+def _float(value) -> Optional[float]:
+    if value is None:
+        return None
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+class _Entry:
+    """Saved state and recent output rows for one ticker."""
+
+    def __init__(self, specs: List[Spec], depth: int):
+        self.specs = specs
+        self.depth = depth
+        self.states = [make_state(s) for s in specs]
+        self.rows: deque = deque(maxlen=depth)
+        self.last_ts = None
+        self.lock = threading.Lock()
+
+
+class IndicatorEngine:
+    """
+    Per-ticker indicator cache (LRU, ``max_entries`` tickers).
+
+    ``series(db, ticker, specs, limit)`` returns the latest ``limit`` rows
+    of ``{"timestamp", "close", <indicator columns>}``, newest first, like
+    /history. Bars are assumed to arrive in time order: a bar inserted
+    before the last one already seen is picked up on the next full
+    recompute (when the entry is evicted or asked for more rows or
+    indicators than it holds).
+    """
+
+    MIN_DEPTH = 200
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.full_runs = 0
+        self.incremental_runs = 0
+
+    def series(self, db, ticker: str, specs: List[Spec], limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is not None:
+                self._entries.move_to_end(ticker)
+        if entry is None or limit > entry.depth or not set(specs) <= set(entry.specs):
+            wanted = list(specs)
+            if entry is not None:
+                wanted += [s for s in entry.specs if s not in wanted]
+            entry = _Entry(wanted, max(limit, self.MIN_DEPTH, entry.depth if entry else 0))
+            with entry.lock:
+                self._full(db, ticker, entry)
+                rows = list(entry.rows)[-limit:]
+            self._store(ticker, entry)
+        else:
+            with entry.lock:
+                if not self._incremental(db, ticker, entry):
+                    self._full(db, ticker, entry)
+                rows = list(entry.rows)[-limit:]
+
+        columns = ["timestamp", "close"] + [c for spec in specs for c in output_columns(spec)]
+        return [{c: row[c] for c in columns} for row in reversed(rows)]
+
+    def _store(self, ticker, entry):
+        with self._lock:
+            self._entries[ticker] = entry
+            self._entries.move_to_end(ticker)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _full(self, db, ticker, entry: _Entry):
+        self.full_runs += 1
+        fetch = entry.depth + max(warmup(s) for s in entry.specs)
+        bars = list(reversed(db.get_stock_data(ticker, limit=fetch)))
+        close = np.array([float(b["close"]) for b in bars], dtype=np.float64)
+
+        entry.states = [make_state(s) for s in entry.specs]
+        outputs: Dict[str, np.ndarray] = {}
+        for state in entry.states:
+            outputs.update(state.seed(close))
+
+        entry.rows.clear()
+        for i in range(max(0, len(bars) - entry.depth), len(bars)):
+            row = {"timestamp": bars[i]["timestamp"], "close": float(close[i])}
+            for name, values in outputs.items():
+                row[name] = _float(values[i])
+            entry.rows.append(row)
+        entry.last_ts = bars[-1]["timestamp"] if bars else None
+
+    def _incremental(self, db, ticker, entry: _Entry) -> bool:
+        """Advance by the bars newer than ``last_ts``; False if a full run is needed."""
+        if entry.last_ts is None:
+            return False
+        fetched = db.get_stock_data(ticker, limit=entry.depth + 1, start=entry.last_ts)
+        if len(fetched) > entry.depth:
+            return False
+        new = [b for b in reversed(fetched) if b["timestamp"] > entry.last_ts]
+        if not new:
+            return True
+        self.incremental_runs += 1
+        for bar in new:
+            x = float(bar["close"])
+            row = {"timestamp": bar["timestamp"], "close": x}
+            for state in entry.states:
+                row.update({k: _float(v) for k, v in state.update(x).items()})
+            entry.rows.append(row)
+        entry.last_ts = new[-1]["timestamp"]
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = len(self._entries)
+        return {
+            "entries": entries,
+            "full_runs": self.full_runs,
+            "incremental_runs": self.incremental_runs,
+        }
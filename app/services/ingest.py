@@ -0,0 +1,75 @@
+"""
+Streaming CSV ingestion into a dataset Repository.
+
+The CSV is parsed ``chunk_rows`` rows at a time and each chunk is written
+straight to a DatasetWriter. Row count, columns and preview are collected
+along the way, so memory stays bounded by one chunk whatever the size of
+the upload.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+DEFAULT_CHUNK_ROWS = 50_000
+PREVIEW_ROWS = 5
+
+
+class CSVIngestError(ValueError):
+    """The upload could not be parsed as CSV."""
+
+
+def ingest_csv(
+    stream,
+    filename: str,
+    repo,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    on_chunk: Optional[Callable[[int], None]] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Parse ``stream`` (a binary file object) chunk by chunk into ``repo``.
+
+    Returns ``(dataset_id, summary)`` where summary is the stored meta plus a
+    short preview. ``on_chunk`` is called with the running row count after
+    every chunk and may raise to stop the ingestion (the partial dataset is
+    discarded).
+    """
+    try:
+        reader = pd.read_csv(stream, chunksize=chunk_rows)
+    except Exception as e:
+        raise CSVIngestError(str(e)) from e
+
+    rows = 0
+    columns = None
+    preview = []
+
+    with repo.open_writer(filename) as writer:
+        with reader:
+            while True:
+                try:
+                    chunk = next(reader)
+                except StopIteration:
+                    break
+                except Exception as e:
+                    raise CSVIngestError(str(e)) from e
+
+                if columns is None:
+                    columns = [str(c) for c in chunk.columns]
+                if len(preview) < PREVIEW_ROWS:
+                    preview.extend(chunk.head(PREVIEW_ROWS - len(preview)).to_dict(orient="records"))
+
+                writer.write_frame(chunk)
+                rows += int(chunk.shape[0])
+                if on_chunk is not None:
+                    on_chunk(rows)
+
+        meta = {
+            "rows": rows,
+            "columns": columns or [],
+            "filename": filename,
+        }
+        dataset_id = writer.commit(meta)
+
+    return dataset_id, {**meta, "preview": preview}
@@ -0,0 +1,286 @@
+"""
+Background upload jobs.
+
+An async upload is spooled to ``<DATA_DIR>/jobs/<job_id>.upload`` and queued
+on a bounded thread pool. The request returns right away. A job's status
+lives in ``<job_id>.json`` next to the spool file. The JSON is rewritten
+atomically after every parsed chunk, so any gunicorn worker can answer
+GET /api/upload/jobs/<id>, not only the one running the job. Cancellation
+works the same way: a ``<job_id>.cancel`` marker file is checked before the
+job starts and after each chunk. Status files of finished jobs are deleted
+once they are ``ttl`` seconds old.
+
+The pool uses threads, not processes, because the job writes to the same
+dataset repository the app reads from, and that includes the per-process
+memory repository. Most parsing time is spent in pandas' C parser anyway.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+_JOB_ID = re.compile(r"^job_[0-9a-f]{32}$")
+
+# task(file, on_chunk) -> (dataset_id, summary); on_chunk(rows) after every chunk
+Task = Callable[[Any, Callable[[int], None]], Tuple[str, Dict[str, Any]]]
+
+
+class QueueFull(Exception):
+    """Raised when UPLOAD_QUEUE_DEPTH jobs are already queued or running here."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once its cancellation was requested."""
+
+
+class JobManager:
+    """
+    Spools uploads, runs them on ``workers`` threads and records their status.
+
+    At most ``max_pending`` jobs (queued plus running, and uploads still
+    being spooled) are accepted per process; submit() raises QueueFull
+    beyond that.
+    """
+
+    def __init__(
+        self, directory: str, workers: int = 2, max_pending: int = 16, ttl: float = 86400.0
+    ):
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.directory = directory
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._reset_state()
+
+    def _reset_state(self):
+        # the executor's threads do not survive fork(), start over in the child
+        self._pid = os.getpid()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[str, Any] = {}
+        # slots taken by uploads that are still being spooled
+        self._spooling = 0
+
+    def _path(self, job_id: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.{ext}")
+
+    # ============================================
+    # SUBMIT / STATUS / CANCEL
+    # ============================================
+
+    def submit(self, source, filename: str, task: Task) -> Dict[str, Any]:
+        """
+        Spool ``source`` (a file object or werkzeug FileStorage) and queue
+        ``task`` on it. Returns the new job's status.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset_state()
+            pending = self._spooling + sum(1 for f in self._futures.values() if not f.done())
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} uploads are already being processed, retry later")
+            # hold the slot while spooling, or concurrent uploads would all
+            # pass the check above before any of them is queued
+            self._spooling += 1
+
+        # copy outside the lock, other requests can keep checking the queue
+        job_id = f"job_{uuid.uuid4().hex}"
+        spool = self._path(job_id, "upload")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if hasattr(source, "save"):
+                source.save(spool)
+            else:
+                with open(spool, "wb") as out:
+                    shutil.copyfileobj(source, out)
+
+            job = {
+                "job_id": job_id,
+                "state": QUEUED,
+                "filename": filename,
+                "bytes_total": os.path.getsize(spool),
+                "bytes_processed": 0,
+                "rows_processed": 0,
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "dataset_id": None,
+                "summary": None,
+                "error": None,
+            }
+            self._save(job)
+        except BaseException:
+            with self._lock:
+                self._spooling -= 1
+            for ext in ("upload", "json"):
+                try:
+                    os.remove(self._path(job_id, ext))
+                except FileNotFoundError:
+                    pass
+            raise
+
+        with self._lock:
+            self._spooling -= 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="upload-job"
+                )
+            self._futures = {k: f for k, f in self._futures.items() if not f.done()}
+            self._futures[job_id] = self._executor.submit(self._run, job, spool, task)
+        return self._view(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a job (progress and ETA while running), None if unknown."""
+        job = self._load(job_id)
+        return self._view(job) if job is not None else None
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Request cancellation; returns the job's status (None if unknown).
+
+        A job queued in this process is cancelled immediately. Elsewhere the
+        job stops at its next chunk, or before it starts if it is still
+        queued. Finished jobs are returned unchanged.
+        """
+        job = self._load(job_id)
+        if job is None or job["state"] in FINISHED:
+            return self._view(job) if job is not None else None
+
+        with open(self._path(job_id, "cancel"), "w"):
+            pass
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            self._finish(job, CANCELLED, error="cancelled")
+        return self.get(job_id)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    # ============================================
+    # WORKER
+    # ============================================
+
+    def _run(self, job, spool, task: Task):
+        job_id = job["job_id"]
+        try:
+            if os.path.exists(self._path(job_id, "cancel")):
+                raise JobCancelled()
+            job["state"] = RUNNING
+            job["started_at"] = time.time()
+            self._save(job)
+
+            with open(spool, "rb") as f:
+
+                def on_chunk(rows):
+                    job["rows_processed"] = rows
+                    job["bytes_processed"] = min(f.tell(), job["bytes_total"])
+                    self._save(job)
+                    if os.path.exists(self._path(job_id, "cancel")):
+                        raise JobCancelled()
+
+                dataset_id, summary = task(f, on_chunk)
+
+            job["bytes_processed"] = job["bytes_total"]
+            job["rows_processed"] = summary.get("rows", job["rows_processed"])
+            job["dataset_id"] = dataset_id
+            job["summary"] = summary
+            self._finish(job, SUCCEEDED)
+        except JobCancelled:
+            self._finish(job, CANCELLED, error="cancelled")
+        except Exception as e:
+            logger.exception("Upload job %s failed: %s", job_id, e)
+            self._finish(job, FAILED, error=str(e))
+
+    def _finish(self, job, state, error=None):
+        job["state"] = state
+        job["error"] = error
+        job["finished_at"] = time.time()
+        self._save(job)
+        for ext in ("upload", "cancel"):
+            try:
+                os.remove(self._path(job["job_id"], ext))
+            except FileNotFoundError:
+                pass
+        self._expire()
+
+    def _expire(self):
+        """Delete status files of jobs that finished more than ``ttl`` seconds ago."""
+        cutoff = time.time() - self.ttl
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        for name in names:
+            job_id, ext = os.path.splitext(name)
+            if ext != ".json" or not _JOB_ID.match(job_id):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                # a status file is rewritten on every update, so an old one
+                # is either finished or stuck in the queue: check which
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                job = self._load(job_id)
+                if job is not None and job["state"] in FINISHED:
+                    os.remove(path)
+            except (OSError, ValueError):
+                # removed or being replaced by another worker
+                continue
+
+    # ============================================
+    # STATUS FILES
+    # ============================================
+
+    def _save(self, job):
+        path = self._path(job["job_id"], "json")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(job, f, default=str)
+        os.replace(tmp, path)
+
+    def _load(self, job_id):
+        if not _JOB_ID.match(job_id):
+            return None
+        try:
+            with open(self._path(job_id, "json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _view(job):
+        """Public status: the stored fields plus progress and ETA."""
+        total = job["bytes_total"]
+        done = job["bytes_processed"]
+        view = dict(job)
+        view["progress"] = round(done / total, 4) if total else (
+            1.0 if job["state"] == SUCCEEDED else 0.0
+        )
+        view["eta_seconds"] = None
+        if job["state"] == RUNNING and done and job["started_at"]:
+            elapsed = time.time() - job["started_at"]
+            view["eta_seconds"] = round(elapsed * (total - done) / done, 1)
+        return view
@@ -0,0 +1,122 @@
+"""
+JSON providers for the Flask app (selected with the JSON_PROVIDER setting).
+
+``fast`` (default) encodes with orjson when it is installed and falls back
+to the standard library otherwise; both paths produce the same output:
+
+- Decimal (the DECIMAL price columns) as a JSON number
+- datetime/date as ISO-8601 (RFC 3339) strings
+- NumPy/pandas scalars and arrays as plain numbers/lists, NaN as null
+- ResultSet as a list of objects, built straight from its tuples
+- keys in insertion order (SQL column order) instead of sorted
+
+``flask`` keeps Flask's DefaultJSONProvider formatting (RFC 822 dates,
+Decimal as string, sorted keys) and only adds ResultSet/NumPy support.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+from .resultset import ResultSet
+
+try:
+    import orjson
+except ImportError:  # optional dependency, see requirements.txt
+    orjson = None
+
+
+def _records(o: ResultSet):
+    columns = o.columns
+    return [dict(zip(columns, row)) for row in o.rows]
+
+
+def _fast_default(o: Any) -> Any:
+    """Types neither orjson nor json handle on their own."""
+    if isinstance(o, ResultSet):
+        return _records(o)
+    if isinstance(o, Decimal):
+        return float(o) if o.is_finite() else None
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, np.generic):
+        value = o.item()
+        return None if isinstance(value, float) and math.isnan(value) else value
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if hasattr(o, "isoformat"):  # pandas Timestamp and friends
+        return o.isoformat()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _scrub(o: Any) -> Any:
+    """Replace float NaN/inf with None (stdlib path; orjson already does)."""
+    if isinstance(o, float):
+        return o if math.isfinite(o) else None
+    if isinstance(o, dict):
+        return {k: _scrub(v) for k, v in o.items()}
+    if isinstance(o, ResultSet):
+        return _scrub(_records(o))
+    if isinstance(o, (list, tuple)):
+        return [_scrub(v) for v in o]
+    return o
+
+
+class FastJSONProvider(JSONProvider):
+    mimetype = "application/json"
+    compact: bool | None = None
+
+    def _dumpb(self, obj: Any, indent: bool = False) -> bytes:
+        if orjson is not None:
+            option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_fast_default, option=option)
+        kwargs = dict(
+            default=_fast_default,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=2 if indent else None,
+            separators=None if indent else (",", ":"),
+        )
+        try:
+            text = json.dumps(obj, **kwargs)
+        except ValueError:
+            # NaN somewhere: encode once more with it replaced by null
+            text = json.dumps(_scrub(obj), **kwargs)
+        return text.encode("utf-8")
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self._dumpb(obj, indent=bool(kwargs.get("indent"))).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dumpb(obj, indent) + b"\n", mimetype=self.mimetype)
+
+
+class FlaskJSONProvider(DefaultJSONProvider):
+    @staticmethod
+    def default(o: Any) -> Any:
+        if isinstance(o, ResultSet):
+            return _records(o)
+        if isinstance(o, np.generic):
+            return o.item()
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        return DefaultJSONProvider.default(o)
+
+
+PROVIDERS = {"fast": FastJSONProvider, "flask": FlaskJSONProvider}
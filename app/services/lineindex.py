@@ -0,0 +1,102 @@
+"""
+Byte-offset sidecar indexes for line-oriented files (JSONL).
+
+``<file>.idx`` holds ``n + 1`` little-endian uint64 offsets: line ``i`` of
+the data file spans bytes ``idx[i]:idx[i + 1]``. With the index, rows
+``start:stop`` are read with one seek and one read, whatever ``start`` is.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import List
+
+import numpy as np
+
+INDEX_DTYPE = "<u8"
+
+
+def index_path(path: str) -> str:
+    return path + ".idx"
+
+
+class LineIndexWriter:
+    """Writes text lines to ``path`` while recording their offsets in ``path.idx``."""
+
+    def __init__(self, path: str, index: str | None = None):
+        self.path = path
+        self.index = index or index_path(path)
+        self._f = open(path, "wb")
+        self._idx = open(self.index, "wb")
+        self._pos = 0
+        np.zeros(1, dtype=INDEX_DTYPE).tofile(self._idx)
+
+    def write_lines(self, lines: List[str]):
+        """Append lines; each must already end with a newline."""
+        if not lines:
+            return
+        data = [line.encode("utf-8") for line in lines]
+        ends = np.cumsum(np.fromiter(map(len, data), dtype=INDEX_DTYPE, count=len(data)))
+        ends += np.uint64(self._pos)
+        ends.tofile(self._idx)
+        self._f.write(b"".join(data))
+        self._pos = int(ends[-1])
+
+    def close(self):
+        self._f.close()
+        self._idx.close()
+
+
+def build_line_index(path: str, index: str | None = None) -> str:
+    """Scan an existing file once and write its offset index (for legacy files)."""
+    index = index or index_path(path)
+    # concurrent first reads (threads or worker processes) each build their own copy
+    tmp = f"{index}.{os.getpid()}.{threading.get_ident()}.tmp"
+    offsets = [0]
+    pos = 0
+    try:
+        with open(path, "rb") as f, open(tmp, "wb") as out:
+            for line in f:
+                pos += len(line)
+                offsets.append(pos)
+                if len(offsets) >= 65536:
+                    np.asarray(offsets, dtype=INDEX_DTYPE).tofile(out)
+                    offsets = []
+            np.asarray(offsets, dtype=INDEX_DTYPE).tofile(out)
+        os.replace(tmp, index)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    return index
+
+
+def line_count(path: str, index: str | None = None) -> int:
+    index = index or index_path(path)
+    if not os.path.exists(index):
+        build_line_index(path, index)
+    return os.path.getsize(index) // np.dtype(INDEX_DTYPE).itemsize - 1
+
+
+def read_lines(path: str, start: int, stop: int, index: str | None = None) -> List[str]:
+    """Lines ``start:stop`` of ``path`` (clamped to the file), via the offset index."""
+    index = index or index_path(path)
+    total = line_count(path, index)
+    start = max(0, min(start, total))
+    stop = max(start, min(stop, total))
+    if start == stop:
+        return []
+    offsets = np.memmap(index, dtype=INDEX_DTYPE, mode="r", shape=(total + 1,))
+    begin, end = int(offsets[start]), int(offsets[stop])
+    with open(path, "rb") as f:
+        f.seek(begin)
+        data = f.read(end - begin)
+    # split on b"\n" only: JSON written with ensure_ascii=False may contain
+    # other characters that str.splitlines() would treat as line breaks
+    lines = data.split(b"\n")
+    if data.endswith(b"\n"):
+        lines.pop()
+    return [line.decode("utf-8") for line in lines]
@@ -0,0 +1,189 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Metrics holds every series the app records: request latency, status and
+payload sizes per route (fed by the hooks in app.api.metrics), query latency
+and row counts per Database method, and connection acquire time (fed by
+app.database.Database). render() returns the text served at /api/metrics.
+
+Values live in the worker process. Under gunicorn with several workers each
+scrape sees one worker, so give every worker its own scrape target (or run
+one worker per container) when the numbers must add up.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+# rows
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence) -> Tuple:
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} takes labels {self.label_names}")
+        return tuple(str(v) for v in labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_labels(self.label_names, key)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *labels, value: float):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> [per-bucket counts (not cumulative), sum, count]
+        self._values: Dict[Tuple, list] = {}
+
+    def observe(self, *labels, value: float):
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def count(self, *labels) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return entry[2] if entry else 0
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, [list(e[0]), e[1], e[2]]) for key, e in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.label_names, key)} {count}"
+
+
+class Metrics:
+    """The app's metric series, created once per process (see build_metrics)."""
+
+    def __init__(self, prefix: str = "feather"):
+        p = prefix
+        self.http_requests = Counter(
+            f"{p}_http_requests_total", "HTTP requests by route and status",
+            ("method", "route", "status"),
+        )
+        self.http_latency = Histogram(
+            f"{p}_http_request_duration_seconds",
+            "Time until the response (or the first byte of a streamed one) is ready",
+            ("method", "route"),
+        )
+        self.request_bytes = Histogram(
+            f"{p}_http_request_size_bytes", "Request body size", ("route",), SIZE_BUCKETS,
+        )
+        self.response_bytes = Histogram(
+            f"{p}_http_response_size_bytes", "Response body size (streamed responses excluded)",
+            ("route",), SIZE_BUCKETS,
+        )
+        self.query_latency = Histogram(
+            f"{p}_db_query_duration_seconds", "Query execution time by Database method",
+            ("query",),
+        )
+        self.query_rows = Histogram(
+            f"{p}_db_query_rows", "Rows returned by Database method", ("query",), ROW_BUCKETS,
+        )
+        self.query_errors = Counter(
+            f"{p}_db_query_errors_total", "Failed queries by Database method", ("query",),
+        )
+        self.connection_acquire = Histogram(
+            f"{p}_db_connection_acquire_seconds",
+            "Time to get a database connection (pool checkout or new connection)",
+        )
+        self.pool = Gauge(
+            f"{p}_db_pool_connections", "Pooled database connections by state", ("state",),
+        )
+        self.cache = Gauge(
+            f"{p}_query_cache", "Query cache counters and size at scrape time", ("stat",),
+        )
+
+    def series(self) -> List[_Metric]:
+        return [m for m in vars(self).values() if isinstance(m, _Metric)]
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.series():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,254 @@
+"""
+Parallel OHLCV CSV loader for the stock_data table.
+
+The pipeline has four stages:
+
+1. split_csv cuts the file into line-aligned chunks of about ``chunk_bytes``
+   and repeats the header on each one.
+2. parse_chunk runs in a process pool. It parses a chunk with pandas,
+   normalizes timestamps to UTC and checks the OHLC invariants on whole
+   columns (high >= open/close >= low, volume >= 0, no missing values).
+   It returns the valid rows as CSV text ready for COPY.
+3. Database.copy_stock_data streams each chunk into a temporary staging
+   table with COPY and merges it into stock_data with
+   ON CONFLICT (ticker, timestamp) DO NOTHING.
+4. load_ohlcv drives the stages and reports counts and throughput.
+
+At most ``2 * workers`` chunks are in flight at once, so memory stays
+bounded however large the file is. Rows are merged in file order. Quoted
+fields containing newlines are not supported by the splitter; OHLCV exports
+do not use them.
+"""
+
+from __future__ import annotations
+
+import io
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+# first one present is used as the bar time
+TIMESTAMP_COLUMNS = ("timestamp", "date", "datetime", "time")
+# column order of the COPY text (see Database.copy_stock_data)
+COPY_COLUMNS = ("ticker", "open", "high", "low", "close", "volume", "timestamp")
+MAX_TICKER_LENGTH = 10
+MAX_EXAMPLES = 10
+
+
+class OHLCVLoadError(ValueError):
+    """The file cannot be loaded at all (unreadable CSV, missing columns)."""
+
+
+# ============================================
+# SPLIT
+# ============================================
+
+
+def split_csv(stream, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[bytes]:
+    """Yield line-aligned chunks of a binary CSV stream, each starting with the header."""
+    header = stream.readline()
+    if not header.strip():
+        raise OHLCVLoadError("file is empty")
+    if not header.endswith(b"\n"):
+        header += b"\n"
+    rest = b""
+    while True:
+        block = stream.read(chunk_bytes)
+        if not block:
+            break
+        block = rest + block
+        cut = block.rfind(b"\n") + 1
+        if cut == 0:
+            rest = block
+            continue
+        rest = block[cut:]
+        yield header + block[:cut]
+    if rest.strip():
+        yield header + rest
+
+
+# ============================================
+# PARSE + VALIDATE (runs in the worker processes)
+# ============================================
+
+
+def normalize_timestamps(values: pd.Series) -> pd.Series:
+    """
+    Timestamps as tz-aware UTC datetimes (NaT where unparseable).
+
+    Numbers are epoch seconds, or milliseconds when too large to be seconds.
+    Strings are parsed as dates, and a string without an offset is taken as
+    UTC.
+    """
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.notna().all() and len(numeric):
+        unit = "ms" if numeric.abs().max() >= 1e11 else "s"
+        return pd.to_datetime(numeric, unit=unit, utc=True)
+    return pd.to_datetime(values, utc=True, errors="coerce")
+
+
+def validate_frame(df: pd.DataFrame, ticker: Optional[str] = None):
+    """
+    Returns ``(valid rows in COPY_COLUMNS order, {reason: count}, [(row, reason)])``.
+
+    Row numbers in the examples are positions within ``df``. With ``ticker``
+    every row belongs to it, otherwise the file needs a ticker column.
+    """
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    ts_column = next((c for c in TIMESTAMP_COLUMNS if c in df.columns), None)
+    missing = [c for c in PRICE_COLUMNS if c not in df.columns]
+    if ts_column is None:
+        missing.append("timestamp")
+    if ticker is None and "ticker" not in df.columns:
+        missing.append("ticker")
+    if missing:
+        raise OHLCVLoadError(f"missing column(s): {', '.join(missing)}")
+
+    if ticker is not None:
+        tickers = pd.Series(ticker.upper(), index=df.index)
+    else:
+        tickers = df["ticker"].astype("string").str.strip().str.upper()
+    out = pd.DataFrame({"ticker": tickers})
+    for c in PRICE_COLUMNS:
+        out[c] = pd.to_numeric(df[c], errors="coerce")
+    out["timestamp"] = normalize_timestamps(df[ts_column])
+
+    o, h, l, c, v = (out[col].to_numpy(dtype="float64") for col in PRICE_COLUMNS)
+    checks = {
+        "missing value": out[list(PRICE_COLUMNS) + ["timestamp"]].isna().to_numpy().any(axis=1),
+        "invalid ticker": (
+            tickers.isna() | (tickers.str.len() == 0) | (tickers.str.len() > MAX_TICKER_LENGTH)
+        ).to_numpy(dtype=bool),
+        "high below open/close": h < np.maximum(o, c),
+        "low above open/close": l > np.minimum(o, c),
+        "negative volume": v < 0,
+    }
+
+    bad = np.zeros(len(out), dtype=bool)
+    reasons: Dict[str, int] = {}
+    examples: List[Tuple[int, str]] = []
+    for reason, mask in checks.items():
+        # count each row once, under the first check it fails
+        new = mask & ~bad
+        count = int(new.sum())
+        if count:
+            reasons[reason] = count
+            examples.extend((int(i), reason) for i in np.flatnonzero(new)[:MAX_EXAMPLES])
+        bad |= mask
+    examples.sort()
+
+    valid = out[~bad]
+    valid = valid.assign(volume=valid["volume"].round().astype("int64"))
+    return valid[list(COPY_COLUMNS)], reasons, examples[:MAX_EXAMPLES]
+
+
+def parse_chunk(args) -> Dict[str, Any]:
+    """Worker entry point: ``(chunk bytes, ticker)`` -> COPY text and counts."""
+    data, ticker = args
+    try:
+        df = pd.read_csv(io.BytesIO(data), dtype=str, keep_default_na=False, na_values=[""])
+    except Exception as e:
+        raise OHLCVLoadError(f"Failed to parse CSV: {e}") from e
+    valid, reasons, examples = validate_frame(df, ticker)
+    return {
+        "text": valid.to_csv(index=False, header=False),
+        "rows": len(df),
+        "valid": len(valid),
+        "tickers": valid["ticker"].unique().tolist(),
+        "reasons": reasons,
+        "examples": examples,
+    }
+
+
+# ============================================
+# DRIVER
+# ============================================
+
+
+def _bounded_map(fn, items, executor, window):
+    """executor.map that keeps at most ``window`` items in flight, in order."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _parsed_chunks(chunks, ticker, workers):
+    chunks = iter(chunks)
+    head = list(islice(chunks, 2))
+    if workers <= 1 or len(head) < 2:
+        # a single chunk is not worth starting a pool for
+        for chunk in chain(head, chunks):
+            yield parse_chunk((chunk, ticker))
+        return
+
+    items = ((chunk, ticker) for chunk in chain(head, chunks))
+    # spawn: forking a threaded server process can deadlock the children
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        yield from _bounded_map(parse_chunk, items, executor, 2 * workers)
+
+
+def load_ohlcv(
+    stream,
+    db,
+    ticker: Optional[str] = None,
+    workers: int = 2,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    on_chunk: Optional[Callable[[int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Load an OHLCV CSV (binary stream) into stock_data.
+
+    The load is a single transaction. ``on_chunk`` is called with the
+    running count of parsed rows after each chunk is merged and may raise to
+    stop the load, which then rolls back like any other error. Returns the
+    counts and throughput.
+    """
+    started = time.perf_counter()
+    totals = {"rows": 0, "rejected": 0}
+    reasons: Dict[str, int] = {}
+    examples: List[Dict[str, Any]] = []
+
+    def batches():
+        for result in _parsed_chunks(split_csv(stream, chunk_bytes), ticker, workers):
+            offset = totals["rows"]
+            totals["rows"] += result["rows"]
+            totals["rejected"] += result["rows"] - result["valid"]
+            for reason, count in result["reasons"].items():
+                reasons[reason] = reasons.get(reason, 0) + count
+            for row, reason in result["examples"]:
+                if len(examples) < MAX_EXAMPLES:
+                    # 1-based data line number, the header is line 0
+                    examples.append({"row": offset + row + 1, "reason": reason})
+            yield result["text"], result["valid"], result["tickers"]
+
+    def progress(inserted, skipped):
+        if on_chunk is not None:
+            on_chunk(totals["rows"])
+
+    merged = db.copy_stock_data(batches(), on_batch=progress)
+    seconds = time.perf_counter() - started
+    return {
+        "target": "stock_data",
+        "ticker": ticker.upper() if ticker else None,
+        "rows": totals["rows"],
+        "inserted": merged["inserted"],
+        "duplicates": merged["skipped"],
+        "rejected": totals["rejected"],
+        "rejections": reasons,
+        "examples": examples,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(totals["rows"] / seconds, 1) if seconds > 0 else None,
+    }
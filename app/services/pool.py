@@ -0,0 +1,310 @@
+"""
+Thread-safe connection pool used by app.database.Database.
+
+The pool is per process: a gunicorn worker that inherits a pool from its
+parent through fork() drops the inherited connections (without closing them,
+which would terminate the parent's sessions) and starts a fresh pool. The
+first checkout in each process warms the pool up to ``min_size`` in the
+background, so only that first request pays for a connection handshake.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+class PoolClosed(Exception):
+    """Raised when a connection is requested from a closed pool."""
+
+
+class _Slot:
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """
+    Bounded pool of DB-API connections.
+
+    - at most ``max_size`` connections are open at any time; callers wait up
+      to ``timeout`` seconds for one to be released, then get PoolTimeout
+    - idle connections unused for ``check_interval`` seconds are pinged with
+      ``SELECT 1`` on checkout, broken ones are discarded and replaced
+    - connections older than ``max_lifetime`` or idle longer than
+      ``max_idle`` (above ``min_size``) are recycled
+    - the first checkout in a process opens the rest of ``min_size`` on a
+      background thread (see fill)
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 5.0,
+        max_idle: float = 300.0,
+        max_lifetime: float = 1800.0,
+        check_interval: float = 30.0,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_interval = check_interval
+
+        self._cond = threading.Condition()
+        self._reset_state()
+
+    def _reset_state(self):
+        self._pid = os.getpid()
+        self._idle: Deque[_Slot] = deque()
+        self._in_use: Dict[int, _Slot] = {}
+        self._size = 0  # idle + in use + currently being opened
+        self._closed = False
+        self._warmed = False
+        self._stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "opened": 0,
+            "recycled": 0,
+            "failed_checks": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # checkout / checkin
+    # ------------------------------------------------------------------
+
+    def acquire(self):
+        """Check out a live connection, waiting at most ``timeout`` seconds."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+
+        while True:
+            slot, to_close = self._take_slot(deadline)
+            self._close_all(to_close)
+
+            if slot is None:
+                # we reserved room for a new connection
+                try:
+                    slot = _Slot(self._connect())
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats["opened"] += 1
+            elif not self._is_usable(slot):
+                with self._cond:
+                    self._size -= 1
+                    self._stats["failed_checks"] += 1
+                    self._stats["recycled"] += 1
+                    self._cond.notify()
+                self._close_all([slot.conn])
+                continue
+
+            waited = time.monotonic() - start
+            with self._cond:
+                self._in_use[id(slot.conn)] = slot
+                self._stats["checkouts"] += 1
+                self._stats["wait_time_total"] += waited
+                if waited > self._stats["wait_time_max"]:
+                    self._stats["wait_time_max"] = waited
+                warm = not self._warmed and self._size < self.min_size
+                self._warmed = True
+            if warm:
+                threading.Thread(target=self._warm_up, name="db-pool-warmup", daemon=True).start()
+            return slot.conn
+
+    def release(self, conn, broken: bool = False):
+        """Return a connection to the pool; broken ones are closed and replaced."""
+        to_close = []
+        with self._cond:
+            if os.getpid() != self._pid:
+                return
+            slot = self._in_use.pop(id(conn), None)
+            if slot is None:
+                # not ours (e.g. checked out before a reset)
+                to_close.append(conn)
+            else:
+                now = time.monotonic()
+                expired = now - slot.created_at > self.max_lifetime
+                if broken or self._closed or expired or getattr(conn, "closed", 0):
+                    self._size -= 1
+                    self._stats["recycled"] += 1
+                    to_close.append(conn)
+                else:
+                    slot.last_used = now
+                    self._idle.append(slot)
+                to_close.extend(self._reap_idle(now))
+            self._cond.notify()
+        self._close_all(to_close)
+
+    def _take_slot(self, deadline):
+        """
+        Pop an idle slot, or reserve room for a new connection (returns None).
+        Must be called without holding the lock.
+        """
+        to_close = []
+        with self._cond:
+            if os.getpid() != self._pid:
+                # forked: forget the parent's connections without closing them
+                self._reset_state()
+            while True:
+                if self._closed:
+                    raise PoolClosed("connection pool is closed")
+                now = time.monotonic()
+                while self._idle:
+                    slot = self._idle.pop()  # LIFO keeps the hottest connections warm
+                    if now - slot.created_at > self.max_lifetime:
+                        self._size -= 1
+                        self._stats["recycled"] += 1
+                        to_close.append(slot.conn)
+                        continue
+                    return slot, to_close
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, to_close
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    self._close_all(to_close)
+                    raise PoolTimeout(
+                        f"no database connection available within {self.timeout:.1f}s "
+                        f"(max_size={self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+    def _reap_idle(self, now):
+        """Drop connections idle longer than max_idle while above min_size."""
+        reaped = []
+        while self._idle and self._size > self.min_size:
+            oldest = self._idle[0]
+            if now - oldest.last_used <= self.max_idle:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self._stats["recycled"] += 1
+            reaped.append(oldest.conn)
+        return reaped
+
+    def _is_usable(self, slot):
+        conn = slot.conn
+        if getattr(conn, "closed", 0):
+            return False
+        if time.monotonic() - slot.last_used < self.check_interval:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_all(conns):
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # lifecycle / introspection
+    # ------------------------------------------------------------------
+
+    def fill(self):
+        """Open connections up to ``min_size`` (e.g. right after a worker boots)."""
+        opened = []
+        with self._cond:
+            if os.getpid() != self._pid:
+                self._reset_state()
+            self._warmed = True
+            missing = 0 if self._closed else max(0, self.min_size - self._size)
+            self._size += missing
+        try:
+            for _ in range(missing):
+                opened.append(_Slot(self._connect()))
+        finally:
+            with self._cond:
+                self._size -= missing - len(opened)
+                self._stats["opened"] += len(opened)
+                if self._closed:
+                    # closed while we were connecting
+                    self._size -= len(opened)
+                    stale, opened = opened, []
+                else:
+                    stale = []
+                self._idle.extend(opened)
+                self._cond.notify_all()
+            self._close_all([slot.conn for slot in stale])
+
+    def _warm_up(self):
+        try:
+            self.fill()
+        except Exception as e:
+            # the connections are opened on demand instead
+            logger.warning("Could not warm the connection pool up to %d: %s", self.min_size, e)
+
+    def close(self):
+        """Close idle connections; in-use ones are closed when released."""
+        with self._cond:
+            self._closed = True
+            idle = [s.conn for s in self._idle]
+            self._size -= len(idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        self._close_all(idle)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            checkouts = self._stats["checkouts"]
+            return {
+                "size": self._size,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "checkouts": checkouts,
+                "timeouts": self._stats["timeouts"],
+                "opened": self._stats["opened"],
+                "recycled": self._stats["recycled"],
+                "failed_checks": self._stats["failed_checks"],
+                "wait_time_total": round(self._stats["wait_time_total"], 6),
+                "wait_time_max": round(self._stats["wait_time_max"], 6),
+                "wait_time_avg": round(self._stats["wait_time_total"] / checkouts, 6)
+                if checkouts
+                else 0.0,
+            }
+
+    def __repr__(self) -> str:
+        s = self.stats()
+        return f"<ConnectionPool in_use={s['in_use']} idle={s['idle']} max={s['max_size']}>"
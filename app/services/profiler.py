@@ -0,0 +1,150 @@
+"""
+Sampling profiler for slow requests.
+
+While a request runs, one background thread per process samples the stack
+of the thread serving it every ``interval`` seconds (sys._current_frames, so
+the request itself runs uninstrumented). When the request turns out slower
+than ``threshold`` seconds, its samples are written as collapsed stacks, one
+``frame;frame;frame count`` line per distinct stack, root first. That is the
+input format of flamegraph.pl and speedscope:
+
+    flamegraph.pl data/profiles/20251118T200000_812ms_stocks.stock_history_4242.folded > out.svg
+
+Requests under the threshold are discarded. The sampler thread sleeps while
+no request is being profiled.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Optional
+
+MAX_DEPTH = 128
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    """``filename`` relative to the sys.path entry it lives under."""
+    best = ""
+    for entry in sys.path:
+        if entry and filename.startswith(entry) and len(entry) > len(best):
+            best = entry
+    return filename[len(best):].lstrip(os.sep) if best else filename
+
+
+def fold(frame) -> str:
+    """Collapsed stack of ``frame``, outermost call first."""
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """
+    Samples the threads registered with begin() and writes the stacks of
+    the slow ones to ``directory`` on end(). Keeps at most ``max_files``
+    profiles there, dropping the oldest.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        interval: float = 0.005,
+        threshold: float = 0.5,
+        max_files: int = 200,
+    ):
+        self.directory = directory
+        self.interval = interval
+        self.threshold = threshold
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        # thread ident -> stack counts of the request it is serving
+        self._active: Dict[int, Counter] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+
+    def begin(self) -> int:
+        """Start sampling the calling thread; returns the token for end()."""
+        ident = threading.get_ident()
+        with self._lock:
+            self._ensure_thread()
+            self._active[ident] = Counter()
+            self._wake.set()
+        return ident
+
+    def end(self, token: int, seconds: float, name: str) -> Optional[str]:
+        """Stop sampling; returns the written file when the request was slow."""
+        with self._lock:
+            stacks = self._active.pop(token, None)
+        if not stacks or seconds < self.threshold:
+            return None
+        return self._dump(stacks, seconds, name)
+
+    def _ensure_thread(self):
+        # lock held; a forked worker inherits the object but not the thread
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._active.clear()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                idle = not self._active
+                if idle:
+                    self._wake.clear()
+            if idle:
+                self._wake.wait()
+                continue
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, stacks in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None and ident != own:
+                        stacks[fold(frame)] += 1
+            del frames
+
+    def _dump(self, stacks: Counter, seconds: float, name: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "request"
+        path = os.path.join(
+            self.directory, f"{stamp}_{int(seconds * 1000)}ms_{safe}_{os.getpid()}.folded"
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        self._prune()
+        return path
+
+    def _prune(self):
+        # workers share the directory: files can vanish between listdir and stat
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".folded"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                files.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+        files.sort()
+        for _, path in files[: max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
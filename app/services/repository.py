@@ -1,70 +1,355 @@
 from __future__ import annotations
 from typing import Dict, Any, Optional, List
 from abc import ABC, abstractmethod
-import time, os, json, uuid
+from collections import OrderedDict
+import time, os, json, uuid, sys, threading
+
+import numpy as np
+import pandas as pd
+
+from . import columnar
+from .lineindex import LineIndexWriter, read_lines, line_count
+from .catalog import DatasetCatalog, SORT_FIELDS
+
+class DatasetWriter:
+    """
+    Writes one dataset chunk by chunk: write() each batch of rows, then
+    commit(meta) to publish it (or abort() to discard it). Used as a context
+    manager it aborts automatically when the block raises.
+
+    This default buffers the rows and hands them to save_dataset on commit;
+    repositories that can persist incrementally return their own writer.
+    """
+
+    def __init__(self, repo: "Repository", name: str):
+        self.repo = repo
+        self.name = name
+        self.rows_written = 0
+        self.done = False
+        self._rows: List[Dict[str, Any]] = []
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self._rows.extend(rows)
+        self.rows_written += len(rows)
+
+    def write_frame(self, df: pd.DataFrame) -> None:
+        """Write a DataFrame chunk; columnar writers store it without row dicts."""
+        self.write(df.to_dict(orient="records"))
+
+    def commit(self, meta: Dict[str, Any]) -> str:
+        self.done = True
+        rows, self._rows = self._rows, []
+        return self.repo.save_dataset(self.name, meta, rows)
+
+    def abort(self) -> None:
+        self.done = True
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.done:
+            self.abort()
+        return False
 
 class Repository(ABC):
     @abstractmethod
     def save_dataset(self, name: str, meta: Dict[str, Any], rows: List[Dict[str, Any]]) -> str: ...
     @abstractmethod
-    def get_dataset(self, dataset_id: str) -> Optional[Dict[str, Any]]: ...
+    def get_dataset(self, dataset_id: str, columns: Optional[List[str]] = None) -> Optional[Dict[str, Any]]: ...
     @abstractmethod
-    def list_datasets(self) -> List[Dict[str, Any]]: ...
+    def list_datasets(
+        self,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        sort: str = "created_at",
+        order: str = "asc",
+    ) -> List[Dict[str, Any]]: ...
+
+    def open_writer(self, name: str) -> DatasetWriter:
+        """Start a streaming save; see DatasetWriter."""
+        return DatasetWriter(self, name)
+
+    def get_rows(
+        self, dataset_id: str, offset: int = 0, limit: int = 100, columns: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        A page of rows: ``{"rows": [...], "offset", "limit", "total"}``, or None
+        if the dataset does not exist. This default slices get_dataset();
+        repositories override it to read only the requested range.
+        """
+        rec = self.get_dataset(dataset_id, columns=columns)
+        if rec is None:
+            return None
+        rows = rec["rows"]
+        return {"rows": rows[offset:offset + limit], "offset": offset, "limit": limit, "total": len(rows)}
+
+class DatasetTooLarge(Exception):
+    """A dataset does not fit in the repository's memory budget."""
 
 class InMemoryRepository(Repository):
-    def __init__(self):
-        self._store: Dict[str, Dict[str, Any]] = {}
+    """
+    Keeps datasets in process memory.
+
+    In compact mode (the default) rows are stored as one typed numpy array
+    per column instead of a list of dicts. With ``max_bytes`` set, the
+    least recently used datasets are evicted to stay under the budget, and a
+    dataset that cannot fit on its own is rejected with DatasetTooLarge
+    while it is being written.
+    """
+
+    def __init__(self, compact: bool = True, max_bytes: Optional[int] = None):
+        self.compact = compact
+        self.max_bytes = max_bytes
+        self._store: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+        self._last_created = 0.0
+        self._lock = threading.Lock()
 
     def save_dataset(self, name, meta, rows):
-        dataset_id = str(int(time.time() * 1000))
-        self._store[dataset_id] = {"id": dataset_id, "name": name, "meta": meta, "rows": rows}
+        with self.open_writer(name) as writer:
+            writer.write(rows)
+            return writer.commit(meta)
+
+    def open_writer(self, name):
+        return _MemoryDatasetWriter(self, name)
+
+    def _publish(self, name, meta, data, nbytes):
+        dataset_id = uuid.uuid4().hex
+        with self._lock:
+            # strictly increasing so listings keep upload order
+            self._last_created = max(time.time(), self._last_created + 1e-6)
+            self._store[dataset_id] = {
+                "record": {
+                    "id": dataset_id, "name": name, "meta": meta, "created_at": self._last_created,
+                },
+                "data": data,
+                "nbytes": nbytes,
+            }
+            self._bytes += nbytes
+            # evict least recently used datasets, never the one just added
+            while (
+                self.max_bytes is not None
+                and self._bytes > self.max_bytes
+                and len(self._store) > 1
+            ):
+                _, evicted = self._store.popitem(last=False)
+                self._bytes -= evicted["nbytes"]
+                self._evictions += 1
         return dataset_id
 
-    def get_dataset(self, dataset_id):
-        return self._store.get(dataset_id)
+    def _touch(self, dataset_id):
+        with self._lock:
+            entry = self._store.get(dataset_id)
+            if entry is not None:
+                self._store.move_to_end(dataset_id)
+            return entry
+
+    def get_dataset(self, dataset_id, columns=None):
+        entry = self._touch(dataset_id)
+        if entry is None:
+            return None
+        data = entry["data"]
+        if isinstance(data, dict):
+            if columns is not None:
+                data = {c: v for c, v in data.items() if c in columns}
+            rows = columnar.to_records(data)
+        else:
+            rows = data if columns is None else _select(data, columns)
+        return {**entry["record"], "rows": rows}
+
+    def get_rows(self, dataset_id, offset=0, limit=100, columns=None):
+        entry = self._touch(dataset_id)
+        if entry is None:
+            return None
+        data = entry["data"]
+        if isinstance(data, dict):
+            cols = {
+                c: v[offset:offset + limit]
+                for c, v in data.items()
+                if columns is None or c in columns
+            }
+            rows = columnar.to_records(cols)
+            total = len(next(iter(data.values()))) if data else 0
+        else:
+            rows = data[offset:offset + limit]
+            if columns is not None:
+                rows = _select(rows, columns)
+            total = len(data)
+        return {"rows": rows, "offset": offset, "limit": limit, "total": total}
+
+    def read_columns(self, dataset_id, columns=None) -> Optional[Dict[str, np.ndarray]]:
+        entry = self._touch(dataset_id)
+        if entry is None:
+            return None
+        data = entry["data"]
+        if not isinstance(data, dict):
+            df = pd.DataFrame(data)
+            data = {str(c): df[c].to_numpy() for c in df.columns}
+        return {c: v for c, v in data.items() if columns is None or c in columns}
+
+    def list_datasets(self, limit=None, offset=0, sort="created_at", order="asc"):
+        with self._lock:
+            records = [e["record"] for e in self._store.values()]
+        return _paginate(records, limit, offset, sort, order)
+
+    def memory_usage(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "datasets": len(self._store),
+                "evictions": self._evictions,
+                "compact": self.compact,
+            }
+
+def _object_nbytes(values) -> int:
+    """Approximate heap size of a sequence of Python objects (shared objects counted once)."""
+    seen = set()
+    total = 0
+    for v in values:
+        if id(v) not in seen:
+            seen.add(id(v))
+            total += sys.getsizeof(v)
+    return total
+
+def _rows_nbytes(rows: List[Dict[str, Any]]) -> int:
+    total = sys.getsizeof(rows)
+    for r in rows:
+        total += sys.getsizeof(r) + _object_nbytes(r.values())
+    return total
+
+class _MemoryDatasetWriter(DatasetWriter):
+    """Collects chunks (as typed column arrays in compact mode) while enforcing the budget."""
+
+    def __init__(self, repo: InMemoryRepository, name: str):
+        super().__init__(repo, name)
+        self._chunks: Dict[str, List[np.ndarray]] = {}
+        self._dtypes: Dict[str, str] = {}
+        self._nbytes = 0
+
+    def _account(self, nbytes):
+        self._nbytes += nbytes
+        budget = self.repo.max_bytes
+        if budget is not None and self._nbytes > budget:
+            raise DatasetTooLarge(
+                f"dataset exceeds the in-memory budget of {budget / (1024 * 1024):.0f} MB"
+            )
+
+    def write(self, rows):
+        if self.repo.compact:
+            if rows:
+                self.write_frame(pd.DataFrame(rows))
+            return
+        self._account(_rows_nbytes(rows))
+        self._rows.extend(rows)
+        self.rows_written += len(rows)
+
+    def write_frame(self, df):
+        if not self.repo.compact:
+            return self.write(df.to_dict(orient="records"))
+        n = int(df.shape[0])
+        for name in df.columns:
+            key = str(name)
+            if key in self._chunks:
+                continue
+            if self.rows_written:
+                # column first seen in a later chunk: earlier rows are null
+                self._chunks[key] = [np.full(self.rows_written, None, dtype=object)]
+                self._dtypes[key] = columnar.OBJECT
+            else:
+                self._chunks[key] = []
+                self._dtypes[key] = columnar.storage_dtype(df[name])
+        for key, chunks in self._chunks.items():
+            values = df[key] if key in df.columns else pd.Series([None] * n, dtype=object)
+            dtype = columnar.storage_dtype(values)
+            self._dtypes[key] = columnar.merge_dtype(self._dtypes[key], dtype)
+            arr = values.to_numpy(dtype=object if dtype == columnar.OBJECT else dtype)
+            chunks.append(arr)
+            self._account(arr.nbytes + (_object_nbytes(arr) if arr.dtype == object else 0))
+        self.rows_written += n
+
+    def commit(self, meta):
+        self.done = True
+        if not self.repo.compact:
+            rows, self._rows = self._rows, []
+            return self.repo._publish(self.name, meta, rows, self._nbytes)
+        data = {}
+        for key, chunks in self._chunks.items():
+            dtype = object if self._dtypes[key] == columnar.OBJECT else self._dtypes[key]
+            if not chunks:
+                data[key] = np.empty(0, dtype=dtype)
+            else:
+                data[key] = np.concatenate([c.astype(dtype, copy=False) for c in chunks])
+        self._chunks = {}
+        return self.repo._publish(self.name, meta, data, self._nbytes)
+
+    def abort(self):
+        self.done = True
+        self._chunks = {}
+        self._rows = []
 
-    def list_datasets(self):
-        return list(self._store.values())
+def _paginate(records, limit, offset, sort, order):
+    if sort not in SORT_FIELDS:
+        raise ValueError(f"sort must be one of {', '.join(SORT_FIELDS)}")
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be asc or desc")
+
+    def key(rec):
+        value = rec.get("meta", {}).get("rows") if sort == "rows" else rec.get(sort)
+        return (value is None, value if value is not None else 0, rec["id"])
+
+    records = sorted(records, key=key, reverse=order == "desc")
+    end = None if limit is None else offset + limit
+    return records[offset:end]
+
+def _select(rows: List[Dict[str, Any]], columns: List[str]) -> List[Dict[str, Any]]:
+    return [{c: r.get(c) for c in columns} for r in rows]
 
 class FileRepository(Repository):
-    def __init__(self, base_dir: str = "./data"):
+    """
+    Stores each dataset under base_dir, indexed by a SQLite DatasetCatalog,
+    either as JSON lines (``dataset_format="jsonl"``, one row per line) or in
+    the columnar layout from services.columnar (``"columnar"``, typed
+    per-column files that are memory-mapped on read). Both formats can be
+    read whatever the setting.
+    """
+
+    FORMATS = ("jsonl", "columnar")
+
+    def __init__(self, base_dir: str = "./data", dataset_format: str = "jsonl"):
+        if dataset_format not in self.FORMATS:
+            raise ValueError(f"unknown dataset format: {dataset_format}")
         self.base_dir = base_dir
+        self.dataset_format = dataset_format
         os.makedirs(self.base_dir, exist_ok=True)
-        self.manifest_path = os.path.join(self.base_dir, "manifest.json")
-        if not os.path.exists(self.manifest_path):
-            self._write_manifest({})
+        self.catalog = DatasetCatalog(os.path.join(self.base_dir, "catalog.sqlite3"))
+        # one-time import of the old whole-file manifest
+        self.catalog.migrate_manifest(os.path.join(self.base_dir, "manifest.json"), self.base_dir)
 
-    def _read_manifest(self) -> Dict[str, Dict[str, Any]]:
-        try:
-            with open(self.manifest_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {}
+    def save_dataset(self, name, meta, rows):
+        with self.open_writer(name) as writer:
+            writer.write(rows)
+            return writer.commit(meta)
 
-    def _write_manifest(self, manifest: Dict[str, Dict[str, Any]]):
-        with open(self.manifest_path, "w", encoding="utf-8") as f:
-            json.dump(manifest, f, ensure_ascii=False, indent=2)
+    def open_writer(self, name):
+        if self.dataset_format == "columnar":
+            return _ColumnarDatasetWriter(self, name)
+        return _FileDatasetWriter(self, name)
 
-    def save_dataset(self, name, meta, rows):
-        dataset_id = uuid.uuid4().hex
-        record = {"id": dataset_id, "name": name, "meta": meta}
-        # write rows to separate file to avoid huge manifest
-        rows_path = os.path.join(self.base_dir, f"{dataset_id}.rows.jsonl")
-        with open(rows_path, "w", encoding="utf-8") as f:
-            for r in rows:
-                f.write(json.dumps(r, ensure_ascii=False) + "\n")
-
-        manifest = self._read_manifest()
-        manifest[dataset_id] = record
-        self._write_manifest(manifest)
-        return dataset_id
+    def _publish(self, record: Dict[str, Any]):
+        self.catalog.add(record)
 
-    def get_dataset(self, dataset_id):
-        manifest = self._read_manifest()
-        rec = manifest.get(dataset_id)
-        if not rec:
-            return None
-        rows_path = os.path.join(self.base_dir, f"{dataset_id}.rows.jsonl")
+    def _columns_path(self, dataset_id: str) -> str:
+        return os.path.join(self.base_dir, f"{dataset_id}.cols")
+
+    def _rows_path(self, dataset_id: str) -> str:
+        return os.path.join(self.base_dir, f"{dataset_id}.rows.jsonl")
+
+    def _read_jsonl_rows(self, dataset_id: str) -> List[Dict[str, Any]]:
+        rows_path = self._rows_path(dataset_id)
         rows: List[Dict[str, Any]] = []
         if os.path.exists(rows_path):
             with open(rows_path, "r", encoding="utf-8") as f:
@@ -73,9 +358,129 @@ class FileRepository(Repository):
                         rows.append(json.loads(line))
                     except Exception:
                         pass
+        return rows
+
+    def get_dataset(self, dataset_id, columns=None):
+        rec = self.catalog.get(dataset_id)
+        if not rec:
+            return None
+        if rec.get("format") == "columnar":
+            cols = columnar.read_columns(self._columns_path(dataset_id), columns)
+            rows = columnar.to_records(cols)
+        else:
+            rows = self._read_jsonl_rows(dataset_id)
+            if columns is not None:
+                rows = _select(rows, columns)
         rec = {**rec, "rows": rows}
         return rec
 
-    def list_datasets(self):
-        manifest = self._read_manifest()
-        return list(manifest.values())
+    def read_columns(self, dataset_id, columns=None) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Column arrays of a dataset. Columnar datasets are memory-mapped
+        (zero-copy, only the requested columns are opened); JSONL datasets
+        are parsed and converted.
+        """
+        rec = self.catalog.get(dataset_id)
+        if not rec:
+            return None
+        if rec.get("format") == "columnar":
+            return columnar.read_columns(self._columns_path(dataset_id), columns)
+        df = pd.DataFrame(self._read_jsonl_rows(dataset_id))
+        names = [c for c in df.columns if columns is None or c in columns]
+        return {str(c): df[c].to_numpy() for c in names}
+
+    def get_rows(self, dataset_id, offset=0, limit=100, columns=None):
+        """
+        Reads only the requested rows: JSONL datasets seek through their
+        ``.rows.jsonl.idx`` offset index (built on first use for datasets saved
+        before it existed), columnar ones slice their memory-mapped columns.
+        """
+        rec = self.catalog.get(dataset_id)
+        if not rec:
+            return None
+        if rec.get("format") == "columnar":
+            page = columnar.read_rows(self._columns_path(dataset_id), offset, offset + limit, columns)
+            rows = columnar.to_records(page["columns"])
+            total = page["total"]
+        else:
+            rows_path = self._rows_path(dataset_id)
+            if not os.path.exists(rows_path):
+                rows, total = [], 0
+            else:
+                total = line_count(rows_path)
+                rows = []
+                # skip lines that do not decode, as _read_jsonl_rows does
+                for line in read_lines(rows_path, offset, offset + limit):
+                    try:
+                        rows.append(json.loads(line))
+                    except Exception:
+                        pass
+                if columns is not None:
+                    rows = _select(rows, columns)
+        return {"rows": rows, "offset": offset, "limit": limit, "total": total}
+
+    def list_datasets(self, limit=None, offset=0, sort="created_at", order="asc"):
+        return self.catalog.list(limit=limit, offset=offset, sort=sort, order=order)
+
+class _FileDatasetWriter(DatasetWriter):
+    """Appends rows to a temporary JSONL file and renames it into place on commit."""
+
+    def __init__(self, repo: FileRepository, name: str):
+        super().__init__(repo, name)
+        self.dataset_id = uuid.uuid4().hex
+        # rows live in their own file, the catalog only holds the record
+        self.rows_path = repo._rows_path(self.dataset_id)
+        self._tmp_path = self.rows_path + ".tmp"
+        # the sidecar offset index lets get_rows seek straight to any row
+        self._f = LineIndexWriter(self._tmp_path, index=self.rows_path + ".idx.tmp")
+
+    def write(self, rows):
+        self._f.write_lines([json.dumps(r, ensure_ascii=False) + "\n" for r in rows])
+        self.rows_written += len(rows)
+
+    def commit(self, meta):
+        self.done = True
+        self._f.close()
+        os.replace(self._f.index, self.rows_path + ".idx")
+        os.replace(self._tmp_path, self.rows_path)
+        self.repo._publish({"id": self.dataset_id, "name": self.name, "meta": meta})
+        return self.dataset_id
+
+    def abort(self):
+        self.done = True
+        self._f.close()
+        for path in (self._tmp_path, self._f.index):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+class _ColumnarDatasetWriter(DatasetWriter):
+    """Writes chunks into a temporary columnar directory, renamed into place on commit."""
+
+    def __init__(self, repo: FileRepository, name: str):
+        super().__init__(repo, name)
+        self.dataset_id = uuid.uuid4().hex
+        self.path = repo._columns_path(self.dataset_id)
+        self._writer = columnar.ColumnarWriter(self.path + ".tmp")
+
+    def write(self, rows):
+        if rows:
+            self.write_frame(pd.DataFrame(rows))
+
+    def write_frame(self, df):
+        self._writer.append(df)
+        self.rows_written += int(df.shape[0])
+
+    def commit(self, meta):
+        self.done = True
+        self._writer.close()
+        os.replace(self._writer.path, self.path)
+        self.repo._publish(
+            {"id": self.dataset_id, "name": self.name, "meta": meta, "format": "columnar"}
+        )
+        return self.dataset_id
+
+    def abort(self):
+        self.done = True
+        self._writer.abort()
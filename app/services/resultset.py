@@ -0,0 +1,61 @@
+"""
+Compact query results: a column list plus plain tuples.
+
+RealDictCursor builds a dict for every row; for the list queries that only
+get serialized (history, news, stock lists) that is most of the Python-side
+cost. ResultSet keeps the rows as the tuples the cursor returns and only
+builds a dict when a single row is accessed. It still behaves like a list
+of dicts (indexing, iteration, slicing, len), and the JSON provider encodes
+it directly.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+
+class ResultSet(Sequence):
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, columns: Sequence[str], rows: Sequence[Tuple[Any, ...]]):
+        self.columns = tuple(columns)
+        self.rows = rows if isinstance(rows, list) else list(rows)
+
+    @classmethod
+    def from_cursor(cls, cur) -> "ResultSet":
+        return cls([d[0] for d in cur.description], cur.fetchall())
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ResultSet(self.columns, self.rows[index])
+        return dict(zip(self.columns, self.rows[index]))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        columns = self.columns
+        return (dict(zip(columns, row)) for row in self.rows)
+
+    def __reversed__(self) -> Iterator[Dict[str, Any]]:
+        columns = self.columns
+        return (dict(zip(columns, row)) for row in reversed(self.rows))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ResultSet):
+            return self.columns == other.columns and self.rows == other.rows
+        if isinstance(other, list):
+            return self.to_records() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ResultSet(columns={list(self.columns)!r}, rows={len(self.rows)})"
+
+    def column(self, name: str) -> List[Any]:
+        """All values of one column."""
+        i = self.columns.index(name)
+        return [row[i] for row in self.rows]
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in self.rows]
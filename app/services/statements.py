@@ -0,0 +1,128 @@
+"""
+Prepared statements and per-query timing for app.database.Database.
+
+Database labels each read with the name of the method running it
+(``get_stock_data``, ``get_recent_news``, ...). StatementRegistry records
+call counts and execution time per label. With ``prepare`` on, the labels in
+``hot`` run as named server-side prepared statements. Each connection
+PREPAREs a statement the first time it sees that SQL text and afterwards
+sends only ``EXECUTE name (params)``, so Postgres skips parsing and can reuse
+its plan.
+
+Prepared statements live in the server session. They do not work behind a
+transaction-mode pooler such as PgBouncer or Neon's ``-pooler`` endpoint,
+where consecutive transactions may land on different sessions. Keep
+``prepare`` off there.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import weakref
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+DEFAULT_HOT_QUERIES = (
+    "get_stock_data",
+    "get_stock_data_version",
+    "get_latest_prediction",
+    "get_latest_prediction_version",
+    "get_recent_news",
+    "get_recent_news_version",
+    "get_user_dashboard",
+)
+
+_PLACEHOLDER = re.compile(r"%s|%%")
+
+
+def to_positional(sql: str) -> Tuple[str, int]:
+    """Rewrite psycopg2 ``%s`` placeholders as ``$1, $2, ...``; returns (sql, count)."""
+    count = 0
+
+    def replace(match):
+        nonlocal count
+        if match.group(0) == "%%":
+            return "%"
+        count += 1
+        return f"${count}"
+
+    return _PLACEHOLDER.sub(replace, sql), count
+
+
+class StatementRegistry:
+    """
+    Names the SQL texts of hot queries and remembers, per connection, which
+    of them are already prepared there. At most ``max_statements`` distinct
+    texts are prepared; further ones run as plain queries.
+    """
+
+    def __init__(
+        self,
+        prepare: bool = False,
+        hot: Iterable[str] = DEFAULT_HOT_QUERIES,
+        max_statements: int = 256,
+    ):
+        self.prepare = prepare
+        self.hot = frozenset(hot)
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        # sql -> (name, PREPARE statement, EXECUTE template)
+        self._statements: Dict[str, Tuple[str, str, str]] = {}
+        self._prepared: "weakref.WeakKeyDictionary[Any, Set[str]]" = weakref.WeakKeyDictionary()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def statement(self, label: Optional[str], sql: str) -> Optional[Tuple[str, str, str]]:
+        """``(name, prepare_sql, execute_sql)`` if this query should run prepared."""
+        if not self.prepare or label not in self.hot:
+            return None
+        with self._lock:
+            entry = self._statements.get(sql)
+            if entry is None:
+                if len(self._statements) >= self.max_statements:
+                    return None
+                name = "feather_" + hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+                positional, count = to_positional(sql)
+                args = f" ({', '.join(['%s'] * count)})" if count else ""
+                entry = (name, f"PREPARE {name} AS {positional}", f"EXECUTE {name}{args}")
+                self._statements[sql] = entry
+            return entry
+
+    def prepared_on(self, conn) -> Set[str]:
+        """Names of the statements prepared on ``conn`` (mutable)."""
+        with self._lock:
+            names = self._prepared.get(conn)
+            if names is None:
+                names = self._prepared[conn] = set()
+            return names
+
+    def record(self, label: str, seconds: float, prepared: bool):
+        with self._lock:
+            entry = self._stats.get(label)
+            if entry is None:
+                entry = self._stats[label] = {
+                    "calls": 0, "prepared_calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+                }
+            ms = seconds * 1000.0
+            entry["calls"] += 1
+            entry["prepared_calls"] += prepared
+            entry["total_ms"] += ms
+            if ms > entry["max_ms"]:
+                entry["max_ms"] = ms
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queries = {
+                label: {
+                    **{k: round(v, 3) if isinstance(v, float) else v for k, v in entry.items()},
+                    "mean_ms": round(entry["total_ms"] / entry["calls"], 3),
+                }
+                for label, entry in sorted(
+                    self._stats.items(), key=lambda item: -item[1]["total_ms"]
+                )
+            }
+            return {
+                "prepare": self.prepare,
+                "statements": len(self._statements),
+                "queries": queries,
+            }
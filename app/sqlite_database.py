@@ -0,0 +1,737 @@
+"""
+Database manager on an embedded SQLite file (DB_BACKEND=sqlite)
+
+SQLiteDatabase keeps the Database API, so the blueprints, CachedDatabase
+and the loaders run unchanged against a local file: an edge / read-replica
+node whose reads never leave the process, or a perf-test environment that
+needs no Neon.
+
+Connections: every thread reads through its own connection, opened on
+first use with ``query_only``; writes go through a single connection
+behind a lock, one ``BEGIN IMMEDIATE`` transaction per get_connection().
+The file runs in WAL mode, so readers never block the writer or each
+other and each read sees every transaction committed before it started.
+Other processes on the same file (gunicorn workers) queue on SQLite's own
+write lock for up to ``busy_timeout``. synchronous=NORMAL keeps commits
+safe from application crashes; a power loss can drop the last few.
+
+Queries: Database's SQL is written for psycopg2. Every statement passes
+through _translate (``%s`` -> ``?``, ``= ANY(%s)`` -> ``IN (?, ...)``,
+``::type`` casts dropped); the few that use Postgres-only features
+(date_bin/array_agg resampling, LATERAL joins, unnest, COPY, server-side
+cursors, execute_values) are overridden below. Timestamps are stored as
+UTC text ``YYYY-MM-DD HH:MM:SS[.ffffff]``, which sorts and compares like
+the time itself; datetime parameters are converted on the way in and
+timestamp columns come back as tz-aware datetimes, as they do from Postgres.
+
+Not available on SQLite: pg_notify (/api/stocks/stream), stock_rollups
+(ensure_rollup_schema/rebuild_rollups raise UnsupportedOnSQLite) and
+server-side prepared statements (sqlite3 already keeps compiled statements
+per connection).
+
+The schema keeps setup_database.py's foreign keys (market data, watchlists
+and alerts reference stocks/users); the writer enables them per connection.
+"""
+
+import csv
+import io
+import json
+import logging
+import numbers
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from functools import lru_cache
+
+from .database import _BUCKET_ORIGIN_DT, EXPORT_COLUMNS, INTERVALS, Database, _chunked
+from .services.events import DEFAULT_CHANNEL
+from .services.resultset import ResultSet
+from .services.statements import StatementRegistry
+
+logger = logging.getLogger(__name__)
+
+# Same column names as the Postgres schema; prices are REAL so values keep
+# their type (NUMERIC affinity would turn 100.0 into the integer 100)
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username VARCHAR(50) UNIQUE NOT NULL,
+        email VARCHAR(100) UNIQUE NOT NULL,
+        password_hash VARCHAR(255) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS stocks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticker VARCHAR(10) UNIQUE NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        sector VARCHAR(50)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS stock_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticker VARCHAR(10) NOT NULL,
+        open REAL NOT NULL,
+        high REAL NOT NULL,
+        low REAL NOT NULL,
+        close REAL NOT NULL,
+        volume INTEGER NOT NULL,
+        timestamp TIMESTAMP NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (ticker) REFERENCES stocks (ticker),
+        UNIQUE (ticker, timestamp)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS predictions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticker VARCHAR(10) NOT NULL,
+        predicted_trend VARCHAR(20) NOT NULL,
+        confidence REAL NOT NULL,
+        predicted_change REAL,
+        model_version VARCHAR(20) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (ticker) REFERENCES stocks (ticker)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_predictions_ticker ON predictions (ticker, created_at)",
+    """
+    CREATE TABLE IF NOT EXISTS news_articles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticker VARCHAR(10) NOT NULL,
+        headline TEXT NOT NULL,
+        summary TEXT,
+        content TEXT,
+        sentiment VARCHAR(20),
+        source VARCHAR(100),
+        url TEXT UNIQUE,
+        published_at TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (ticker) REFERENCES stocks (ticker)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_news_ticker ON news_articles (ticker, published_at)",
+    """
+    CREATE TABLE IF NOT EXISTS watchlists (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        ticker VARCHAR(10) NOT NULL,
+        added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        FOREIGN KEY (ticker) REFERENCES stocks (ticker),
+        UNIQUE (user_id, ticker)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS alerts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        ticker VARCHAR(10) NOT NULL,
+        alert_type VARCHAR(50) NOT NULL,
+        threshold REAL,
+        is_active BOOLEAN DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        FOREIGN KEY (ticker) REFERENCES stocks (ticker)
+    )
+    """,
+)
+# Columns returned as datetimes / decoded from JSON text
+TIMESTAMP_COLUMNS = frozenset(
+    ("timestamp", "created_at", "published_at", "added_at", "last_modified", "max_timestamp")
+)
+JSON_COLUMNS = frozenset(("prediction", "news"))
+# BUCKET_ORIGIN in epoch seconds, for resampling with integer arithmetic
+_ORIGIN_EPOCH = int(_BUCKET_ORIGIN_DT.timestamp())
+# ISO-8601 timestamp strings in parameters are normalized like datetimes
+_TIMESTAMP_TEXT = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+_TOKEN = re.compile(r"=\s*ANY\(%s\)|%%|%s|::[a-z]+(?:\[\])?", re.IGNORECASE)
+# stands in for an ``= ANY(%s)`` in translated SQL until its list is expanded
+_ANY = "\0"
+
+
+def _timestamp_text(value):
+    """A datetime as the UTC text timestamps are stored as."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(sep=" ")
+
+
+def _param(value):
+    """A psycopg2 parameter as a value sqlite3 can bind."""
+    if value is None or isinstance(value, (int, float, bytes)):
+        return value
+    if isinstance(value, str):
+        if _TIMESTAMP_TEXT.match(value):
+            try:
+                return _timestamp_text(datetime.fromisoformat(value))
+            except ValueError:
+                pass
+        return value
+    if isinstance(value, datetime):
+        return _timestamp_text(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, (Decimal, numbers.Real)):
+        return float(value)
+    return value
+
+
+def _to_datetime(value):
+    if not isinstance(value, str):
+        return value
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+
+@lru_cache(maxsize=512)
+def _translate(sql):
+    """
+    ``(sql, any_positions)``: psycopg2 SQL rewritten for sqlite3, and the
+    indexes of the ``= ANY(%s)`` parameters, whose placeholder is left as
+    _ANY to be expanded once their length is known.
+    """
+    out, positions, n, last = [], [], 0, 0
+    for m in _TOKEN.finditer(sql):
+        out.append(sql[last:m.start()])
+        last = m.end()
+        token = m.group()
+        if token == "%%":
+            out.append("%")
+        elif token == "%s":
+            out.append("?")
+            n += 1
+        elif token.startswith("::"):
+            continue
+        else:
+            out.append(_ANY)
+            positions.append(n)
+            n += 1
+    out.append(sql[last:])
+    return "".join(out), tuple(positions)
+
+
+def _statement(sql, params):
+    sql, positions = _translate(sql)
+    params = [_param(p) for p in params or ()]
+    if not positions:
+        return sql, params
+    parts = sql.split(_ANY)
+    text, flat, expanded = [parts[0]], [], 0
+    for i, value in enumerate(params):
+        if i in positions:
+            expanded += 1
+            flat.extend(_param(v) for v in value)
+            text.append(f"IN ({', '.join('?' * len(value))})")
+            text.append(parts[expanded])
+        else:
+            flat.append(value)
+    return "".join(text), flat
+
+
+class UnsupportedOnSQLite(RuntimeError):
+    """A Database feature that only exists on the Postgres backend."""
+
+
+class _Cursor:
+    """sqlite3 cursor taking psycopg2-style SQL and returning Postgres-like values"""
+
+    def __init__(self, cur, dict_rows=False):
+        self._cur = cur
+        self._dict_rows = dict_rows
+        self._convert = None
+        self.description = None
+        self.columns = ()
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    def execute(self, sql, params=None):
+        self._cur.execute(*_statement(sql, params))
+        self._describe()
+        return self
+
+    def executemany(self, sql, seq):
+        sql, _ = _translate(sql)
+        self._cur.executemany(sql, ([_param(p) for p in row] for row in seq))
+        self._describe()
+        return self
+
+    def _describe(self):
+        self.description = self._cur.description
+        self.columns = tuple(d[0] for d in self.description or ())
+        convert = [
+            (i, _to_datetime if name in TIMESTAMP_COLUMNS else json.loads)
+            for i, name in enumerate(self.columns)
+            if name in TIMESTAMP_COLUMNS or name in JSON_COLUMNS
+        ]
+        self._convert = convert or None
+
+    def _row(self, row):
+        if self._convert is not None:
+            row = list(row)
+            for i, fn in self._convert:
+                if row[i] is not None:
+                    row[i] = fn(row[i])
+            row = tuple(row)
+        return dict(zip(self.columns, row)) if self._dict_rows else row
+
+    def fetchone(self):
+        row = self._cur.fetchone()
+        return None if row is None else self._row(row)
+
+    def fetchmany(self, size):
+        return [self._row(r) for r in self._cur.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(r) for r in self._cur.fetchall()]
+
+    def close(self):
+        self._cur.close()
+
+
+class _Connection:
+    """Just enough of a psycopg2 connection for Database's methods"""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def cursor(self, cursor_factory=None, name=None):
+        # any cursor_factory is RealDictCursor (Database._dict_cursor)
+        return _Cursor(self.raw.cursor(), dict_rows=cursor_factory is not None)
+
+    def commit(self):
+        if self.raw.in_transaction:
+            self.raw.execute("COMMIT")
+
+    def rollback(self):
+        if self.raw.in_transaction:
+            self.raw.execute("ROLLBACK")
+
+    def close(self):
+        self.raw.close()
+
+
+class SQLiteDatabase(Database):
+    """SQLite database wrapper (WAL, per-thread readers, one writer)"""
+
+    Error = sqlite3.Error
+
+    def __init__(
+        self,
+        path: str | None = None,
+        mmap_size: int = 256 * 1024 * 1024,
+        cache_size: int = 64 * 1024 * 1024,
+        busy_timeout: float = 5.0,
+        create_schema: bool = True,
+        metrics=None,
+    ):
+        self.path = path or os.getenv("SQLITE_PATH", "feather.db")
+        self.db_url = f"sqlite:///{self.path}"
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.busy_timeout = busy_timeout
+        self.rollups = False
+        self.notify = False
+        self.notify_channel = DEFAULT_CHANNEL
+        self.statements = StatementRegistry(prepare=False)
+        self.metrics = metrics
+        self._pool = None
+
+        # Connections belong to the process that opened them (see _check_fork)
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._readers = weakref.WeakSet()
+        self._writer = None
+        self._write_lock = threading.Lock()
+        self._stats = {"checkouts": 0, "opened": 0, "wait_time_total": 0.0, "wait_time_max": 0.0}
+
+        if create_schema:
+            self.ensure_schema()
+        logger.info(
+            "Database initialized (SQLite, WAL, mmap=%dMB): %s",
+            mmap_size // (1024 * 1024), self.path,
+        )
+
+    # ============================================
+    # CONNECTIONS
+    # ============================================
+
+    def _connect(self, readonly):
+        raw = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            isolation_level=None,
+            # readers stay on their thread; the writer is shared under _write_lock
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        raw.execute("PRAGMA journal_mode = WAL")
+        raw.execute("PRAGMA synchronous = NORMAL")
+        raw.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        # negative = KiB rather than pages
+        raw.execute(f"PRAGMA cache_size = {-int(self.cache_size // 1024)}")
+        raw.execute("PRAGMA temp_store = MEMORY")
+        if readonly:
+            raw.execute("PRAGMA query_only = ON")
+        else:
+            # off by default in SQLite; has to be set on every connection
+            raw.execute("PRAGMA foreign_keys = ON")
+        self._stats["opened"] += 1
+        return _Connection(raw)
+
+    def _check_fork(self):
+        # a forked worker must not touch its parent's connections; drop
+        # them unclosed and open its own
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._local = threading.local()
+            self._readers = weakref.WeakSet()
+            self._writer = None
+            self._write_lock = threading.Lock()
+
+    def _read_connection(self):
+        """This thread's reader (closed when the thread ends)."""
+        self._check_fork()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect(readonly=True)
+            self._readers.add(conn)
+        return conn
+
+    @contextmanager
+    def get_connection(self):
+        """The writer connection in a transaction, with automatic commit/rollback"""
+        self._check_fork()
+        started = time.perf_counter()
+        with self._write_lock:
+            waited = time.perf_counter() - started
+            self._stats["checkouts"] += 1
+            self._stats["wait_time_total"] += waited
+            self._stats["wait_time_max"] = max(self._stats["wait_time_max"], waited)
+            if self.metrics is not None:
+                self.metrics.connection_acquire.observe(value=waited)
+            if self._writer is None:
+                self._writer = self._connect(readonly=False)
+            conn = self._writer
+            # take the write lock now, not at the first write, so concurrent
+            # writers from other processes wait in busy_timeout
+            conn.raw.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.error("Database transaction failed: %s", e)
+                raise
+
+    def pool_stats(self):
+        """
+        Reader connections and writer checkouts of this process
+        """
+        checkouts = self._stats["checkouts"]
+        readers = len(self._readers)
+        return {
+            "backend": "sqlite",
+            "size": readers + (self._writer is not None),
+            "in_use": int(self._write_lock.locked()),
+            "idle": readers,
+            "readers": readers,
+            "checkouts": checkouts,
+            "opened": self._stats["opened"],
+            "wait_time_total": round(self._stats["wait_time_total"], 6),
+            "wait_time_max": round(self._stats["wait_time_max"], 6),
+            "wait_time_avg": round(self._stats["wait_time_total"] / checkouts, 6)
+            if checkouts
+            else 0.0,
+        }
+
+    def close(self):
+        """
+        Close the writer and this thread's reader (other readers close with their threads)
+        """
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+    def _fetch_all(self, sql, params, label=None):
+        conn = self._read_connection()
+        cur = conn.cursor()
+        self._execute(conn, cur, sql, params, label)
+        result = ResultSet.from_cursor(cur)
+        self._record_rows(label, len(result))
+        return result
+
+    def _fetch_one(self, sql, params, label=None):
+        conn = self._read_connection()
+        cur = self._dict_cursor(conn)
+        self._execute(conn, cur, sql, params, label)
+        row = cur.fetchone()
+        cur.close()
+        self._record_rows(label, 0 if row is None else 1)
+        return row
+
+    # ============================================
+    # SCHEMA
+    # ============================================
+
+    def ensure_schema(self):
+        """
+        Create the tables and indexes if they do not exist
+        """
+        with self.get_connection() as conn:
+            columns = {
+                row[1] for row in conn.raw.execute("PRAGMA table_info(predictions)")
+            }
+            if columns and "created_at" not in columns:
+                raise RuntimeError(
+                    f"{self.path} has the old setup_database.py schema; "
+                    "delete it and run setup_database.py again"
+                )
+            for statement in SCHEMA:
+                conn.raw.execute(statement)
+
+    def ensure_rollup_schema(self):
+        raise UnsupportedOnSQLite("stock_rollups needs DB_BACKEND=postgres")
+
+    def rebuild_rollups(self, tickers=None):
+        raise UnsupportedOnSQLite("stock_rollups needs DB_BACKEND=postgres")
+
+    # ============================================
+    # POSTGRES-ONLY STATEMENTS
+    # ============================================
+
+    def _insert_many(self, sql, values, page_size, on_chunk=None):
+        # execute_values sends one multi-row VALUES per page; in-process
+        # sqlite3 has no round trip to save, so each row is one cached
+        # statement and RETURNING stays per row
+        inserted_ids = []
+        total = 0
+        row_sql = None
+        with self.get_connection() as conn:
+            cur = conn.cursor()
+            for chunk in _chunked(values, page_size):
+                if row_sql is None:
+                    row_sql = sql.replace(
+                        "VALUES %s", f"VALUES ({', '.join(['%s'] * len(chunk[0]))})"
+                    )
+                total += len(chunk)
+                ids = []
+                for row in chunk:
+                    found = cur.execute(row_sql, row).fetchone()
+                    if found is not None:
+                        ids.append(found[0])
+                if on_chunk is not None and ids:
+                    on_chunk(cur, ids)
+                inserted_ids.extend(ids)
+        return {"inserted_ids": inserted_ids, "skipped": total - len(inserted_ids)}
+
+    def copy_stock_data(self, batches, on_batch=None):
+        """
+        Load OHLCV CSV batches into stock_data (see Database.copy_stock_data)
+
+        There is no COPY: each batch is parsed with the csv module and
+        inserted with one executemany, all in one transaction.
+        """
+        inserted = skipped = 0
+        with self.get_connection() as conn:
+            cur = conn.cursor()
+            for text, rows, _tickers in batches:
+                if rows:
+                    cur.executemany(
+                        """
+                        INSERT INTO stock_data
+                            (ticker, open, high, low, close, volume, timestamp)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s)
+                        ON CONFLICT (ticker, timestamp) DO NOTHING
+                        """,
+                        csv.reader(io.StringIO(text)),
+                    )
+                    inserted += cur.rowcount
+                    skipped += rows - cur.rowcount
+                if on_batch is not None:
+                    on_batch(inserted, skipped)
+        logger.info("Copied %d stock rows (%d skipped)", inserted, skipped)
+        return {"inserted": inserted, "skipped": skipped}
+
+    def _stock_data_query(self, ticker, limit, start, end, interval):
+        if interval is None:
+            return super()._stock_data_query(ticker, limit, start, end, interval)
+        where, params = self._stock_data_range(ticker, start, end)
+        step = INTERVALS[interval]
+        # date_bin: seconds since the origin, floored to a multiple of step
+        offset = f"(CAST(strftime('%%s', timestamp) AS INTEGER) - {_ORIGIN_EPOCH})"
+        bucket = f"{offset} - (({offset} % {step}) + {step}) % {step}"
+        sql = f"""
+            SELECT %s AS ticker,
+                   datetime({_ORIGIN_EPOCH} + bucket, 'unixepoch') AS timestamp,
+                   MAX(first_open) AS open,
+                   MAX(high) AS high,
+                   MIN(low) AS low,
+                   MAX(last_close) AS close,
+                   SUM(volume) AS volume
+            FROM (
+                SELECT bucket, high, low, volume,
+                       FIRST_VALUE(open) OVER (
+                           PARTITION BY bucket ORDER BY timestamp ASC
+                       ) AS first_open,
+                       FIRST_VALUE(close) OVER (
+                           PARTITION BY bucket ORDER BY timestamp DESC
+                       ) AS last_close
+                FROM (
+                    SELECT timestamp, open, high, low, close, volume, {bucket} AS bucket
+                    FROM stock_data
+                    WHERE {where}
+                )
+            )
+            GROUP BY bucket
+            ORDER BY bucket DESC
+            LIMIT %s
+        """
+        return sql, (ticker, *params, limit)
+
+    def _dashboard_query(self, user_id, news_limit):
+        # LATERAL joins become correlated subqueries on the same indexes;
+        # nested timestamps are formatted like Postgres' json_build_object
+        iso = "strftime('%%Y-%%m-%%dT%%H:%%M:%%S+00:00', {})"
+        return (
+            f"""
+            SELECT ticker, name, sector, added_at,
+                   timestamp, open, high, low, close, volume,
+                   prev_close,
+                   close - prev_close AS change,
+                   ROUND((close - prev_close) * 100 / NULLIF(prev_close, 0), 2) AS change_pct,
+                   prediction,
+                   news
+            FROM (
+                SELECT w.ticker, s.name, s.sector, w.added_at,
+                       bar.timestamp, bar.open, bar.high, bar.low, bar.close, bar.volume,
+                       (
+                           SELECT sd.close
+                           FROM stock_data sd
+                           WHERE sd.ticker = w.ticker
+                             AND sd.timestamp < date(bar.timestamp)
+                           ORDER BY sd.timestamp DESC
+                           LIMIT 1
+                       ) AS prev_close,
+                       (
+                           SELECT json_object(
+                               'id', p.id, 'predicted_trend', p.predicted_trend,
+                               'confidence', p.confidence,
+                               'predicted_change', p.predicted_change,
+                               'model_version', p.model_version,
+                               'created_at', {iso.format("p.created_at")}
+                           )
+                           FROM predictions p
+                           WHERE p.ticker = w.ticker
+                           ORDER BY p.created_at DESC
+                           LIMIT 1
+                       ) AS prediction,
+                       (
+                           SELECT json_group_array(json(item))
+                           FROM (
+                               SELECT json_object(
+                                   'id', na.id, 'headline', na.headline,
+                                   'sentiment', na.sentiment, 'source', na.source,
+                                   'url', na.url,
+                                   'published_at', {iso.format("na.published_at")}
+                               ) AS item
+                               FROM news_articles na
+                               WHERE na.ticker = w.ticker
+                               ORDER BY na.published_at DESC NULLS LAST, na.id DESC
+                               LIMIT %s
+                           )
+                       ) AS news
+                FROM watchlists w
+                JOIN stocks s ON s.ticker = w.ticker
+                LEFT JOIN stock_data bar ON bar.id = (
+                    SELECT sd.id
+                    FROM stock_data sd
+                    WHERE sd.ticker = w.ticker
+                    ORDER BY sd.timestamp DESC
+                    LIMIT 1
+                )
+                WHERE w.user_id = %s
+            )
+            ORDER BY added_at DESC, ticker
+            """,
+            (news_limit, user_id),
+        )
+
+    def get_stock_data_batch(self, tickers, limit=30):
+        """
+        Get the latest ``limit`` OHLCV rows for several tickers
+
+        One index range scan per ticker on this thread's reader; without a
+        network round trip there is nothing to gain from unnest/LATERAL.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+        conn = self._read_connection()
+        cur = conn.cursor()
+        result, found = {}, 0
+        for ticker in tickers:
+            self._execute(
+                conn,
+                cur,
+                """
+                SELECT *
+                FROM stock_data
+                WHERE ticker = %s
+                ORDER BY timestamp DESC
+                LIMIT %s
+                """,
+                (ticker, limit),
+                "get_stock_data_batch",
+            )
+            result[ticker] = ResultSet.from_cursor(cur)
+            found += len(result[ticker])
+        self._record_rows("get_stock_data_batch", found)
+        return result
+
+    def iter_stock_data(self, ticker, start=None, end=None, batch_size=5000):
+        """
+        Stream a ticker's OHLCV rows, oldest first, in batches
+
+        sqlite3 steps through the result as batches are fetched, so memory
+        stays flat. The export gets a reader of its own, closed when the
+        generator is exhausted or closed, because a streamed response may
+        be iterated outside the request's thread.
+        """
+        where, params = self._stock_data_range(ticker, start, end)
+        conn = self._connect(readonly=True)
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                f"""
+                SELECT {", ".join(EXPORT_COLUMNS)}
+                FROM stock_data
+                WHERE {where}
+                ORDER BY timestamp
+                """,
+                params,
+            )
+            while True:
+                batch = cur.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield batch
+        finally:
+            conn.close()
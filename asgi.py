@@ -0,0 +1,15 @@
+"""
+ASGI entry point: async /api/stocks endpoints, everything else via Flask.
+
+    uvicorn asgi:app --workers 4 --port 5000
+    hypercorn asgi:app --workers 4 --bind 0.0.0.0:5000
+
+wsgi.py (gunicorn, Flask only) keeps working as before.
+"""
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app import create_app
+from app.aio import create_asgi_app
+
+app = create_asgi_app(fallback=WsgiToAsgi(create_app()))
@@ -0,0 +1,280 @@
+"""
+Drive every API endpoint at fixed concurrency levels and record a report.
+
+Seed a database with benchmarks.seed_synthetic, start the server against
+it, then run e.g.
+
+    python -m benchmarks.bench_api --base-url http://127.0.0.1:8080 \
+        --manifest bench_manifest.json --concurrency 1,8,32 --seconds 15 \
+        --upload-sizes 1MB,64MB,1GB --output results/$(git rev-parse --short HEAD).json
+
+Each scenario runs for ``--warmup`` + ``--seconds`` at every concurrency
+level, with one client thread per concurrent request and tickers and users
+picked at random from the manifest (the same sequence for the same
+``--seed``). Uploads POST generated OHLCV CSVs of each size to
+/api/upload/csv, one at a time, and time them to completion (polling the
+job for ``--upload-mode async``). Raise MAX_CONTENT_LENGTH_MB on the server
+for large files. /api/stocks/stream is not covered because its requests do
+not end.
+
+Compare two reports with ``python -m benchmarks.compare``.
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+
+import requests
+
+from benchmarks import report
+from benchmarks.synthetic import write_upload_csv
+
+# (name, path template); placeholders are filled per request
+SCENARIOS = (
+    ("health", "/api/health"),
+    ("health_pool", "/api/health/pool"),
+    ("health_queries", "/api/health/queries"),
+    ("health_cache", "/api/health/cache"),
+    ("health_repo", "/api/health/repo"),
+    ("metrics", "/api/metrics"),
+    ("stocks", "/api/stocks"),
+    ("batch_history", "/api/stocks/history?tickers={tickers}&limit=30"),
+    ("history", "/api/stocks/{ticker}/history?limit=100"),
+    ("history_hourly", "/api/stocks/{ticker}/history?interval=1h&limit=500"),
+    ("history_downsampled", "/api/stocks/{ticker}/history?max_points=500"),
+    ("history_export", "/api/stocks/{ticker}/history/export?format=csv"),
+    ("indicators", "/api/stocks/{ticker}/indicators?names=sma20,ema50,rsi14,macd&limit=200"),
+    ("prediction", "/api/stocks/{ticker}/prediction"),
+    ("news", "/api/stocks/{ticker}/news?limit=5"),
+    ("overview", "/api/stocks/{ticker}/overview"),
+    ("dashboard", "/api/users/{user}/dashboard"),
+    ("datasets", "/api/datasets"),
+    ("dataset_rows", "/api/datasets/{dataset}/rows?offset={offset}&limit=100"),
+)
+FINISHED = ("succeeded", "failed", "cancelled")
+
+
+def parse_size(text):
+    """``512KB`` / ``16MB`` / ``1GB`` -> bytes."""
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?B)\s*", text.upper())
+    if not m:
+        raise argparse.ArgumentTypeError(f"bad size {text!r}")
+    return int(float(m.group(1)) * {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}[m.group(2)])
+
+
+def discover(base, manifest_path, timeout):
+    """Tickers, user ids and dataset ids to fill the path templates with."""
+    if manifest_path:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        tickers, users = manifest["tickers"], manifest["user_ids"]
+    else:
+        stocks = requests.get(f"{base}/api/stocks", timeout=timeout).json()
+        tickers, users = [s["ticker"] for s in stocks], [1]
+    datasets = requests.get(f"{base}/api/datasets", timeout=timeout).json()
+    return {"tickers": tickers, "users": users, "datasets": [d["id"] for d in datasets]}
+
+
+def fill(template, context, rng):
+    return template.format(
+        ticker=rng.choice(context["tickers"]) if context["tickers"] else "AAPL",
+        tickers=",".join(rng.sample(context["tickers"], min(5, len(context["tickers"])))),
+        user=rng.choice(context["users"]) if context["users"] else 1,
+        dataset=rng.choice(context["datasets"]) if context["datasets"] else "",
+        offset=rng.randrange(0, 10_000),
+    )
+
+
+def run_load(base, template, context, concurrency, seconds, warmup, seed, timeout):
+    """``concurrency`` threads issuing requests back to back; the warm-up is not recorded."""
+    latencies, statuses = [], Counter()
+    errors = 0
+    lock = threading.Lock()
+    began = time.perf_counter()
+    measure_from = began + warmup
+    deadline = measure_from + seconds
+
+    def worker(n):
+        nonlocal errors
+        rng = random.Random(seed * 1000 + n)
+        session = requests.Session()
+        mine, codes, failed = [], Counter(), 0
+        while True:
+            start = time.perf_counter()
+            if start >= deadline:
+                break
+            try:
+                status = session.get(base + fill(template, context, rng), timeout=timeout).status_code
+            except requests.RequestException:
+                status = "exception"
+            if start < measure_from:
+                continue
+            mine.append(time.perf_counter() - start)
+            codes[status] += 1
+            failed += status == "exception" or status >= 400
+        with lock:
+            latencies.extend(mine)
+            statuses.update(codes)
+            errors += failed
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = max(time.perf_counter(), deadline) - measure_from
+    return report.summarize(latencies, elapsed, statuses, errors)
+
+
+class MultipartFile(io.RawIOBase):
+    """
+    multipart/form-data body with one file field, read from disk as it is
+    sent; requests would otherwise build a 1 GB body in memory.
+    """
+
+    def __init__(self, path, field="file"):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        head = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; '
+            f'filename="{os.path.basename(path)}"\r\n'
+            "Content-Type: text/csv\r\n\r\n"
+        ).encode()
+        tail = f"\r\n--{boundary}--\r\n".encode()
+        self._length = len(head) + os.path.getsize(path) + len(tail)
+        self._parts = [io.BytesIO(head), open(path, "rb"), io.BytesIO(tail)]
+
+    def __len__(self):
+        return self._length
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        out = b""
+        while self._parts and (size < 0 or len(out) < size):
+            data = self._parts[0].read(-1 if size < 0 else size - len(out))
+            if data:
+                out += data
+            else:
+                self._parts.pop(0).close()
+        return out
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(1024 * 1024)
+            if not chunk:
+                return
+            yield chunk
+
+    def close(self):
+        for part in self._parts:
+            part.close()
+        self._parts = []
+        super().close()
+
+
+def run_upload(base, path, size, rows, target, mode, timeout):
+    query = f"target={target}&mode={mode}"
+    body = MultipartFile(path)
+    start = time.perf_counter()
+    try:
+        r = requests.post(
+            f"{base}/api/upload/csv?{query}", data=body,
+            headers={"Content-Type": body.content_type}, timeout=timeout,
+        )
+        status, result = r.status_code, (r.json() if r.content else {})
+        if status == 202:
+            location = r.headers["Location"]
+            while result.get("state") not in FINISHED:
+                time.sleep(0.25)
+                result = requests.get(base + location, timeout=timeout).json()
+            status = result["state"]
+    finally:
+        body.close()
+    seconds = time.perf_counter() - start
+    return {
+        "scenario": f"upload_{size // 1024**2}MB" if size >= 1024**2 else f"upload_{size}B",
+        "target": target,
+        "mode": mode,
+        "size_bytes": os.path.getsize(path),
+        "rows": rows,
+        "status": status,
+        "seconds": round(seconds, 3),
+        "mb_per_s": round(os.path.getsize(path) / 1024**2 / seconds, 2),
+        "rows_per_s": round(rows / seconds, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--manifest", help="written by benchmarks.seed_synthetic")
+    parser.add_argument("--scenarios", help="comma-separated subset (default: all)")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--upload-sizes", default="1MB,16MB", help="e.g. 1MB,64MB,1GB ('' = none)")
+    parser.add_argument("--upload-target", choices=["dataset", "stock_data"], default="dataset")
+    parser.add_argument("--upload-mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--upload-dir", default=os.path.join(tempfile.gettempdir(), "feather-bench"))
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="bench_report.json")
+    args = parser.parse_args()
+
+    base = args.base_url.rstrip("/")
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    wanted = set(args.scenarios.split(",")) if args.scenarios else None
+    scenarios = [s for s in SCENARIOS if wanted is None or s[0] in wanted]
+    context = discover(base, args.manifest, args.timeout)
+    out = report.new_report(base_url=base, args=vars(args))
+
+    print(f"{len(context['tickers'])} tickers, {len(context['users'])} users, "
+          f"{args.seconds:.0f}s per run after {args.warmup:.0f}s warm-up")
+    print(f"{'scenario':<22}{'conc':>5}{'requests':>10}{'errors':>8}{'req/s':>10}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, template in scenarios:
+        if "{dataset}" in template and not context["datasets"]:
+            print(f"{name:<22} skipped (no datasets uploaded)")
+            continue
+        for concurrency in levels:
+            r = run_load(base, template, context, concurrency, args.seconds, args.warmup,
+                         args.seed, args.timeout)
+            out["results"].append({"scenario": name, "path": template,
+                                   "concurrency": concurrency, **r})
+            print(
+                f"{name:<22}{concurrency:>5}{r['requests']:>10}{r['errors']:>8}"
+                f"{r['rps'] or 0:>10.1f}{r['p50_ms'] or 0:>10.1f}{r['p95_ms'] or 0:>10.1f}"
+                f"{r['p99_ms'] or 0:>10.1f}"
+            )
+
+    sizes = [parse_size(s) for s in args.upload_sizes.split(",") if s.strip()]
+    if sizes:
+        os.makedirs(args.upload_dir, exist_ok=True)
+        print(f"{'upload':<22}{'MB':>10}{'status':>12}{'seconds':>10}{'MB/s':>10}{'rows/s':>12}")
+    for size in sizes:
+        path = os.path.join(args.upload_dir, f"ohlcv_{size}_{args.seed}.csv")
+        rows = write_upload_csv(path, size, args.seed)
+        u = run_upload(base, path, size, rows, args.upload_target, args.upload_mode, args.timeout)
+        out["uploads"].append(u)
+        print(
+            f"{u['scenario']:<22}{u['size_bytes'] / 1024**2:>10.1f}{str(u['status']):>12}"
+            f"{u['seconds']:>10.2f}{u['mb_per_s']:>10.1f}{u['rows_per_s']:>12.0f}"
+        )
+
+    report.save(out, args.output)
+    print(f"report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
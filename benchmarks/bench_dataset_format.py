@@ -0,0 +1,92 @@
+"""
+Compare FileRepository dataset formats (JSONL vs columnar).
+
+Writes a synthetic OHLCV dataset in chunks the same way /api/upload/csv
+does, then measures save time, full load time, single-column load time and
+disk size for each format.
+
+    python -m benchmarks.bench_dataset_format --rows 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.repository import FileRepository
+
+
+def synthetic_ohlcv(rows, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    open_ = close + rng.normal(0, 0.5, rows)
+    return pd.DataFrame({
+        "timestamp": np.arange(rows, dtype=np.int64) * 60 + 1_700_000_000,
+        "open": open_,
+        "high": np.maximum(open_, close) + rng.random(rows),
+        "low": np.minimum(open_, close) - rng.random(rows),
+        "close": close,
+        "volume": rng.integers(1_000, 5_000_000, rows),
+    })
+
+
+def disk_size(base_dir, dataset_id):
+    total = 0
+    for root, _, files in os.walk(base_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.relpath(path, base_dir).startswith(dataset_id):
+                total += os.path.getsize(path)
+    return total
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def bench(fmt, df, chunk_rows):
+    with tempfile.TemporaryDirectory() as base_dir:
+        repo = FileRepository(base_dir=base_dir, dataset_format=fmt)
+
+        def save():
+            with repo.open_writer("bench.csv") as writer:
+                for start in range(0, len(df), chunk_rows):
+                    writer.write_frame(df.iloc[start:start + chunk_rows])
+                return writer.commit({"rows": len(df)})
+
+        save_s, dataset_id = timed(save)
+        load_s, _ = timed(lambda: repo.get_dataset(dataset_id))
+        column_s, _ = timed(lambda: float(repo.read_columns(dataset_id, ["close"])["close"].sum()))
+        return {
+            "format": fmt,
+            "save_s": save_s,
+            "load_rows_s": load_s,
+            "load_close_column_s": column_s,
+            "disk_mb": disk_size(base_dir, dataset_id) / 1e6,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    df = synthetic_ohlcv(args.rows)
+    print(f"{args.rows} rows, chunks of {args.chunk_rows}")
+    print(f"{'format':<10}{'save s':>10}{'load rows s':>14}{'load close s':>14}{'disk MB':>10}")
+    for fmt in FileRepository.FORMATS:
+        r = bench(fmt, df, args.chunk_rows)
+        print(
+            f"{r['format']:<10}{r['save_s']:>10.3f}{r['load_rows_s']:>14.3f}"
+            f"{r['load_close_column_s']:>14.4f}{r['disk_mb']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Measure JSON serialization cost per 10k OHLCV rows.
+
+Builds rows shaped like a /history response (Decimal prices, timezone-aware
+timestamps) and encodes them as:
+
+- RealDictRow dicts with Flask's DefaultJSONProvider (the old path)
+- a ResultSet with FastJSONProvider on the json module fallback
+- a ResultSet with FastJSONProvider on orjson (if installed)
+
+    python -m benchmarks.bench_json --rows 100000
+"""
+
+import argparse
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from psycopg2.extras import RealDictRow
+
+from app.services import json_provider
+from app.services.json_provider import FastJSONProvider
+from app.services.resultset import ResultSet
+from benchmarks.bench_dataset_format import synthetic_ohlcv, timed
+
+COLUMNS = ["id", "ticker", "open", "high", "low", "close", "volume", "timestamp", "created_at"]
+
+
+def make_rows(n):
+    df = synthetic_ohlcv(n)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i, r in enumerate(df.itertuples(index=False)):
+        ts = start + timedelta(minutes=i)
+        rows.append((
+            i, "AAPL",
+            Decimal(f"{r.open:.2f}"), Decimal(f"{r.high:.2f}"),
+            Decimal(f"{r.low:.2f}"), Decimal(f"{r.close:.2f}"),
+            int(r.volume), ts, ts,
+        ))
+    return rows
+
+
+def as_real_dict_rows(rows):
+    out = []
+    for row in rows:
+        d = RealDictRow()
+        d.update(zip(COLUMNS, row))
+        out.append(d)
+    return out
+
+
+def per_10k(app, provider, payload, n, repeat):
+    app.json = provider(app)
+    with app.app_context():
+        best = min(timed(lambda: app.json.response(payload))[0] for _ in range(repeat))
+    return best / n * 10_000 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    rows = make_rows(args.rows)
+    dict_rows = as_real_dict_rows(rows)
+    result_set = ResultSet(COLUMNS, rows)
+
+    print(f"{args.rows} rows, best of {args.repeat}")
+    print(f"{'path':<34}{'ms / 10k rows':>14}")
+    print(f"{'RealDictRow + Flask default':<34}"
+          f"{per_10k(app, DefaultJSONProvider, dict_rows, args.rows, args.repeat):>14.1f}")
+
+    orjson = json_provider.orjson
+    json_provider.orjson = None
+    try:
+        print(f"{'ResultSet + fast (json module)':<34}"
+              f"{per_10k(app, FastJSONProvider, result_set, args.rows, args.repeat):>14.1f}")
+    finally:
+        json_provider.orjson = orjson
+    if orjson is not None:
+        print(f"{'ResultSet + fast (orjson)':<34}"
+              f"{per_10k(app, FastJSONProvider, result_set, args.rows, args.repeat):>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
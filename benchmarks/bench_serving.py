@@ -0,0 +1,90 @@
+"""
+Load-test the WSGI and ASGI serving modes against the same database.
+
+Start both servers first, e.g.
+
+    gunicorn -w 4 -b 127.0.0.1:8080 wsgi:app
+    uvicorn asgi:app --workers 4 --port 8000
+
+then run
+
+    python -m benchmarks.bench_serving --wsgi http://127.0.0.1:8080 \
+        --asgi http://127.0.0.1:8000 --path /api/stocks/AAPL/overview
+
+Each target gets ``--concurrency`` client threads issuing requests for
+``--seconds``; requests/sec and p50/p99 latency are reported.
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+import requests
+
+
+def load(url, concurrency, seconds):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        nonlocal errors
+        session = requests.Session()
+        mine, failed = [], 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                ok = session.get(url, timeout=30).status_code < 500
+            except requests.RequestException:
+                ok = False
+            mine.append(time.perf_counter() - start)
+            failed += not ok
+        with lock:
+            latencies.extend(mine)
+            errors += failed
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    began = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - began
+
+    ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(ms, 50)) if len(ms) else float("nan"),
+        "p99_ms": float(np.percentile(ms, 99)) if len(ms) else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--wsgi", help="base URL of the gunicorn (wsgi.py) server")
+    parser.add_argument("--asgi", help="base URL of the ASGI (asgi.py) server")
+    parser.add_argument("--path", default="/api/stocks/AAPL/overview")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=20)
+    args = parser.parse_args()
+
+    targets = [(name, base) for name, base in (("wsgi", args.wsgi), ("asgi", args.asgi)) if base]
+    if not targets:
+        parser.error("give at least one of --wsgi / --asgi")
+
+    print(f"GET {args.path}, {args.concurrency} clients, {args.seconds:.0f}s each")
+    print(f"{'mode':<6}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, base in targets:
+        r = load(base.rstrip("/") + args.path, args.concurrency, args.seconds)
+        print(
+            f"{name:<6}{r['requests']:>10}{r['errors']:>8}{r['rps']:>10.1f}"
+            f"{r['p50_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
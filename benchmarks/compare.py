@@ -0,0 +1,43 @@
+"""
+Compare two benchmark reports written by bench_api.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.1
+
+Prints every shared metric with its relative change and exits with status 1
+when any of them got worse by more than the threshold (throughput down or
+latency / upload time up), so it can gate CI.
+"""
+
+import argparse
+import sys
+
+from benchmarks import report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10, help="0.1 = 10%% worse")
+    args = parser.parse_args()
+
+    base, new = report.load(args.base), report.load(args.new)
+    rows = report.compare(base, new, args.threshold)
+    print(f"base {base['meta'].get('git_commit')} ({base['meta'].get('started_at')})")
+    print(f"new  {new['meta'].get('git_commit')} ({new['meta'].get('started_at')})")
+    print(f"{'scenario':<32}{'metric':<10}{'base':>12}{'new':>12}{'change':>10}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['key']:<32}{row['metric']:<10}{row['base']:>12.2f}{row['new']:>12.2f}"
+            f"{row['change']:>+10.1%}{flag}"
+        )
+    regressions = sum(row["regression"] for row in rows)
+    if not rows:
+        print("no scenarios in common")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
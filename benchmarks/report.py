@@ -0,0 +1,132 @@
+"""
+Benchmark report format and comparison.
+
+A report is one JSON document:
+
+    {
+      "version": 1,
+      "meta": {"started_at": ..., "git_commit": ..., "base_url": ..., "args": {...}},
+      "results": [{"scenario": "history", "concurrency": 8, "requests": ..., "errors": ...,
+                   "rps": ..., "p50_ms": ..., "p95_ms": ..., "p99_ms": ..., ...}],
+      "uploads": [{"scenario": "upload_16MB", "seconds": ..., "mb_per_s": ..., ...}]
+    }
+
+compare() matches the entries of two reports by scenario (and concurrency)
+and flags the ones that got slower by more than a threshold.
+"""
+
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+VERSION = 1
+# (metric, True when higher is better)
+REQUEST_METRICS = (("rps", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False))
+UPLOAD_METRICS = (("mb_per_s", True), ("seconds", False))
+
+
+def summarize(latencies, elapsed, statuses, errors):
+    """Throughput and latency percentiles of one load run (latencies in seconds)."""
+    ms = np.asarray(latencies, dtype=float) * 1000
+    stats = {
+        "requests": len(ms),
+        "errors": errors,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "seconds": round(elapsed, 3),
+        "rps": round(len(ms) / elapsed, 2) if elapsed > 0 else None,
+    }
+    if len(ms):
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        stats.update(
+            mean_ms=round(float(ms.mean()), 3),
+            p50_ms=round(float(p50), 3),
+            p95_ms=round(float(p95), 3),
+            p99_ms=round(float(p99), 3),
+            max_ms=round(float(ms.max()), 3),
+        )
+    else:
+        stats.update(mean_ms=None, p50_ms=None, p95_ms=None, p99_ms=None, max_ms=None)
+    return stats
+
+
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def new_report(**meta):
+    return {
+        "version": VERSION,
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            **meta,
+        },
+        "results": [],
+        "uploads": [],
+    }
+
+
+def save(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    if report.get("version") != VERSION:
+        raise ValueError(f"{path}: unsupported report version {report.get('version')}")
+    return report
+
+
+def _change(old, new):
+    if old in (None, 0) or new is None:
+        return None
+    return (new - old) / old
+
+
+def compare(base, new, threshold=0.10):
+    """
+    Rows ``{"key", "metric", "base", "new", "change", "regression"}`` for
+    every metric both reports have. ``change`` is relative (0.1 = +10%); a
+    regression is a change for the worse larger than ``threshold``.
+    """
+    rows = []
+    sections = (
+        ("results", REQUEST_METRICS, lambda e: f"{e['scenario']}@{e['concurrency']}"),
+        ("uploads", UPLOAD_METRICS, lambda e: e["scenario"]),
+    )
+    for section, metrics, key_of in sections:
+        old_entries = {key_of(e): e for e in base.get(section, [])}
+        for entry in new.get(section, []):
+            key = key_of(entry)
+            old = old_entries.get(key)
+            if old is None:
+                continue
+            for metric, higher_is_better in metrics:
+                change = _change(old.get(metric), entry.get(metric))
+                if change is None:
+                    continue
+                worse = -change if higher_is_better else change
+                rows.append({
+                    "key": key,
+                    "metric": metric,
+                    "base": old[metric],
+                    "new": entry[metric],
+                    "change": round(change, 4),
+                    "regression": worse > threshold,
+                })
+    return rows
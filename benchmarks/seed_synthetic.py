@@ -0,0 +1,98 @@
+"""
+Load a synthetic market into a benchmark database.
+
+Creates ``--tickers`` stocks with ``--rows-per-ticker`` one-minute bars
+each (COPY through Database.copy_stock_data), plus news, predictions,
+benchmark users and their watchlists, and writes a manifest that
+bench_api reads to pick tickers and user ids. The defaults (2,000 tickers x
+10,000 bars = 20M rows) match the scale of a production deployment; use
+something small for a smoke run:
+
+    python -m benchmarks.seed_synthetic --database-url postgresql://localhost/feather_bench \
+        --tickers 50 --rows-per-ticker 2000
+
+Point it at a dedicated, empty database (schema only), or pass
+``--sqlite bench.db`` to build a local file for DB_BACKEND=sqlite (the
+schema is created). Re-running skips existing bars, news, stocks and
+watchlist entries, but predictions have no unique key and are added again.
+"""
+
+import argparse
+import json
+import os
+import time
+
+from app.database import Database
+from app.sqlite_database import SQLiteDatabase
+from benchmarks import synthetic
+
+
+def timed_load(label, fn):
+    """Run ``fn`` (returns the inserted row count) and print its throughput."""
+    start = time.perf_counter()
+    rows = fn()
+    seconds = time.perf_counter() - start
+    rate = rows / seconds if seconds > 0 else float("inf")
+    print(f"{label:<14}{rows:>14,}{seconds:>10.1f}{rate:>14,.0f}")
+    return {"rows": rows, "seconds": round(seconds, 3)}
+
+
+def make_database(args):
+    if args.sqlite:
+        return SQLiteDatabase(args.sqlite)
+    return Database(db_url=args.database_url or os.getenv("DATABASE_URL"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL")
+    parser.add_argument("--sqlite", metavar="PATH", help="seed this SQLite file instead")
+    parser.add_argument("--tickers", type=int, default=2000)
+    parser.add_argument("--rows-per-ticker", type=int, default=10_000)
+    parser.add_argument("--news-per-ticker", type=int, default=50)
+    parser.add_argument("--predictions-per-ticker", type=int, default=20)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--watchlist-size", type=int, default=20)
+    parser.add_argument("--batch-rows", type=int, default=500_000, help="OHLCV rows per COPY")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--manifest", default="bench_manifest.json")
+    args = parser.parse_args()
+
+    db = make_database(args)
+    tickers = synthetic.ticker_symbols(args.tickers)
+    seed = args.seed
+    print(f"{args.tickers} tickers x {args.rows_per_ticker} bars, seed {seed}")
+    print(f"{'table':<14}{'rows':>14}{'seconds':>10}{'rows/s':>14}")
+
+    loads = {}
+    loads["stocks"] = timed_load("stocks", lambda: len(db.insert_stocks_bulk(
+        synthetic.stocks(tickers, seed)
+    )["inserted_ids"]))
+    loads["stock_data"] = timed_load("stock_data", lambda: db.copy_stock_data(
+        synthetic.ohlcv_batches(tickers, args.rows_per_ticker, seed, args.batch_rows)
+    )["inserted"])
+    loads["news_articles"] = timed_load("news_articles", lambda: len(db.insert_news_articles_bulk(
+        synthetic.news(tickers, args.news_per_ticker, seed)
+    )["inserted_ids"]))
+    loads["predictions"] = timed_load("predictions", lambda: len(db.insert_predictions_bulk(
+        synthetic.predictions(tickers, args.predictions_per_ticker, seed)
+    )["inserted_ids"]))
+    user_ids = db.insert_users_bulk(synthetic.users(args.users))["inserted_ids"]
+    loads["watchlists"] = timed_load("watchlists", lambda: len(db.add_to_watchlist_bulk(
+        synthetic.watchlists(user_ids, tickers, args.watchlist_size, seed)
+    )["inserted_ids"]))
+
+    manifest = {
+        "seed": seed,
+        "tickers": tickers,
+        "user_ids": user_ids,
+        "rows_per_ticker": args.rows_per_ticker,
+        "loads": loads,
+    }
+    with open(args.manifest, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    print(f"manifest written to {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Deterministic synthetic market data for the benchmark suite.
+
+Everything is derived from ``seed`` and the ticker's position, so the same
+arguments always produce the same rows, whatever the order or the batch
+sizes they are generated in. Prices are a geometric random walk on a fixed
+bar interval ending at END, and they satisfy the checks of
+app.services.ohlcv_loader.validate_frame (low <= open/close <= high,
+volume >= 0).
+"""
+
+import os
+import string
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from app.services.ohlcv_loader import COPY_COLUMNS
+
+END = int(datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp())
+SECTORS = (
+    "Technology", "Healthcare", "Financials", "Energy", "Industrials",
+    "Consumer Discretionary", "Consumer Staples", "Utilities", "Materials",
+    "Real Estate", "Communication Services",
+)
+SOURCES = ("Reuters", "Bloomberg", "AP", "MarketWatch", "CNBC")
+SENTIMENTS = ("positive", "neutral", "negative")
+TRENDS = ("up", "down", "neutral")
+UPLOAD_HEADER = "ticker,timestamp,open,high,low,close,volume\n"
+
+
+def _rng(seed, *keys):
+    return np.random.default_rng([seed, *keys])
+
+
+def ticker_symbols(n):
+    """``n`` distinct 4-letter symbols: AAAA, AAAB, ..."""
+    letters = string.ascii_uppercase
+    out = []
+    for i in range(n):
+        digits = []
+        for _ in range(4):
+            i, r = divmod(i, 26)
+            digits.append(letters[r])
+        out.append("".join(reversed(digits)))
+    return out
+
+
+def stocks(tickers, seed=7):
+    rng = _rng(seed, 0)
+    sectors = rng.integers(0, len(SECTORS), len(tickers))
+    return [
+        {"ticker": t, "name": f"{t.title()} Holdings", "sector": SECTORS[s]}
+        for t, s in zip(tickers, sectors)
+    ]
+
+
+def users(n):
+    return [
+        {"username": f"bench_user_{i}", "email": f"bench_user_{i}@example.com",
+         "password_hash": "!"}
+        for i in range(n)
+    ]
+
+
+def ohlcv_frame(ticker, index, rows, seed=7, interval=60, end=END):
+    """``rows`` bars of one ticker, oldest first, in COPY_COLUMNS order."""
+    rng = _rng(seed, 1, index)
+    start_price = rng.uniform(5, 500)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, 0.002, rows)))
+    open_ = np.concatenate(([start_price], close[:-1]))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.001, rows)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.001, rows)))
+    seconds = end - interval * np.arange(rows, 0, -1, dtype=np.int64)
+    frame = pd.DataFrame({
+        "ticker": ticker,
+        "open": open_.round(2),
+        "high": high.round(2),
+        "low": low.round(2),
+        "close": close.round(2),
+        "volume": rng.integers(100, 2_000_000, rows),
+        "timestamp": pd.to_datetime(seconds, unit="s", utc=True),
+    })
+    return frame[list(COPY_COLUMNS)]
+
+
+def ohlcv_batches(tickers, rows_per_ticker, seed=7, batch_rows=500_000, interval=60):
+    """
+    COPY batches ``(csv text, rows, tickers)`` for Database.copy_stock_data,
+    each holding whole tickers and about ``batch_rows`` rows.
+    """
+    frames, count = [], 0
+    for index, ticker in enumerate(tickers):
+        frames.append(ohlcv_frame(ticker, index, rows_per_ticker, seed, interval))
+        count += rows_per_ticker
+        if count >= batch_rows:
+            yield _copy_batch(frames, count)
+            frames, count = [], 0
+    if frames:
+        yield _copy_batch(frames, count)
+
+
+def _copy_batch(frames, count):
+    text = pd.concat(frames).to_csv(index=False, header=False, float_format="%.2f")
+    return text, count, [f["ticker"].iat[0] for f in frames]
+
+
+def news(tickers, per_ticker, seed=7):
+    for index, ticker in enumerate(tickers):
+        rng = _rng(seed, 2, index)
+        for i in range(per_ticker):
+            yield {
+                "ticker": ticker,
+                "headline": f"{ticker} {rng.choice(('beats', 'misses', 'meets'))} "
+                            f"expectations in update #{i}",
+                "summary": f"Synthetic news item {i} for {ticker}.",
+                "sentiment": SENTIMENTS[rng.integers(0, len(SENTIMENTS))],
+                "source": SOURCES[rng.integers(0, len(SOURCES))],
+                "url": f"https://news.example.com/{ticker.lower()}/{seed}/{i}",
+            }
+
+
+def predictions(tickers, per_ticker, seed=7):
+    for index, ticker in enumerate(tickers):
+        rng = _rng(seed, 3, index)
+        for _ in range(per_ticker):
+            yield {
+                "ticker": ticker,
+                "predicted_trend": TRENDS[rng.integers(0, len(TRENDS))],
+                "confidence": round(float(rng.uniform(0.5, 0.99)), 4),
+                "predicted_change": round(float(rng.normal(0, 2)), 2),
+                "model_version": "bench-v1",
+            }
+
+
+def watchlists(user_ids, tickers, per_user, seed=7):
+    rng = _rng(seed, 4)
+    per_user = min(per_user, len(tickers))
+    for user_id in user_ids:
+        for i in rng.choice(len(tickers), per_user, replace=False):
+            yield {"user_id": user_id, "ticker": tickers[i]}
+
+
+def write_upload_csv(path, size_bytes, seed=7, tickers=8):
+    """
+    Write an OHLCV CSV of about ``size_bytes`` (with a ticker column) for
+    the upload benchmark; returns the data row count. Reuses an existing
+    file of the same size.
+    """
+    if os.path.exists(path) and os.path.getsize(path) >= size_bytes:
+        with open(path, "rb") as f:
+            return sum(1 for _ in f) - 1
+    symbols = [f"U{i:04d}" for i in range(tickers)]
+    rows = 0
+    block = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(UPLOAD_HEADER)
+        written = len(UPLOAD_HEADER)
+        while written < size_bytes:
+            ticker = symbols[block % tickers]
+            # each block continues its ticker's history further back in time
+            end = END - (block // tickers) * 10_000 * 60
+            frame = ohlcv_frame(ticker, 1000 + block, 10_000, seed, end=end)
+            frame = frame[["ticker", "timestamp", "open", "high", "low", "close", "volume"]]
+            text = frame.to_csv(index=False, header=False, float_format="%.2f")
+            if written + len(text) > size_bytes:
+                lines = text.splitlines(keepends=True)
+                keep = []
+                for line in lines:
+                    if written >= size_bytes:
+                        break
+                    keep.append(line)
+                    written += len(line)
+                f.write("".join(keep))
+                rows += len(keep)
+                break
+            f.write(text)
+            written += len(text)
+            rows += len(frame)
+            block += 1
+    return rows
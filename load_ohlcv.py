@@ -0,0 +1,76 @@
+"""
+Bulk-load OHLCV CSV files into stock_data
+
+Usage:
+    python load_ohlcv.py prices.csv --ticker AAPL
+    python load_ohlcv.py all_tickers.csv --workers 8 --chunk-mb 16
+
+Files need timestamp (or date), open, high, low, close and volume columns,
+plus a ticker column unless --ticker is given. Rows failing the OHLC checks
+are skipped and counted. Rows whose (ticker, timestamp) already exists are
+left untouched. Each file loads in one transaction.
+"""
+
+import argparse
+import logging
+import sys
+from concurrent.futures.process import BrokenProcessPool
+
+from app.database import Database
+from app.services.ohlcv_loader import OHLCVLoadError, load_ohlcv
+
+
+def main():
+    # show the Database progress messages (rows copied per file)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    parser = argparse.ArgumentParser(description="Load OHLCV CSV files into stock_data")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--ticker", help="ticker of every row (otherwise read from a ticker column)")
+    parser.add_argument("--workers", type=int, default=4, help="parser processes (1 = in-process)")
+    parser.add_argument("--chunk-mb", type=float, default=8, help="split size in MB")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("LOADING OHLCV INTO stock_data")
+    print("=" * 60)
+
+    db = Database()
+    failed = 0
+    for path in args.files:
+        print(f"\n{path}")
+        try:
+            with open(path, "rb") as f:
+                report = load_ohlcv(
+                    f,
+                    db,
+                    ticker=args.ticker,
+                    workers=args.workers,
+                    chunk_bytes=int(args.chunk_mb * 1024 * 1024),
+                )
+        except (OSError, OHLCVLoadError, BrokenProcessPool) as e:
+            print(f"[ERROR] {e}")
+            failed += 1
+            continue
+
+        print(
+            f"[OK] {report['rows']} rows in {report['seconds']}s "
+            f"({report['rows_per_sec']} rows/sec): {report['inserted']} inserted, "
+            f"{report['duplicates']} already present, {report['rejected']} rejected"
+        )
+        for reason, count in report["rejections"].items():
+            print(f"  - {reason}: {count}")
+        for example in report["examples"]:
+            print(f"    row {example['row']}: {example['reason']}")
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"[FAILED] {failed} of {len(args.files)} files")
+        print("=" * 60)
+        sys.exit(1)
+    print(f"[SUCCESS] {len(args.files)} files loaded")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,10 @@ Load seed_data.json into database
 """
 
 import json
-from database import Database
+import logging
+from app.database import Database
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 
 print("="*60)
 print("LOADING SEED DATA INTO DATABASE")
@@ -21,6 +24,7 @@ except FileNotFoundError:
 print(f"\nSeed data contains:")
 print(f"  - {len(seed_data['users'])} users")
 print(f"  - {len(seed_data['stocks'])} stocks")
+print(f"  - {len(seed_data.get('stock_data', []))} OHLCV rows")
 print(f"  - {len(seed_data['predictions'])} predictions")
 print(f"  - {len(seed_data['news'])} news articles")
 print(f"  - {len(seed_data['watchlists'])} watchlists")
@@ -28,23 +32,34 @@ print(f"  - {len(seed_data['watchlists'])} watchlists")
 # Initialize database
 db = Database()
 
-# Insert predictions
-print("\nInserting predictions...")
-for pred in seed_data['predictions']:
+# Each bulk call is a single transaction made of multi-row INSERTs,
+# so a failure leaves that table untouched instead of half-loaded.
+
+# Insert OHLCV history (optional in older seed files)
+if seed_data.get('stock_data'):
+    print("\nInserting stock data...")
     try:
-        db.insert_prediction(pred)
+        db.insert_stock_data_bulk(seed_data['stock_data'])
     except Exception as e:
         print(f"  Warning: {e}")
 
+# Insert predictions
+print("\nInserting predictions...")
+try:
+    db.insert_predictions_bulk(seed_data['predictions'])
+except Exception as e:
+    print(f"  Warning: {e}")
+
 # Insert watchlists
 print("\nInserting watchlists...")
-for watchlist in seed_data['watchlists']:
-    user_id = watchlist['user_id']
-    for ticker in watchlist['stocks']:
-        try:
-            db.add_to_watchlist(user_id, ticker)
-        except Exception as e:
-            print(f"  Warning: {e}")
+try:
+    db.add_to_watchlist_bulk(
+        {"user_id": watchlist['user_id'], "ticker": ticker}
+        for watchlist in seed_data['watchlists']
+        for ticker in watchlist['stocks']
+    )
+except Exception as e:
+    print(f"  Warning: {e}")
 
 print("\n" + "="*60)
 print("[SUCCESS] Seed data loaded into database!")
@@ -61,4 +76,4 @@ for ticker in ['AAPL', 'MSFT', 'GOOGL']:
         print(f"  {ticker}: {pred['predicted_trend']} ({pred['confidence']*100:.0f}% confidence)")
 
 watchlist = db.get_user_watchlist(1)
-print(f"\n  User 1's watchlist: {', '.join([s['ticker'] for s in watchlist])}")
\ No newline at end of file
+print(f"\n  User 1's watchlist: {', '.join([s['ticker'] for s in watchlist])}")
@@ -0,0 +1,37 @@
+"""
+Create and backfill the stock_rollups table from stock_data
+
+Usage:
+    python rebuild_rollups.py             # every ticker
+    python rebuild_rollups.py AAPL MSFT   # only these tickers
+
+Safe to run while the API is ingesting: each ticker is rebuilt in its own
+transaction. Set ROLLUPS_ENABLED=true once the first full run has finished.
+"""
+
+import logging
+import os
+import sys
+
+from app.database import Database
+
+# show the Database progress messages (one line per rebuilt ticker)
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+if os.getenv("DB_BACKEND", "postgres").lower() != "postgres":
+    sys.exit("[ERROR] stock_rollups needs DB_BACKEND=postgres (SQLite serves resampled "
+             "history from stock_data directly)")
+
+print("=" * 60)
+print("REBUILDING OHLCV ROLLUPS")
+print("=" * 60)
+
+tickers = [t.upper() for t in sys.argv[1:]] or None
+
+db = Database()
+db.ensure_rollup_schema()
+written = db.rebuild_rollups(tickers)
+
+print("\n" + "=" * 60)
+print(f"[SUCCESS] {sum(written.values())} bars for {len(written)} tickers")
+print("=" * 60)
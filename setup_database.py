@@ -1,116 +1,19 @@
+import logging
 import sqlite3
+import sys
 
-# Create database
-conn = sqlite3.connect('feather.db')
-cursor = conn.cursor()
-
-print("Creating database tables...")
-
-# Create tables one by one
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS users (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    username VARCHAR(50) UNIQUE NOT NULL,
-    email VARCHAR(100) UNIQUE NOT NULL,
-    password_hash VARCHAR(255) NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-)
-''')
-print("✓ Created users table")
-
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS stocks (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    ticker VARCHAR(10) UNIQUE NOT NULL,
-    name VARCHAR(100) NOT NULL,
-    sector VARCHAR(50)
-)
-''')
-print("✓ Created stocks table")
-
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS stock_data (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    ticker VARCHAR(10) NOT NULL,
-    open DECIMAL(10, 2) NOT NULL,
-    high DECIMAL(10, 2) NOT NULL,
-    low DECIMAL(10, 2) NOT NULL,
-    close DECIMAL(10, 2) NOT NULL,
-    volume INTEGER NOT NULL,
-    timestamp INTEGER NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (ticker) REFERENCES stocks(ticker),
-    UNIQUE(ticker, timestamp)
-)
-''')
-print("✓ Created stock_data table")
-
-cursor.execute('CREATE INDEX IF NOT EXISTS idx_stock_data_ticker ON stock_data(ticker, timestamp)')
+from app.sqlite_database import SQLiteDatabase
 
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS predictions (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    ticker VARCHAR(10) NOT NULL,
-    predicted_trend VARCHAR(20) NOT NULL,
-    confidence DECIMAL(5, 4) NOT NULL,
-    predicted_change DECIMAL(10, 2),
-    model_version VARCHAR(20) NOT NULL,
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (ticker) REFERENCES stocks(ticker)
-)
-''')
-print("✓ Created predictions table")
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 
-cursor.execute('CREATE INDEX IF NOT EXISTS idx_predictions_ticker ON predictions(ticker, timestamp)')
+# Same file DB_BACKEND=sqlite serves by default (SQLITE_PATH)
+path = sys.argv[1] if len(sys.argv) > 1 else 'feather.db'
 
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS news_articles (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    ticker VARCHAR(10) NOT NULL,
-    headline TEXT NOT NULL,
-    summary TEXT,
-    content TEXT,
-    sentiment VARCHAR(20),
-    source VARCHAR(100),
-    url TEXT UNIQUE,
-    published_at TIMESTAMP,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (ticker) REFERENCES stocks(ticker)
-)
-''')
-print("✓ Created news_articles table")
-
-cursor.execute('CREATE INDEX IF NOT EXISTS idx_news_ticker ON news_articles(ticker, published_at)')
-
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS watchlists (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    user_id INTEGER NOT NULL,
-    ticker VARCHAR(10) NOT NULL,
-    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (user_id) REFERENCES users(id),
-    FOREIGN KEY (ticker) REFERENCES stocks(ticker),
-    UNIQUE(user_id, ticker)
-)
-''')
-print("✓ Created watchlists table")
-
-cursor.execute('CREATE INDEX IF NOT EXISTS idx_watchlists_user ON watchlists(user_id)')
+print("Creating database tables...")
 
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS alerts (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    user_id INTEGER NOT NULL,
-    ticker VARCHAR(10) NOT NULL,
-    alert_type VARCHAR(50) NOT NULL,
-    threshold DECIMAL(10, 2),
-    is_active BOOLEAN DEFAULT 1,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (user_id) REFERENCES users(id),
-    FOREIGN KEY (ticker) REFERENCES stocks(ticker)
-)
-''')
-print("✓ Created alerts table")
+# The schema lives in app/sqlite_database.py so the app and this script agree
+db = SQLiteDatabase(path)
+print("✓ Created users, stocks, stock_data, predictions, news_articles, watchlists and alerts tables")
 
 # Insert sample stocks
 stocks = [
@@ -122,26 +25,21 @@ stocks = [
     ('AMZN', 'Amazon.com Inc.', 'E-commerce')
 ]
 
-for ticker, name, sector in stocks:
-    try:
-        cursor.execute('INSERT INTO stocks (ticker, name, sector) VALUES (?, ?, ?)', (ticker, name, sector))
-    except sqlite3.IntegrityError:
-        pass  # Already exists
+# existing tickers are skipped
+db.insert_stocks_bulk({"ticker": t, "name": n, "sector": s} for t, n, s in stocks)
+db.close()
 
 print("✓ Inserted sample stocks")
 
-conn.commit()
-conn.close()
-
 print("\n" + "="*60)
-print("[SUCCESS] Database created: feather.db")
+print(f"[SUCCESS] Database created: {path}")
 print("="*60)
 
 # Verify
-conn = sqlite3.connect('feather.db')
+conn = sqlite3.connect(path)
 cursor = conn.cursor()
 
-cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
 tables = [t[0] for t in cursor.fetchall()]
 print(f"\nTables created: {', '.join(tables)}")
 
@@ -149,4 +47,4 @@ cursor.execute("SELECT COUNT(*) FROM stocks")
 stock_count = cursor.fetchone()[0]
 print(f"Stocks in database: {stock_count}")
 
-conn.close()
\ No newline at end of file
+conn.close()
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("quart")
+pytest.importorskip("psycopg_pool")
+
+from app.aio import create_asgi_app  # noqa: E402
+
+
+class FakeAsyncDatabase:
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+
+    async def _query(self, value):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return value
+
+    async def get_stock_data(self, ticker, limit=30, start=None, end=None, interval=None):
+        return await self._query([{"ticker": ticker, "close": 1.0}])
+
+    async def get_latest_prediction(self, ticker):
+        return await self._query({"ticker": ticker})
+
+    async def get_recent_news(self, ticker, limit=5, before=None):
+        return await self._query([])
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@localhost/test")
+    app = create_asgi_app()
+    app.extensions["db"] = FakeAsyncDatabase()
+    return app
+
+
+def test_overview_runs_queries_concurrently(app):
+    async def run():
+        r = await app.test_client().get("/api/stocks/aapl/overview")
+        return r.status_code, await r.get_json()
+
+    status, body = asyncio.run(run())
+    assert status == 200
+    assert body["history"] == [{"ticker": "AAPL", "close": 1.0}]
+    assert app.extensions["db"].peak == 3
+
+
+def test_invalid_param_is_400(app):
+    async def run():
+        return (await app.test_client().get("/api/stocks/aapl/overview?limit=0")).status_code
+
+    assert asyncio.run(run()) == 400
@@ -0,0 +1,60 @@
+import argparse
+import io
+
+import pandas as pd
+import pytest
+
+from app.services.ohlcv_loader import COPY_COLUMNS, validate_frame
+from benchmarks import report, synthetic
+from benchmarks.bench_api import MultipartFile, parse_size
+
+
+def test_synthetic_data_is_deterministic_and_valid():
+    tickers = synthetic.ticker_symbols(30)
+    assert tickers[:2] == ["AAAA", "AAAB"] and tickers[26] == "AABA"
+    assert len(set(tickers)) == 30
+
+    batches = list(synthetic.ohlcv_batches(tickers[:5], 100, seed=3, batch_rows=250))
+    assert [(rows, len(batch_tickers)) for _, rows, batch_tickers in batches] == [(300, 3), (200, 2)]
+    again = list(synthetic.ohlcv_batches(tickers[:5], 100, seed=3, batch_rows=1000))
+    assert "".join(text for text, _, _ in batches) == again[0][0]
+
+    frame = pd.read_csv(io.StringIO(batches[0][0]), names=list(COPY_COLUMNS), dtype=str)
+    valid, reasons, _ = validate_frame(frame)
+    assert len(valid) == 300 and reasons == {}
+    assert frame.groupby("ticker")["timestamp"].nunique().eq(100).all()
+
+
+def test_upload_csv_size(tmp_path):
+    path = tmp_path / "up.csv"
+    rows = synthetic.write_upload_csv(str(path), 200_000)
+    assert 200_000 <= path.stat().st_size < 200_100
+    assert rows == len(pd.read_csv(path))
+    assert synthetic.write_upload_csv(str(path), 200_000) == rows
+
+
+def test_multipart_body_streams_the_file(tmp_path):
+    path = tmp_path / "f.csv"
+    path.write_bytes(b"a,b\n1,2\n")
+    body = MultipartFile(str(path))
+    data = b"".join(body)
+    assert len(data) == len(body)
+    assert b'filename="f.csv"' in data and b"\r\n\r\na,b\n1,2\n\r\n--" in data
+    assert parse_size("16MB") == 16 * 1024**2 and parse_size("1gb") == 1024**3
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_size("lots")
+
+
+def test_summarize_and_compare():
+    stats = report.summarize([0.001 * i for i in range(1, 101)], 2.0, {200: 99, 500: 1}, 1)
+    assert stats["requests"] == 100 and stats["rps"] == 50.0
+    assert stats["statuses"] == {"200": 99, "500": 1}
+    assert stats["p50_ms"] == pytest.approx(50.5) and stats["p99_ms"] == pytest.approx(99.01)
+
+    base = report.new_report()
+    base["results"].append({"scenario": "history", "concurrency": 8, "rps": 100.0, "p95_ms": 20.0})
+    new = report.new_report()
+    new["results"].append({"scenario": "history", "concurrency": 8, "rps": 95.0, "p95_ms": 30.0})
+    rows = {r["metric"]: r for r in report.compare(base, new, threshold=0.1)}
+    assert rows["rps"]["change"] == -0.05 and not rows["rps"]["regression"]
+    assert rows["p95_ms"]["change"] == 0.5 and rows["p95_ms"]["regression"]
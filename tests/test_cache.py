@@ -0,0 +1,144 @@
+from app.services.cache import CachedDatabase, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.calls = []
+
+    def get_stock_data(self, ticker, limit=30, start=None, end=None, interval=None):
+        self.calls.append(("get_stock_data", ticker, limit))
+        return [{"ticker": ticker, "n": len(self.calls)}]
+
+    def get_latest_prediction(self, ticker):
+        self.calls.append(("get_latest_prediction", ticker))
+        return {"ticker": ticker}
+
+    def get_user_watchlist(self, user_id):
+        self.calls.append(("get_user_watchlist", user_id))
+        return [{"ticker": "AAPL"}, {"ticker": "MSFT"}]
+
+    def get_user_dashboard(self, user_id, news_limit=3):
+        self.calls.append(("get_user_dashboard", user_id, news_limit))
+        return [{"ticker": "AAPL"}, {"ticker": "MSFT"}]
+
+    def insert_stock_data(self, data):
+        return 1
+
+    def insert_prediction(self, prediction):
+        return 1
+
+    def insert_stock_data_bulk(self, rows, page_size=1000):
+        rows = list(rows)
+        return {"inserted_ids": list(range(len(rows))), "skipped": 0}
+
+    def pool_stats(self):
+        return {"in_use": 0}
+
+
+def test_ttl_and_lru():
+    clock = FakeClock()
+    cache = TTLCache(max_entries=2, clock=clock)
+    cache.set("a", 1, ttl=10)
+    cache.set("b", 2, ttl=10)
+    assert cache.get("a") == 1  # "a" is now most recently used
+    cache.set("c", 3, ttl=10)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    clock.now = 11
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 2
+
+
+def test_read_through_and_ticker_invalidation():
+    fake = FakeDatabase()
+    db = CachedDatabase(fake, TTLCache())
+
+    db.get_stock_data("AAPL", 30)
+    db.get_stock_data("AAPL", 30)
+    db.get_stock_data("MSFT", 30)
+    db.get_latest_prediction("AAPL")
+    assert len(fake.calls) == 3
+
+    db.insert_stock_data({"ticker": "AAPL"})
+    db.get_stock_data("AAPL", 30)
+    db.get_stock_data("MSFT", 30)
+    db.get_latest_prediction("AAPL")  # other tables for AAPL stay cached
+    assert len(fake.calls) == 4
+
+    db.insert_stock_data_bulk(iter([{"ticker": "MSFT"}]))
+    db.get_stock_data("MSFT", 30)
+    assert len(fake.calls) == 5
+
+    assert db.pool_stats() == {"in_use": 0}
+    assert db.cache_stats()["hits"] == 3
+
+
+def test_invalidation_during_load_is_not_cached():
+    cache = TTLCache()
+
+    def loader():
+        cache.invalidate_tag("stock_data:AAPL")
+        return "stale"
+
+    assert cache.get_or_load("k", loader, ttl=10, tags=["stock_data:AAPL"]) == "stale"
+    assert cache.get("k") is None
+
+
+def test_dashboard_is_cached_per_user_and_dropped_on_ticker_writes():
+    fake = FakeDatabase()
+    db = CachedDatabase(fake, TTLCache())
+
+    db.get_user_dashboard(1)
+    db.get_user_dashboard(1)
+    db.get_user_dashboard(2)
+    assert [c for c in fake.calls if c[0] == "get_user_dashboard"] == [
+        ("get_user_dashboard", 1, 3), ("get_user_dashboard", 2, 3),
+    ]
+
+    # a new prediction for a watchlist ticker drops both users' dashboards
+    db.insert_prediction({"ticker": "MSFT"})
+    db.get_user_dashboard(1)
+    db.insert_stock_data({"ticker": "NVDA"})
+    db.get_user_dashboard(1)
+    assert [c for c in fake.calls if c[0] == "get_user_dashboard"][2:] == [
+        ("get_user_dashboard", 1, 3),
+    ]
+
+
+def test_row_budget_evicts_least_recently_used():
+    cache = TTLCache(max_rows=100, max_entry_rows=60)
+    cache.set("a", [{}] * 30, ttl=10)
+    cache.set("b", [{}] * 30, ttl=10)
+    cache.set("c", {"price": 1.0}, ttl=10)  # a single record weighs 1
+    assert cache.get("a") is not None  # "b" is now the oldest
+    cache.set("big", [{}] * 60, ttl=10)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    stats = cache.stats()
+    assert stats["rows"] == 91 and stats["evictions"] == 1
+
+    # a result above the per-entry limit is not cached and evicts nothing
+    cache.set("huge", [{}] * 61, ttl=10)
+    assert cache.get("huge") is None and len(cache) == 3
+    assert cache.stats()["oversized"] == 1
+
+
+def test_oversized_results_are_served_uncached():
+    fake = FakeDatabase()
+    fake.get_stock_data = lambda ticker, *args: fake.calls.append(ticker) or [{}] * 50
+    db = CachedDatabase(fake, TTLCache(max_rows=1000, max_entry_rows=20))
+    assert len(db.get_stock_data("AAPL", 50)) == 50
+    assert len(db.get_stock_data("AAPL", 50)) == 50
+    assert fake.calls == ["AAPL", "AAPL"] and db.cache_stats()["rows"] == 0
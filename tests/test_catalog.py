@@ -0,0 +1,42 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.repository import FileRepository
+
+
+def test_manifest_is_migrated_once(tmp_path):
+    manifest = {
+        "a1": {"id": "a1", "name": "old.csv", "meta": {"rows": 1}},
+        "b2": {"id": "b2", "name": "older.csv", "meta": {"rows": 2}},
+    }
+    (tmp_path / "manifest.json").write_text(json.dumps(manifest))
+    (tmp_path / "a1.rows.jsonl").write_text('{"x": 1}\n')
+
+    repo = FileRepository(base_dir=str(tmp_path))
+    assert not (tmp_path / "manifest.json").exists()
+    assert (tmp_path / "manifest.json.migrated").exists()
+    assert repo.get_dataset("a1")["rows"] == [{"x": 1}]
+    assert {d["id"] for d in repo.list_datasets()} == {"a1", "b2"}
+
+    # reopening does not duplicate anything
+    assert len(FileRepository(base_dir=str(tmp_path)).list_datasets()) == 2
+
+
+def test_concurrent_saves_and_pagination(tmp_path):
+    repo = FileRepository(base_dir=str(tmp_path))
+
+    def save(i):
+        return repo.save_dataset(f"ds{i:02d}.csv", {"rows": i}, [{"i": i}])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = list(pool.map(save, range(20)))
+
+    other = FileRepository(base_dir=str(tmp_path))  # e.g. another worker
+    assert other.catalog.count() == 20
+    assert other.get_dataset(ids[7])["rows"] == [{"i": 7}]
+
+    page = other.list_datasets(limit=5, offset=5, sort="name", order="desc")
+    assert [d["name"] for d in page] == [f"ds{i:02d}.csv" for i in range(14, 9, -1)]
+    assert [d["meta"]["rows"] for d in other.list_datasets(limit=3, sort="rows")] == [0, 1, 2]
+
+
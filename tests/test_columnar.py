@@ -0,0 +1,44 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from app.services.repository import FileRepository
+
+
+def save_chunks(repo, chunks, name="prices.csv"):
+    with repo.open_writer(name) as writer:
+        for chunk in chunks:
+            writer.write_frame(pd.DataFrame(chunk))
+        return writer.commit({"rows": writer.rows_written})
+
+
+def test_columnar_roundtrip_with_type_widening(tmp_path):
+    repo = FileRepository(base_dir=str(tmp_path), dataset_format="columnar")
+    dataset_id = save_chunks(repo, [
+        {"close": [1, 2], "volume": [10, 20], "note": ["a", "b"]},
+        {"close": [2.5, float("nan")], "volume": [30, 40], "note": ["c", None]},
+        {"close": [3.0], "volume": ["n/a"], "note": ["d"]},
+    ])
+
+    cols = repo.read_columns(dataset_id, ["close"])
+    assert list(cols) == ["close"]
+    assert isinstance(cols["close"], np.memmap)
+    assert cols["close"].dtype == np.float64
+    assert cols["close"][:3].tolist() == [1.0, 2.0, 2.5]
+
+    rows = repo.get_dataset(dataset_id)["rows"]
+    assert [r["volume"] for r in rows] == [10, 20, 30, 40, "n/a"]
+    assert [r["note"] for r in rows] == ["a", "b", "c", None, "d"]
+    assert math.isnan(rows[3]["close"])
+
+    assert repo.get_dataset(dataset_id, columns=["note"])["rows"][0] == {"note": "a"}
+
+
+def test_jsonl_datasets_stay_readable(tmp_path):
+    legacy = FileRepository(base_dir=str(tmp_path))
+    dataset_id = legacy.save_dataset("old.csv", {"rows": 2}, [{"open": 1}, {"open": 2}])
+
+    repo = FileRepository(base_dir=str(tmp_path), dataset_format="columnar")
+    assert repo.get_dataset(dataset_id)["rows"] == [{"open": 1}, {"open": 2}]
+    assert repo.read_columns(dataset_id)["open"].tolist() == [1, 2]
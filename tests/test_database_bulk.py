@@ -0,0 +1,53 @@
+import psycopg2
+import psycopg2.extras
+
+from app.database import Database
+
+
+class FakeConnection:
+    def __init__(self):
+        self.commits = 0
+
+    def cursor(self, *args, **kwargs):
+        return object()
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_stock_data_bulk_chunks_in_one_transaction(monkeypatch):
+    conn = FakeConnection()
+    seen_keys = set()
+    pages = []
+
+    def fake_execute_values(cur, sql, argslist, page_size=100, fetch=False):
+        pages.append(len(argslist))
+        returned = []
+        for values in argslist:
+            key = (values[0], values[-1])
+            if key not in seen_keys:  # ON CONFLICT (ticker, timestamp) DO NOTHING
+                seen_keys.add(key)
+                returned.append((len(seen_keys),))
+        return returned
+
+    monkeypatch.setattr(psycopg2, "connect", lambda url: conn)
+    monkeypatch.setattr(psycopg2.extras, "execute_values", fake_execute_values)
+
+    db = Database(db_url="postgresql://u:p@localhost/test")
+    rows = (
+        {"ticker": "AAPL", "open": 1, "high": 2, "low": 0.5, "close": 1.5,
+         "volume": 10, "timestamp": i % 5}
+        for i in range(7)
+    )
+    result = db.insert_stock_data_bulk(rows, page_size=3)
+
+    assert pages == [3, 3, 1]
+    assert conn.commits == 1
+    assert result["inserted_ids"] == [1, 2, 3, 4, 5]
+    assert result["skipped"] == 2
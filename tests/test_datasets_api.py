@@ -0,0 +1,88 @@
+import io
+import os
+
+import pytest
+
+from app import create_app
+
+
+@pytest.fixture(params=["jsonl", "columnar"])
+def app(request, monkeypatch, tmp_path):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@localhost/test")
+    monkeypatch.setenv("PERSIST_MODE", "files")
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("DATASET_FORMAT", request.param)
+    monkeypatch.setenv("UPLOAD_CHUNK_ROWS", "7")
+    return create_app()
+
+
+def upload(client, rows=50):
+    body = "ticker,close\n" + "".join(f"T{i},{i}.5\n" for i in range(rows))
+    r = client.post(
+        "/api/upload/csv",
+        data={"file": (io.BytesIO(body.encode()), "t.csv")},
+        content_type="multipart/form-data",
+    )
+    return r.get_json()["dataset_id"]
+
+
+def test_rows_page(app):
+    client = app.test_client()
+    dataset_id = upload(client)
+
+    r = client.get(f"/api/datasets/{dataset_id}/rows?offset=40&limit=3&columns=close")
+    assert r.status_code == 200
+    js = r.get_json()
+    assert js["total"] == 50
+    assert js["rows"] == [{"close": 40.5}, {"close": 41.5}, {"close": 42.5}]
+
+    r = client.get(f"/api/datasets/{dataset_id}/rows?offset=48&limit=10")
+    assert [row["ticker"] for row in r.get_json()["rows"]] == ["T48", "T49"]
+
+    r = client.get("/api/datasets")
+    assert [d["id"] for d in r.get_json()] == [dataset_id]
+
+
+def test_legacy_jsonl_index_built_on_demand(app, tmp_path):
+    client = app.test_client()
+    dataset_id = upload(client, rows=10)
+    for name in os.listdir(tmp_path):
+        if name.endswith(".idx"):
+            os.remove(tmp_path / name)
+        elif name.endswith(".cols"):
+            for inner in os.listdir(tmp_path / name):
+                if inner.endswith(".idx"):
+                    os.remove(tmp_path / name / inner)
+
+    r = client.get(f"/api/datasets/{dataset_id}/rows?offset=9&limit=5")
+    assert r.get_json()["rows"] == [{"ticker": "T9", "close": 9.5}]
+
+
+def test_rows_errors(app):
+    client = app.test_client()
+    assert client.get("/api/datasets/nope/rows").status_code == 404
+    r = client.get("/api/datasets/nope/rows?limit=100000")
+    assert r.status_code == 400
+    assert "limit" in r.get_json()["error"]
+    assert client.get("/api/datasets?sort=bogus").status_code == 400
+
+
+def test_rows_skip_corrupt_jsonl_lines(app, tmp_path):
+    if app.config["DATASET_FORMAT"] != "jsonl":
+        pytest.skip("JSONL datasets only")
+    client = app.test_client()
+    dataset_id = upload(client, rows=3)
+    rows_path = app.extensions["repo"]._rows_path(dataset_id)
+    lines = open(rows_path, encoding="utf-8").read().splitlines(keepends=True)
+    lines[1] = '{"ticker": "T1", "cl\n'
+    with open(rows_path, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    for name in os.listdir(tmp_path):
+        if name.endswith(".idx"):
+            os.remove(tmp_path / name)
+
+    r = client.get(f"/api/datasets/{dataset_id}/rows")
+    assert r.status_code == 200
+    assert [row["ticker"] for row in r.get_json()["rows"]] == ["T0", "T2"]
+    ds = app.extensions["repo"].get_dataset(dataset_id)
+    assert [row["ticker"] for row in ds["rows"]] == ["T0", "T2"]
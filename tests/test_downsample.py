@@ -0,0 +1,27 @@
+import numpy as np
+
+from app.services.downsample import downsample_rows, lttb_indices
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50.0)
+    y[417] = 25.0
+    idx = lttb_indices(x, y, 40)
+    assert len(idx) == 40
+    assert idx[0] == 0 and idx[-1] == 999
+    assert np.all(np.diff(idx) > 0)
+    assert 417 in idx
+
+
+def test_lttb_short_series_is_untouched():
+    assert list(lttb_indices(np.arange(5.0), np.ones(5), 10)) == [0, 1, 2, 3, 4]
+
+
+def test_downsample_rows_preserves_descending_order():
+    rows = [{"timestamp": 100 - i, "close": float(i % 3)} for i in range(100)]
+    out = downsample_rows(rows, 10)
+    assert len(out) == 10
+    ts = [r["timestamp"] for r in out]
+    assert ts == sorted(ts, reverse=True)
+    assert out[0] is rows[0] and out[-1] is rows[-1]
@@ -0,0 +1,155 @@
+import json
+
+import psycopg2
+import psycopg2.extras
+import pytest
+
+from app import create_app
+from app.database import Database
+from app.services.events import Event, EventBroker, TooManySubscribers, format_sse
+
+
+class RecordingCursor:
+    def __init__(self, executed):
+        self.executed = executed
+
+    def execute(self, sql, params=None):
+        self.executed.append((" ".join(sql.split()), params))
+
+    def fetchone(self):
+        return (1,)
+
+
+class FakeConnection:
+    def __init__(self):
+        self.executed = []
+
+    def cursor(self, *args, **kwargs):
+        return RecordingCursor(self.executed)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def unreachable():
+    raise psycopg2.OperationalError("no database in tests")
+
+
+def event(type, ticker, **data):
+    return Event.parse(json.dumps({"type": type, "ticker": ticker, **data}))
+
+
+@pytest.fixture
+def broker():
+    broker = EventBroker(unreachable, max_subscribers=2)
+    yield broker
+    broker.close()
+
+
+def test_fan_out_by_ticker(broker):
+    aapl = broker.subscribe(["aapl"])
+    both = broker.subscribe(["AAPL", "MSFT"])
+    broker.publish(event("price", "AAPL", close=1))
+    broker.publish(event("price", "MSFT", close=2))
+    broker.publish(event("price", "NVDA", close=3))
+
+    assert [e.ticker for e in aapl.get(0)] == ["AAPL"]
+    assert [e.ticker for e in both.get(0)] == ["AAPL", "MSFT"]
+    assert aapl.get(0) == []
+    assert broker.stats()["dispatched"] == 3
+
+
+def test_slow_consumer_gets_latest_event(broker):
+    sub = broker.subscribe(["AAPL"])
+    for close in range(5):
+        broker.publish(event("price", "AAPL", close=close))
+    broker.publish(event("news", "AAPL", count=1))
+
+    price, news = sub.get(0)
+    assert json.loads(price.data)["close"] == 4
+    assert price.coalesced == 4 and news.coalesced == 0
+    assert json.loads(format_sse(price, 7).split("data: ")[1]) == {
+        "type": "price", "ticker": "AAPL", "close": 4, "coalesced": 4,
+    }
+
+
+def test_subscriber_limit_and_unsubscribe(broker):
+    first = broker.subscribe(["AAPL"])
+    with broker.subscribe(["MSFT"]):
+        with pytest.raises(TooManySubscribers):
+            broker.subscribe(["NVDA"])
+    first.close()
+    first.close()
+    assert broker.stats()["subscribers"] == 0
+    assert broker.stats()["tickers"] == 0
+
+
+def test_invalid_payload_is_ignored(broker):
+    sub = broker.subscribe(["AAPL"])
+    broker._receive("not json")
+    broker._receive('{"ticker": "AAPL"}')
+    assert sub.get(0) == []
+    assert broker.stats()["invalid"] == 2
+
+
+def test_inserts_notify(monkeypatch):
+    def fake_execute_values(cur, sql, argslist, page_size=100, fetch=False):
+        return [(i,) for i, _ in enumerate(argslist)]
+
+    conn = FakeConnection()
+    monkeypatch.setattr(psycopg2, "connect", lambda url: conn)
+    monkeypatch.setattr(psycopg2.extras, "execute_values", fake_execute_values)
+    db = Database(db_url="postgresql://u:p@localhost/test", notify=True, notify_channel="ch")
+
+    row = {"ticker": "AAPL", "open": 1, "high": 2, "low": 0.5, "close": 1.5,
+           "volume": 10, "timestamp": 0}
+    db.insert_stock_data(row)
+    db.insert_stock_data_bulk([row] * 3, page_size=2)
+    db.insert_prediction({"ticker": "AAPL", "predicted_trend": "up",
+                          "confidence": 0.9, "model_version": "v1"})
+    db.insert_news_article({"ticker": "AAPL", "headline": "h", "url": "u"})
+
+    notifies = [(s, p) for s, p in conn.executed if s.startswith("SELECT pg_notify")]
+    assert [p for _, p in notifies] == [("ch", [1]), ("ch", [0, 1]), ("ch", [0]),
+                                        ("ch", [1]), ("ch", [1])]
+    assert "FROM predictions" in notifies[3][0]
+    assert "FROM news_articles" in notifies[4][0]
+
+    conn.executed.clear()
+    db.notify = False
+    db.insert_stock_data(row)
+    assert not any("pg_notify" in s for s, _ in conn.executed)
+
+
+def test_stream_endpoint(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@localhost/test")
+    app = create_app()
+    app.config["STREAM_HEARTBEAT"] = 0.01
+    broker = app.extensions["events"] = EventBroker(unreachable, max_subscribers=1)
+    client = app.test_client()
+
+    assert client.get("/api/stocks/stream").status_code == 400
+
+    r = client.get("/api/stocks/stream?tickers=aapl,msft", buffered=False)
+    assert r.status_code == 200
+    assert r.mimetype == "text/event-stream"
+    assert client.get("/api/stocks/stream?tickers=nvda").status_code == 503
+
+    chunks = iter(r.response)
+    assert next(chunks).startswith(b"retry: 3000\n: subscribed to AAPL,MSFT")
+    assert next(chunks) == b": keep-alive\n\n"
+
+    broker.publish(event("price", "MSFT", close=2))
+    assert next(chunks) == (
+        b'event: price\nid: 1\ndata: {"type": "price", "ticker": "MSFT", "close": 2}\n\n'
+    )
+
+    r.close()
+    assert broker.stats()["subscribers"] == 0
+    broker.close()
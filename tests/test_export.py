@@ -0,0 +1,137 @@
+import gzip
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import psycopg2
+import pytest
+
+from app import create_app
+from app.database import Database
+from app.services import export
+
+
+def bar(i):
+    return ("AAPL", datetime(2025, 1, 1, 0, i, tzinfo=timezone.utc),
+            Decimal("10.5"), Decimal("11"), Decimal("10"), Decimal("10.75"), 100 + i)
+
+
+class ExportDatabase:
+    def __init__(self, rows=5):
+        self.rows = [bar(i) for i in range(rows)]
+        self.calls = []
+
+    def iter_stock_data(self, ticker, start=None, end=None, batch_size=5000):
+        self.calls.append(dict(ticker=ticker, start=start, end=end, batch_size=batch_size))
+        for i in range(0, len(self.rows), batch_size):
+            yield self.rows[i:i + batch_size]
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@localhost/test")
+    app = create_app()
+    app.extensions["db"] = ExportDatabase()
+    return app
+
+
+def test_csv_export_streams_batches(app):
+    client = app.test_client()
+    r = client.get("/api/stocks/aapl/history/export?itersize=2&from=2025-01-01")
+    assert r.status_code == 200
+    assert r.mimetype == "text/csv"
+    assert r.headers["Content-Disposition"] == 'attachment; filename="AAPL_history.csv"'
+    assert r.headers["X-Accel-Buffering"] == "no"
+
+    lines = r.get_data(as_text=True).splitlines()
+    assert lines[0] == "ticker,timestamp,open,high,low,close,volume"
+    assert lines[1] == "AAPL,2025-01-01T00:00:00+00:00,10.5,11,10,10.75,100"
+    assert len(lines) == 6
+
+    call = app.extensions["db"].calls[0]
+    assert call["ticker"] == "AAPL" and call["batch_size"] == 2
+    assert call["start"] == datetime(2025, 1, 1, tzinfo=timezone.utc) and call["end"] is None
+
+
+def test_ndjson_gzip_export(app):
+    r = app.test_client().get("/api/stocks/aapl/history/export?format=ndjson&compress=gzip")
+    assert r.status_code == 200
+    assert r.mimetype == "application/gzip"
+    assert 'filename="AAPL_history.ndjson.gz"' in r.headers["Content-Disposition"]
+
+    rows = [json.loads(line) for line in gzip.decompress(r.data).decode().splitlines()]
+    assert len(rows) == 5
+    assert rows[0]["ticker"] == "AAPL" and rows[0]["volume"] == 100
+    assert float(rows[0]["close"]) == 10.75
+
+
+def test_export_params(app, monkeypatch):
+    client = app.test_client()
+    assert client.get("/api/stocks/aapl/history/export?format=xml").status_code == 400
+    assert client.get("/api/stocks/aapl/history/export?itersize=0").status_code == 400
+
+    monkeypatch.setattr(export, "pa", None)
+    r = client.get("/api/stocks/aapl/history/export?format=parquet")
+    assert r.status_code == 400 and "pyarrow" in r.get_json()["error"]
+
+
+def test_empty_csv_export_has_header():
+    chunks = list(export.csv_stream(["a", "b"], iter([])))
+    assert b"".join(chunks) == b"a,b\n"
+
+
+class NamedCursor:
+    def __init__(self, log, rows):
+        self.log = log
+        self.rows = rows
+        self.itersize = None
+
+    def execute(self, sql, params=None):
+        self.log.append((" ".join(sql.split()), params))
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+
+class ExportConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.log = []
+        self.cursor_names = []
+
+    def cursor(self, name=None, **kwargs):
+        self.cursor_names.append(name)
+        self.last_cursor = NamedCursor(self.log, list(self.rows))
+        return self.last_cursor
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+    def close(self):
+        self.log.append("CLOSE")
+
+
+def test_iter_stock_data_uses_server_side_cursor(monkeypatch):
+    conn = ExportConnection([bar(i) for i in range(5)])
+    monkeypatch.setattr(psycopg2, "connect", lambda url: conn)
+    db = Database(db_url="postgresql://u:p@localhost/test")
+
+    batches = list(db.iter_stock_data("AAPL", batch_size=2))
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert conn.cursor_names[0].startswith("export_")
+    assert conn.last_cursor.itersize == 2
+    sql, params = conn.log[0]
+    assert sql.startswith("SELECT ticker, timestamp, open, high, low, close, volume FROM stock_data")
+    assert sql.endswith("ORDER BY timestamp") and params == ["AAPL"]
+    assert conn.log[1:] == ["COMMIT", "CLOSE"]
+
+    # a client that disconnects mid-download closes the generator
+    conn.log.clear()
+    batches = db.iter_stock_data("AAPL", batch_size=2)
+    next(batches)
+    batches.close()
+    assert conn.log[1:] == ["ROLLBACK", "CLOSE"]
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from app import create_app
+from app.services import indicators as ind
+
+
+def series(n, seed=3):
+    return 100 + np.cumsum(np.random.default_rng(seed).normal(size=n))
+
+
+def test_sma_and_rsi_reference_values():
+    close = np.arange(1.0, 11.0)
+    assert np.isnan(ind.sma(close, 3)[:2]).all()
+    assert ind.sma(close, 3)[2:].tolist() == pytest.approx(np.arange(2.0, 10.0).tolist())
+    # only gains: RSI saturates at 100
+    assert ind.rsi(close, 5)[5:].tolist() == [100.0] * 5
+
+
+@pytest.mark.parametrize("name", ["sma20", "ema50", "rsi14", "macd", "bb20"])
+def test_incremental_matches_vectorized(name):
+    close = series(400)
+    (spec,) = ind.parse_names([name])
+    full = ind.compute(close, spec)
+
+    state = ind.make_state(spec)
+    state.seed(close[:300])
+    updates = [state.update(x) for x in close[300:]]
+    for col, values in full.items():
+        assert [u[col] for u in updates] == pytest.approx(values[300:].tolist())
+
+
+def test_parse_names():
+    assert ind.parse_names(["SMA20", "macd", "sma20"]) == [("sma", 20), ("macd", 0)]
+    for bad in ["sma", "wma10", "rsi1", "ema100000"]:
+        with pytest.raises(ind.UnknownIndicator):
+            ind.parse_names([bad])
+
+
+class FakeDatabase:
+    def __init__(self, closes):
+        self.bars = [{"timestamp": i, "close": c} for i, c in enumerate(closes)]
+        self.calls = []
+
+    def get_stock_data(self, ticker, limit=30, start=None, end=None, interval=None):
+        self.calls.append((limit, start))
+        rows = [b for b in self.bars if start is None or b["timestamp"] >= start]
+        return rows[::-1][:limit]
+
+    def get_stock_data_version(self, ticker, limit=30, start=None, end=None, interval=None):
+        return {"rows": len(self.bars), "max_id": len(self.bars)}
+
+
+def test_engine_updates_incrementally():
+    close = series(600)
+    db = FakeDatabase(close[:500])
+    engine = ind.IndicatorEngine()
+    specs = ind.parse_names(["ema20", "rsi14"])
+
+    first = engine.series(db, "AAPL", specs, 10)
+    assert [r["timestamp"] for r in first] == list(range(499, 489, -1))
+
+    db.bars += [{"timestamp": i, "close": close[i]} for i in range(500, 510)]
+    second = engine.series(db, "AAPL", specs, 10)
+    assert engine.stats()["full_runs"] == 1
+    assert engine.stats()["incremental_runs"] == 1
+    assert db.calls[-1][1] == 499
+
+    expected = ind.ema(close[:510], 20)[-10:][::-1]
+    assert [r["ema20"] for r in second] == pytest.approx(expected.tolist(), rel=1e-3)
+
+    # asking for an indicator the entry does not hold recomputes everything
+    engine.series(db, "AAPL", ind.parse_names(["sma5"]), 10)
+    assert engine.stats()["full_runs"] == 2
+
+
+def test_indicators_endpoint(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@localhost/test")
+    app = create_app()
+    app.extensions["db"] = FakeDatabase(series(300))
+    client = app.test_client()
+
+    r = client.get("/api/stocks/aapl/indicators?names=sma20,macd,bb20&limit=5")
+    assert r.status_code == 200
+    rows = r.get_json()
+    assert len(rows) == 5
+    assert set(rows[0]) == {
+        "timestamp", "close", "sma20", "macd", "macd_signal", "macd_hist",
+        "bb20_upper", "bb20_middle", "bb20_lower",
+    }
+
+    assert client.get("/api/stocks/aapl/indicators").status_code == 400
+    assert client.get("/api/stocks/aapl/indicators?names=foo").status_code == 400
@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app import create_app
+from app.services import json_provider
+from app.services.resultset import ResultSet
+
+ROWS = ResultSet(
+    ["ticker", "close", "timestamp"],
+    [("AAPL", Decimal("186.20"), datetime(2025, 11, 18, 20, tzinfo=timezone.utc))],
+)
+
+
+def make_app(monkeypatch, provider="fast"):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@localhost/test")
+    monkeypatch.setenv("JSON_PROVIDER", provider)
+    return create_app()
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_fast_provider_types(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(json_provider, "orjson", None)
+    app = make_app(monkeypatch)
+    payload = {"rows": ROWS, "n": np.int64(3), "nan": float("nan"), "arr": np.arange(2)}
+    with app.app_context():
+        body = app.json.response(payload).get_data()
+    assert body == (
+        b'{"rows":[{"ticker":"AAPL","close":186.2,"timestamp":"2025-11-18T20:00:00+00:00"}],'
+        b'"n":3,"nan":null,"arr":[0,1]}\n'
+    )
+
+
+def test_flask_provider_keeps_default_formats(monkeypatch):
+    app = make_app(monkeypatch, "flask")
+    with app.app_context():
+        data = app.json.loads(app.json.dumps(ROWS))
+    assert data == [{"close": "186.20", "ticker": "AAPL",
+                     "timestamp": "Tue, 18 Nov 2025 20:00:00 GMT"}]
+
+
+def test_resultset_behaves_like_rows():
+    rows = ResultSet(["a", "b"], [(1, 2), (3, 4), (5, 6)])
+    assert rows[1] == {"a": 3, "b": 4}
+    assert rows[:2] == [{"a": 1, "b": 2}, {"a": 3, "b": 4}]
+    assert [r["a"] for r in reversed(rows)] == [5, 3, 1]
+    assert rows.column("b") == [2, 4, 6]
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.repository import DatasetTooLarge, InMemoryRepository
+
+
+def frame(n, start=0):
+    return pd.DataFrame({
+        "close": np.arange(start, start + n, dtype=np.float64),
+        "volume": np.arange(start, start + n, dtype=np.int64),
+    })
+
+
+def save(repo, df, name="d.csv"):
+    with repo.open_writer(name) as writer:
+        writer.write_frame(df)
+        return writer.commit({"rows": len(df)})
+
+
+def test_compact_storage_and_ids():
+    repo = InMemoryRepository()
+    ids = {repo.save_dataset("a.csv", {}, [{"x": 1, "s": "a"}, {"x": 2.5, "s": None}])
+           for _ in range(50)}
+    assert len(ids) == 50
+
+    dataset_id = next(iter(ids))
+    cols = repo.read_columns(dataset_id)
+    assert cols["x"].dtype == np.float64
+    assert repo.get_dataset(dataset_id)["rows"] == [{"x": 1.0, "s": "a"}, {"x": 2.5, "s": None}]
+    assert repo.get_rows(dataset_id, offset=1, limit=5, columns=["s"])["rows"] == [{"s": None}]
+    assert "rows" not in repo.list_datasets()[0]
+
+
+def test_budget_evicts_least_recently_used():
+    one = frame(1000).memory_usage(index=False).sum()  # 16 KB of column data
+    repo = InMemoryRepository(max_bytes=int(one * 2.5))
+    a = save(repo, frame(1000))
+    b = save(repo, frame(1000))
+    repo.get_dataset(a)  # a becomes most recently used
+    c = save(repo, frame(1000))
+
+    assert repo.get_dataset(b) is None
+    assert repo.get_dataset(a) is not None and repo.get_dataset(c) is not None
+    usage = repo.memory_usage()
+    assert usage["datasets"] == 2
+    assert usage["bytes"] == 2 * one
+    assert usage["evictions"] == 1
+
+    with pytest.raises(DatasetTooLarge):
+        save(repo, frame(5000))
+    assert repo.memory_usage()["datasets"] == 2
+
+
+def test_pagination():
+    repo = InMemoryRepository()
+    ids = [repo.save_dataset(f"n{i}", {"rows": i}, []) for i in range(5)]
+    assert [d["id"] for d in repo.list_datasets(limit=2, offset=1, order="desc")] == [ids[3], ids[2]]
@@ -0,0 +1,152 @@
+import os
+import time
+
+import psycopg2
+import pytest
+
+from app import create_app
+from app.database import Database
+from app.services.metrics import Counter, Histogram, Metrics
+from app.services.profiler import SamplingProfiler
+
+
+def test_text_format():
+    requests = Counter("reqs_total", "Requests", ("route", "status"))
+    requests.inc("/a", 200)
+    requests.inc("/a", 200)
+    requests.inc('/b"', 500)
+    latency = Histogram("lat_seconds", "Latency", buckets=(0.1, 1))
+    latency.observe(value=0.05)
+    latency.observe(value=0.5)
+    latency.observe(value=3)
+
+    assert requests.render() == [
+        "# HELP reqs_total Requests",
+        "# TYPE reqs_total counter",
+        'reqs_total{route="/a",status="200"} 2',
+        'reqs_total{route="/b\\"",status="500"} 1',
+    ]
+    assert latency.render()[2:] == [
+        'lat_seconds_bucket{le="0.1"} 1',
+        'lat_seconds_bucket{le="1"} 2',
+        'lat_seconds_bucket{le="+Inf"} 3',
+        "lat_seconds_sum 3.55",
+        "lat_seconds_count 3",
+    ]
+    with pytest.raises(ValueError):
+        requests.inc("/a")
+
+
+class FakeDatabase:
+    def get_all_stocks(self):
+        return [{"ticker": "AAPL"}]
+
+    def pool_stats(self):
+        return {"in_use": 1, "idle": 4}
+
+
+def test_metrics_endpoint_records_requests(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@localhost/test")
+    app = create_app()
+    app.extensions["db"] = FakeDatabase()
+    client = app.test_client()
+
+    assert client.get("/api/stocks").status_code == 200
+    assert client.get("/api/nope").status_code == 404
+
+    r = client.get("/api/metrics")
+    assert r.status_code == 200
+    assert r.mimetype == "text/plain"
+    text = r.get_data(as_text=True)
+    assert 'feather_http_requests_total{method="GET",route="/api/stocks",status="200"} 1' in text
+    assert 'feather_http_requests_total{method="GET",route="unmatched",status="404"} 1' in text
+    assert 'feather_http_request_duration_seconds_count{method="GET",route="/api/stocks"} 1' in text
+    assert 'feather_http_response_size_bytes_count{route="/api/stocks"} 1' in text
+    assert 'feather_db_pool_connections{state="in_use"} 1' in text
+
+    monkeypatch.setenv("METRICS_ENABLED", "false")
+    assert create_app().test_client().get("/api/metrics").status_code == 404
+
+
+class Cursor:
+    description = [("ticker",)]
+
+    def execute(self, sql, params=None):
+        if "broken" in sql:
+            raise psycopg2.ProgrammingError("syntax error")
+
+    def fetchall(self):
+        return [("AAPL",), ("MSFT",)]
+
+    def fetchone(self):
+        return None
+
+
+class Connection:
+    def cursor(self, *args, **kwargs):
+        return Cursor()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_database_query_metrics(monkeypatch):
+    monkeypatch.setattr(psycopg2, "connect", lambda url: Connection())
+    metrics = Metrics()
+    db = Database(db_url="postgresql://u:p@localhost/test", metrics=metrics)
+
+    db.get_all_stocks()
+    db.get_latest_prediction("AAPL")
+    with pytest.raises(psycopg2.ProgrammingError):
+        db._fetch_all("SELECT broken", (), "get_all_stocks")
+
+    assert metrics.query_latency.count("get_all_stocks") == 1
+    assert metrics.query_errors.value("get_all_stocks") == 1
+    assert metrics.connection_acquire.count() == 3
+    text = metrics.render()
+    assert 'feather_db_query_rows_bucket{query="get_all_stocks",le="10"} 1' in text
+    assert 'feather_db_query_rows_sum{query="get_latest_prediction"} 0' in text
+
+
+def slow_handler():
+    time.sleep(0.05)
+
+
+def test_profiler_writes_slow_requests(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), interval=0.001, threshold=0.01)
+
+    token = profiler.begin()
+    slow_handler()
+    path = profiler.end(token, 0.05, "stocks.stock_history")
+    assert os.path.basename(path).endswith(".folded") and "stocks.stock_history" in path
+    lines = open(path).read().splitlines()
+    assert any("slow_handler (" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+    # fast requests leave nothing behind
+    token = profiler.begin()
+    assert profiler.end(token, 0.001, "fast") is None
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_profiler_prune_skips_files_removed_by_another_worker(tmp_path, monkeypatch):
+    profiler = SamplingProfiler(str(tmp_path), max_files=1)
+    for i, name in enumerate(["a", "b", "gone"]):
+        (tmp_path / f"{name}.folded").write_text("f 1\n")
+        os.utime(tmp_path / f"{name}.folded", (i, i))
+    getmtime = os.path.getmtime
+
+    def racing_getmtime(path):
+        if path.endswith("gone.folded"):
+            os.remove(path)
+        return getmtime(path)
+
+    monkeypatch.setattr(os.path, "getmtime", racing_getmtime)
+    profiler._prune()
+    assert os.listdir(tmp_path) == ["b.folded"]
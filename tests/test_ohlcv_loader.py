@@ -0,0 +1,233 @@
+import io
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import psycopg2
+import pytest
+
+from app import create_app
+from app.database import Database
+from app.services.ohlcv_loader import (
+    OHLCVLoadError,
+    load_ohlcv,
+    normalize_timestamps,
+    split_csv,
+    validate_frame,
+)
+
+HEADER = b"Date,Open,High,Low,Close,Volume\n"
+
+
+def ohlcv_csv(n, start=0):
+    lines = [
+        f"{1700000000 + 60 * i},{10 + i},{12 + i},{9 + i},{11 + i},{100 * i}\n"
+        for i in range(start, start + n)
+    ]
+    return HEADER + "".join(lines).encode()
+
+
+class CopyDatabase:
+    """Collects what load_ohlcv hands to Database.copy_stock_data."""
+
+    def __init__(self):
+        self.batches = []
+
+    def copy_stock_data(self, batches, on_batch=None):
+        inserted = 0
+        for text, rows, tickers in batches:
+            self.batches.append((text, rows, tickers))
+            inserted += rows
+            if on_batch is not None:
+                on_batch(inserted, 0)
+        return {"inserted": inserted, "skipped": 0}
+
+
+def test_split_keeps_lines_whole():
+    body = ohlcv_csv(50)
+    chunks = list(split_csv(io.BytesIO(body), chunk_bytes=100))
+    assert len(chunks) > 5
+    assert all(c.startswith(HEADER) and c.endswith(b"\n") for c in chunks)
+    assert b"".join(c[len(HEADER):] for c in chunks) == body[len(HEADER):]
+
+    with pytest.raises(OHLCVLoadError):
+        list(split_csv(io.BytesIO(b"")))
+
+
+def test_timestamps_are_normalized_to_utc():
+    expected = pd.Timestamp("2023-11-14 22:13:20", tz="UTC")
+    assert normalize_timestamps(pd.Series(["1700000000"]))[0] == expected
+    assert normalize_timestamps(pd.Series(["1700000000000"]))[0] == expected
+    assert normalize_timestamps(pd.Series(["2023-11-14T22:13:20"]))[0] == expected
+    assert normalize_timestamps(pd.Series(["2023-11-14T23:13:20+01:00"]))[0] == expected
+
+
+def test_validation_rejects_broken_bars():
+    df = pd.DataFrame({
+        "Ticker": ["aapl", "aapl", "aapl", "aapl", "aapl", "waytoolongticker"],
+        "timestamp": ["1700000000"] * 6,
+        "open": ["10", "10", "10", "10", "x", "10"],
+        "high": ["12", "9", "12", "12", "12", "12"],
+        "low": ["9", "9", "11", "9", "9", "9"],
+        "close": ["11", "11", "11", "11", "11", "11"],
+        "volume": ["5", "5", "5", "-1", "5", "5"],
+    })
+    valid, reasons, examples = validate_frame(df)
+    assert valid["ticker"].tolist() == ["AAPL"]
+    assert list(valid.columns) == ["ticker", "open", "high", "low", "close", "volume", "timestamp"]
+    assert reasons == {
+        "missing value": 1,
+        "invalid ticker": 1,
+        "high below open/close": 1,
+        "low above open/close": 1,
+        "negative volume": 1,
+    }
+    assert examples[0] == (1, "high below open/close")
+
+    columns = ["timestamp", "open", "high", "low", "close", "volume"]
+    with pytest.raises(OHLCVLoadError, match="ticker"):
+        validate_frame(pd.DataFrame({c: [] for c in columns}))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_load_reports_counts(workers):
+    body = ohlcv_csv(200) + b"1700099999,10,1,9,11,5\n"
+    db = CopyDatabase()
+    progress = []
+    report = load_ohlcv(
+        io.BytesIO(body), db, ticker="msft", workers=workers, chunk_bytes=1024,
+        on_chunk=progress.append,
+    )
+    assert report["rows"] == 201
+    assert report["inserted"] == 200
+    assert report["rejected"] == 1
+    assert report["rejections"] == {"high below open/close": 1}
+    assert report["examples"] == [{"row": 201, "reason": "high below open/close"}]
+    assert report["rows_per_sec"] > 0
+    assert progress[-1] == 201 and len(progress) == len(db.batches) > 1
+
+    # chunks are merged in file order
+    lines = "".join(text for text, _, _ in db.batches).splitlines()
+    assert lines[0].startswith("MSFT,10,12,9,11,0,2023-11-14 22:13:20")
+    assert lines[-1].startswith("MSFT,209,211,208,210,19900,")
+    assert {t for _, _, tickers in db.batches for t in tickers} == {"MSFT"}
+
+
+class CopyCursor:
+    def __init__(self, log):
+        self.log = log
+
+    def execute(self, sql, params=None):
+        self.log.append(" ".join(sql.split()))
+
+    def copy_expert(self, sql, file):
+        self.log.append(("COPY", file.read()))
+
+    def fetchall(self):
+        return [(1,), (2,)]
+
+
+class CopyConnection:
+    def __init__(self):
+        self.log = []
+
+    def cursor(self, *args, **kwargs):
+        return CopyCursor(self.log)
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+    def close(self):
+        pass
+
+
+def test_copy_stock_data_stages_and_merges(monkeypatch):
+    conn = CopyConnection()
+    monkeypatch.setattr(psycopg2, "connect", lambda url: conn)
+    db = Database(db_url="postgresql://u:p@localhost/test", notify=True)
+
+    result = db.copy_stock_data([("A,1,1,1,1,1,t\n" * 3, 3, ["A"]), ("", 0, [])])
+    assert result == {"inserted": 2, "skipped": 1}
+    assert conn.log[0].startswith("CREATE TEMP TABLE stock_data_staging")
+    assert conn.log[1] == ("COPY", "A,1,1,1,1,1,t\n" * 3)
+    assert conn.log[2].startswith("INSERT INTO stock_data")
+    assert "ON CONFLICT (ticker, timestamp) DO NOTHING" in conn.log[2]
+    assert conn.log[3].startswith("SELECT pg_notify")
+    assert conn.log[4:] == ["TRUNCATE stock_data_staging", "COMMIT"]
+
+    def stop(inserted, skipped):
+        raise RuntimeError("cancelled")
+
+    conn.log.clear()
+    with pytest.raises(RuntimeError):
+        db.copy_stock_data([("A,1,1,1,1,1,t\n", 1, ["A"])], on_batch=stop)
+    assert conn.log[-1] == "ROLLBACK"
+
+
+def test_upload_to_stock_data(monkeypatch, tmp_path):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@localhost/test")
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    app = create_app()
+    db = app.extensions["db"] = CopyDatabase()
+    client = app.test_client()
+
+    def post(body, query):
+        return client.post(
+            f"/api/upload/csv?{query}",
+            data={"file": (io.BytesIO(body), "aapl.csv")},
+            content_type="multipart/form-data",
+        )
+
+    r = post(ohlcv_csv(3), "target=stock_data&ticker=aapl")
+    assert r.status_code == 200
+    js = r.get_json()
+    assert js["inserted"] == 3 and js["ticker"] == "AAPL" and js["filename"] == "aapl.csv"
+    assert app.extensions["repo"].list_datasets() == []
+
+    # no ticker column and no ?ticker=
+    r = post(ohlcv_csv(3), "target=stock_data")
+    assert r.status_code == 400 and "ticker" in r.get_json()["error"]
+    assert post(ohlcv_csv(3), "target=stock_data&ticker=a;b").status_code == 400
+    assert len(db.batches) == 1
+
+
+CLI_WRAPPER = """
+import sys
+sys.path.insert(0, {root!r})
+
+import load_ohlcv
+
+
+class FakeDatabase:
+    def copy_stock_data(self, batches, on_batch=None):
+        rows = sum(n for _, n, _ in batches)
+        return {{"inserted": rows, "skipped": 0}}
+
+
+load_ohlcv.Database = FakeDatabase
+
+if __name__ == "__main__":
+    load_ohlcv.main()
+"""
+
+
+def test_cli_with_parser_processes(tmp_path):
+    # the spawned parser processes re-import the script as __mp_main__
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = tmp_path / "run_loader.py"
+    script.write_text(CLI_WRAPPER.format(root=root))
+    data = tmp_path / "prices.csv"
+    data.write_bytes(ohlcv_csv(3000))
+    assert data.stat().st_size > 4 * 20_000
+
+    out = subprocess.run(
+        [sys.executable, str(script), str(data), "--ticker", "AAPL",
+         "--workers", "2", "--chunk-mb", "0.02"],
+        capture_output=True, text=True, timeout=120,
+    )
+    assert out.returncode == 0, out.stderr
+    assert "[OK] 3000 rows" in out.stdout and "[SUCCESS] 1 files loaded" in out.stdout
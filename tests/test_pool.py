@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from app.services.pool import ConnectionPool, PoolTimeout
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        if self.conn.dead:
+            raise RuntimeError("server closed the connection unexpectedly")
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.dead = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def connect():
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    return ConnectionPool(connect, **kwargs), opened
+
+
+def test_reuses_connections():
+    pool, opened = make_pool(max_size=2)
+    for _ in range(5):
+        conn = pool.acquire()
+        pool.release(conn)
+    assert len(opened) == 1
+    stats = pool.stats()
+    assert stats["checkouts"] == 5
+    assert stats["idle"] == 1 and stats["in_use"] == 0
+
+
+def test_times_out_when_exhausted():
+    pool, _ = make_pool(max_size=1, timeout=0.05)
+    conn = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert pool.stats()["timeouts"] == 1
+    pool.release(conn)
+    assert pool.acquire() is conn
+
+
+def test_waiter_gets_released_connection():
+    pool, opened = make_pool(max_size=1, timeout=2)
+    conn = pool.acquire()
+    got = []
+    t = threading.Thread(target=lambda: got.append(pool.acquire()))
+    t.start()
+    pool.release(conn)
+    t.join(timeout=2)
+    assert got == [conn]
+    assert len(opened) == 1
+
+
+def test_broken_connections_are_recycled():
+    pool, opened = make_pool(max_size=2, check_interval=0)
+    conn = pool.acquire()
+    pool.release(conn, broken=True)
+    assert conn.closed
+
+    fresh = pool.acquire()
+    assert fresh is not conn
+    fresh.dead = True  # dies while idle, caught by the liveness check
+    pool.release(fresh)
+    third = pool.acquire()
+    assert third is not fresh
+    assert len(opened) == 3
+    stats = pool.stats()
+    assert stats["failed_checks"] == 1
+    assert stats["size"] == 1
+
+
+def test_fill_opens_min_size():
+    pool, opened = make_pool(min_size=3, max_size=5)
+    pool.fill()
+    assert len(opened) == 3
+    assert pool.stats()["idle"] == 3
+
+
+def test_first_checkout_warms_up_to_min_size():
+    pool, opened = make_pool(min_size=3, max_size=5)
+    conn = pool.acquire()
+    deadline = time.monotonic() + 5
+    while pool.stats()["idle"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(opened) == 3 and pool.stats()["idle"] == 2
+    pool.release(conn)
+    # later checkouts reuse the warm connections
+    assert pool.acquire() in opened and len(opened) == 3
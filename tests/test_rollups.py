@@ -0,0 +1,96 @@
+from datetime import datetime, timezone
+
+import psycopg2
+import psycopg2.extras
+
+from app.database import Database
+
+
+class RecordingCursor:
+    def __init__(self, executed):
+        self.executed = executed
+        self.rowcount = 0
+        self.description = [("ticker",), ("close",)]
+
+    def execute(self, sql, params=None):
+        self.executed.append((" ".join(sql.split()), params))
+
+    def fetchone(self):
+        return (1,)
+
+    def fetchall(self):
+        return []
+
+
+class FakeConnection:
+    def __init__(self):
+        self.executed = []
+
+    def cursor(self, *args, **kwargs):
+        return RecordingCursor(self.executed)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def make_db(monkeypatch, rollups=True):
+    conn = FakeConnection()
+    monkeypatch.setattr(psycopg2, "connect", lambda url: conn)
+    return Database(db_url="postgresql://u:p@localhost/test", rollups=rollups), conn
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_rollup_choice(monkeypatch):
+    db, _ = make_db(monkeypatch)
+    assert db._rollup_for(None, None, None) is None
+    assert db._rollup_for("5m", None, None) is None
+    assert db._rollup_for("1h", None, None) == "1h"
+    assert db._rollup_for("1d", utc(2025, 11, 1), utc(2025, 11, 18)) == "1d"
+    # 2025-11-17 is a Monday, so it is on a weekly boundary
+    assert db._rollup_for("1w", utc(2025, 11, 17), None) == "1w"
+    # an unaligned bound falls back to a finer rollup, then to raw rows
+    assert db._rollup_for("1w", utc(2025, 11, 18), None) == "1d"
+    assert db._rollup_for("1d", utc(2025, 11, 1, 13, 30), None) is None
+
+    db.rollups = False
+    assert db._rollup_for("1d", None, None) is None
+
+
+def test_history_reads_rollups(monkeypatch):
+    db, conn = make_db(monkeypatch)
+    db.get_stock_data("AAPL", limit=10, interval="1d")
+    db.get_stock_data_version("AAPL", limit=10, interval="1d")
+    db.get_stock_data("AAPL", limit=10, interval="5m")
+    sql = [s for s, _ in conn.executed]
+    assert "FROM stock_rollups" in sql[0] and conn.executed[0][1][3] == "1d"
+    assert "FROM stock_rollups" in sql[1]
+    assert "FROM stock_data" in sql[2]
+
+
+def test_inserts_update_rollups(monkeypatch):
+    def fake_execute_values(cur, sql, argslist, page_size=100, fetch=False):
+        return [(i,) for i, _ in enumerate(argslist)]
+
+    monkeypatch.setattr(psycopg2.extras, "execute_values", fake_execute_values)
+    db, conn = make_db(monkeypatch)
+    row = {"ticker": "AAPL", "open": 1, "high": 2, "low": 0.5, "close": 1.5,
+           "volume": 10, "timestamp": 0}
+    db.insert_stock_data(row)
+    db.insert_stock_data_bulk([row] * 5, page_size=2)
+
+    upserts = [p for s, p in conn.executed if s.startswith("INSERT INTO stock_rollups")]
+    assert upserts == [([1],), ([0, 1],), ([0, 1],), ([0],)]
+
+    conn.executed.clear()
+    db.rollups = False
+    db.insert_stock_data(row)
+    assert not any("stock_rollups" in s for s, _ in conn.executed)
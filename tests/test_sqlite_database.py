@@ -0,0 +1,191 @@
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import create_app
+from app.sqlite_database import SQLiteDatabase, UnsupportedOnSQLite, _statement
+
+T0 = datetime(2024, 1, 1, 9, 30, tzinfo=timezone.utc)
+
+
+def bars(ticker, n, start=T0, step=timedelta(minutes=30)):
+    return [
+        {"ticker": ticker, "open": 100 + i, "high": 101 + i, "low": 99 + i,
+         "close": 100.5 + i, "volume": 10, "timestamp": start + step * i}
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / "feather.db"))
+    db.insert_stocks_bulk([{"ticker": "AAPL", "name": "Apple", "sector": "Tech"},
+                           {"ticker": "MSFT", "name": "Microsoft"}])
+    yield db
+    db.close()
+
+
+def test_translates_psycopg2_sql():
+    sql, params = _statement(
+        "SELECT '[]'::json FROM t WHERE id = ANY(%s) AND name LIKE 'a%%' AND ts >= %s",
+        ([1, 2, 3], datetime(2024, 1, 1, 12, tzinfo=timezone(timedelta(hours=2)))),
+    )
+    assert sql == "SELECT '[]' FROM t WHERE id IN (?, ?, ?) AND name LIKE 'a%' AND ts >= ?"
+    assert params == [1, 2, 3, "2024-01-01 10:00:00"]
+    assert _statement("SELECT %s", ("2024-01-01T10:00:00Z",))[1] == ["2024-01-01 10:00:00"]
+
+
+def test_wal_and_pragmas(db):
+    conn = db._read_connection().raw
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA mmap_size").fetchone()[0] == 256 * 1024 * 1024
+    assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+    with db.get_connection() as writer:
+        assert writer.raw.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_history_round_trip(db):
+    result = db.insert_stock_data_bulk(bars("AAPL", 60), page_size=25)
+    assert len(result["inserted_ids"]) == 60 and result["skipped"] == 0
+    assert db.insert_stock_data(bars("AAPL", 1)[0]) is None
+
+    latest = db.get_stock_data("AAPL", limit=2)
+    assert latest.column("timestamp") == [T0 + timedelta(minutes=30 * 59),
+                                          T0 + timedelta(minutes=30 * 58)]
+    assert latest[0]["close"] == 159.5 and latest[0]["volume"] == 10
+
+    window = db.get_stock_data("AAPL", limit=100, start=T0 + timedelta(hours=1),
+                               end=T0 + timedelta(hours=2))
+    assert len(window) == 2
+
+    days = list(db.get_stock_data("AAPL", limit=5, interval="1d"))
+    assert [d["timestamp"].day for d in days] == [2, 1]
+    # 09:30..23:30 on the first day: first open, last close, summed volume
+    assert days[1] == {"ticker": "AAPL", "timestamp": datetime(2024, 1, 1, tzinfo=timezone.utc),
+                       "open": 100.0, "high": 129.0, "low": 99.0, "close": 128.5,
+                       "volume": 290}
+
+    version = db.get_stock_data_version("AAPL", limit=5)
+    assert version["rows"] == 5 and version["max_id"] == 60
+    assert version["max_timestamp"] == T0 + timedelta(minutes=30 * 59)
+    assert version["last_modified"].tzinfo is timezone.utc
+
+
+def test_dashboard_news_and_predictions(db):
+    db.insert_stock_data_bulk(bars("AAPL", 60))
+    db.insert_prediction({"ticker": "AAPL", "predicted_trend": "up", "confidence": 0.8,
+                          "model_version": "v1"})
+    db.insert_news_articles_bulk(
+        {"ticker": "AAPL", "headline": f"h{i}", "url": f"u{i}"} for i in range(4)
+    )
+    user_ids = db.insert_users_bulk([{"username": "a", "email": "a@x", "password_hash": "x"}])
+    assert db.insert_users_bulk(
+        [{"username": "a", "email": "a@x", "password_hash": "x"}]
+    )["inserted_ids"] == user_ids["inserted_ids"]
+    user = user_ids["inserted_ids"][0]
+    db.add_to_watchlist_bulk([{"user_id": user, "ticker": "AAPL"},
+                              {"user_id": user, "ticker": "MSFT"}])
+
+    assert db.get_latest_prediction("AAPL")["predicted_trend"] == "up"
+    assert [n["headline"] for n in db.get_recent_news("AAPL", limit=2)] == ["h3", "h2"]
+
+    rows = {r["ticker"]: r for r in db.get_user_dashboard(user, news_limit=2)}
+    aapl, msft = rows["AAPL"], rows["MSFT"]
+    assert aapl["close"] == 159.5 and aapl["prev_close"] == 128.5
+    assert aapl["change"] == 31.0 and aapl["change_pct"] == 24.12
+    assert aapl["prediction"]["model_version"] == "v1"
+    assert [n["headline"] for n in aapl["news"]] == ["h3", "h2"]
+    assert msft["close"] is None and msft["prediction"] is None and msft["news"] == []
+
+
+def test_batch_export_and_copy(db):
+    db.insert_stock_data_bulk(bars("AAPL", 30))
+    batch = db.get_stock_data_batch(["MSFT", "AAPL", "MSFT"], limit=3)
+    assert list(batch) == ["MSFT", "AAPL"]
+    assert len(batch["MSFT"]) == 0 and len(batch["AAPL"]) == 3
+
+    exported = list(db.iter_stock_data("AAPL", batch_size=7))
+    assert [len(b) for b in exported] == [7, 7, 7, 7, 2]
+    assert exported[0][0] == ("AAPL", T0, 100.0, 101.0, 99.0, 100.5, 10)
+
+    text = (
+        "MSFT,1.5,2,1,1.5,100,2024-01-01 00:00:00+00:00\n"
+        "MSFT,1.5,2,1,1.5,100,2024-01-01 00:00:00+00:00\n"
+        "MSFT,1.5,2,1,1.75,100,2024-01-01 00:01:00+00:00\n"
+    )
+    progress = []
+    result = db.copy_stock_data([(text, 3, ["MSFT"])],
+                                on_batch=lambda i, s: progress.append((i, s)))
+    assert result == {"inserted": 2, "skipped": 1} and progress == [(2, 1)]
+    assert db.get_stock_data("MSFT", limit=1)[0]["close"] == 1.75
+
+
+def test_failed_write_rolls_back(db):
+    with pytest.raises(RuntimeError):
+        with db.get_connection() as conn:
+            conn.cursor().execute("DELETE FROM stocks")
+            raise RuntimeError("boom")
+    assert len(db.get_all_stocks()) == 2
+
+
+def test_rollups_need_postgres(db):
+    with pytest.raises(UnsupportedOnSQLite, match="DB_BACKEND=postgres"):
+        db.rebuild_rollups()
+
+
+def test_foreign_keys_are_enforced(db):
+    with pytest.raises(sqlite3.IntegrityError):
+        db.insert_stock_data(bars("NVDA", 1)[0])
+    with pytest.raises(sqlite3.IntegrityError):
+        db.add_to_watchlist(42, "AAPL")
+    assert len(db.get_stock_data("NVDA")) == 0
+
+
+def test_readers_per_thread_and_serialized_writer(db):
+    errors = []
+
+    def writer(ticker):
+        try:
+            for chunk in range(5):
+                db.insert_stock_data_bulk(bars(ticker, 20, start=T0 + timedelta(days=chunk)))
+        except Exception as e:
+            errors.append(e)
+
+    def reader():
+        try:
+            for _ in range(50):
+                db.get_stock_data("AAPL", limit=10)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(t,)) for t in ("AAPL", "MSFT")]
+    threads += [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(db.get_stock_data("MSFT", limit=1000)) == 100
+    stats = db.pool_stats()
+    assert stats["backend"] == "sqlite" and stats["in_use"] == 0
+    assert stats["checkouts"] >= 11
+
+
+def test_app_runs_on_sqlite(tmp_path, monkeypatch):
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setenv("DB_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "app.db"))
+    app = create_app()
+    db = app.extensions["db"]
+    db.insert_stocks_bulk([{"ticker": "AAPL", "name": "Apple"}])
+    db.insert_stock_data_bulk(bars("AAPL", 3))
+    client = app.test_client()
+
+    resp = client.get("/api/stocks/AAPL/history?limit=2")
+    assert resp.status_code == 200
+    assert [r["timestamp"] for r in resp.get_json()] == [
+        "2024-01-01T10:30:00+00:00", "2024-01-01T10:00:00+00:00"
+    ]
+    assert client.get("/api/stocks/stream?tickers=AAPL").status_code == 503
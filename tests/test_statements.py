@@ -0,0 +1,100 @@
+import psycopg2
+import psycopg2.errors
+
+from app.database import Database
+from app.services.statements import StatementRegistry, to_positional
+
+
+class Cursor:
+    description = [("id",)]
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        sql = " ".join(sql.split())
+        self.conn.executed.append((sql, params))
+        if sql.startswith("EXECUTE") and self.conn.lose_statements:
+            self.conn.lose_statements = False
+            raise psycopg2.errors.InvalidSqlStatementName("prepared statement does not exist")
+
+    def fetchall(self):
+        return [(1,)]
+
+    def fetchone(self):
+        return {"id": 1}
+
+
+class Connection:
+    def __init__(self):
+        self.executed = []
+        self.lose_statements = False
+
+    def cursor(self, *args, **kwargs):
+        return Cursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self.executed.append(("ROLLBACK", None))
+
+    def close(self):
+        pass
+
+
+def make_db(monkeypatch, **kwargs):
+    conn = Connection()
+    monkeypatch.setattr(psycopg2, "connect", lambda url: conn)
+    db = Database(db_url="postgresql://u:p@localhost/test", pooled=True, **kwargs)
+    return db, conn
+
+
+def test_to_positional():
+    assert to_positional("a = %s AND b LIKE 'x%%' LIMIT %s") == ("a = $1 AND b LIKE 'x%' LIMIT $2", 2)
+    assert to_positional("SELECT 1") == ("SELECT 1", 0)
+
+
+def test_hot_queries_are_prepared_once_per_connection(monkeypatch):
+    db, conn = make_db(monkeypatch, prepare_statements=True)
+    db.get_stock_data("AAPL", limit=10)
+    db.get_stock_data("MSFT", limit=20)
+    db.get_all_stocks()  # not a hot query
+
+    statements = [sql for sql, _ in conn.executed]
+    assert statements[0].startswith("PREPARE feather_") and " AS SELECT " in statements[0]
+    assert "$2" in statements[0] and "%s" not in statements[0]
+    name = statements[0].split()[1]
+    assert conn.executed[1] == (f"EXECUTE {name} (%s, %s)", ("AAPL", 10))
+    assert conn.executed[2] == (f"EXECUTE {name} (%s, %s)", ("MSFT", 20))
+    assert statements[3] == "SELECT * FROM stocks ORDER BY ticker"
+
+    stats = db.query_stats()
+    assert stats["prepare"] is True and stats["statements"] == 1
+    assert stats["queries"]["get_stock_data"]["calls"] == 2
+    assert stats["queries"]["get_stock_data"]["prepared_calls"] == 2
+    assert stats["queries"]["get_all_stocks"]["prepared_calls"] == 0
+
+
+def test_lost_statement_is_prepared_again(monkeypatch):
+    db, conn = make_db(monkeypatch, prepare_statements=True)
+    db.get_latest_prediction("AAPL")
+    conn.executed.clear()
+    conn.lose_statements = True
+    assert db.get_latest_prediction("AAPL") == {"id": 1}
+    assert [sql.split()[0] for sql, _ in conn.executed] == ["EXECUTE", "ROLLBACK", "PREPARE", "EXECUTE"]
+
+
+def test_disabled_by_default(monkeypatch):
+    db, conn = make_db(monkeypatch)
+    db.get_recent_news("AAPL", limit=3)
+    assert not any(sql.startswith(("PREPARE", "EXECUTE")) for sql, _ in conn.executed)
+    assert db.query_stats()["queries"]["get_recent_news"]["calls"] == 1
+
+
+def test_registry_caps_statements():
+    registry = StatementRegistry(prepare=True, hot=["q"], max_statements=1)
+    assert registry.statement("q", "SELECT %s") is not None
+    assert registry.statement("q", "SELECT %s") == registry.statement("q", "SELECT %s")
+    assert registry.statement("q", "SELECT 2") is None
+    assert registry.statement("other", "SELECT %s") is None
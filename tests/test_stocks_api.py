@@ -0,0 +1,214 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app import create_app
+from app.api.pagination import encode_cursor
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.history_calls = 0
+        self.version = {"rows": 2, "max_id": 7, "max_timestamp": 2,
+                        "last_modified": datetime(2025, 11, 18, 20, 0, 0)}
+
+        self.rows = None
+        self.last_query = None
+
+    def get_stock_data_version(self, ticker, limit=30, start=None, end=None, interval=None):
+        return self.version
+
+    def get_stock_data(self, ticker, limit=30, start=None, end=None, interval=None):
+        self.history_calls += 1
+        self.last_query = dict(limit=limit, start=start, end=end, interval=interval)
+        if self.rows is not None:
+            return self.rows[:limit]
+        return [{"ticker": ticker, "close": 1.0}]
+
+    def get_latest_prediction_version(self, ticker):
+        return None
+
+    def get_recent_news_version(self, ticker, limit=5, before=None):
+        return self.version
+
+    def get_recent_news(self, ticker, limit=5, before=None):
+        self.last_query = dict(limit=limit, before=before)
+        news = [{"id": i, "published_at": datetime(2025, 11, i)} for i in range(10, 0, -1)]
+        if before is not None:
+            news = [n for n in news if n["id"] < before[1]]
+        return news[:limit]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@localhost/test")
+    app = create_app()
+    app.extensions["db"] = FakeDatabase()
+    return app.test_client()
+
+
+def test_history_etag_roundtrip(client):
+    db = client.application.extensions["db"]
+    r = client.get("/api/stocks/aapl/history?limit=2")
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+    assert r.headers["Last-Modified"] == "Tue, 18 Nov 2025 20:00:00 GMT"
+    assert "max-age=" in r.headers["Cache-Control"]
+
+    r = client.get("/api/stocks/aapl/history?limit=2", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.data == b""
+    assert db.history_calls == 1
+
+    # a different limit is a different representation
+    r = client.get("/api/stocks/aapl/history?limit=3", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+
+    db.version = {**db.version, "max_id": 8}
+    r = client.get("/api/stocks/aapl/history?limit=2", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+
+
+def test_if_modified_since(client):
+    r = client.get(
+        "/api/stocks/aapl/history",
+        headers={"If-Modified-Since": "Tue, 18 Nov 2025 20:00:00 GMT"},
+    )
+    assert r.status_code == 304
+
+
+def test_missing_prediction_is_404(client):
+    r = client.get("/api/stocks/aapl/prediction")
+    assert r.status_code == 404
+
+
+def test_batch_history(client):
+    db = client.application.extensions["db"]
+    db.get_stock_data_batch = lambda tickers, limit=30: {t: [] for t in tickers}
+
+    r = client.get("/api/stocks/history?tickers=aapl,MSFT,aapl&limit=5")
+    assert r.status_code == 200
+    assert list(r.get_json()) == ["AAPL", "MSFT"]
+
+    assert client.get("/api/stocks/history").status_code == 400
+    many = ",".join(f"T{i}" for i in range(51))
+    assert client.get(f"/api/stocks/history?tickers={many}").status_code == 400
+
+
+def test_history_range_and_interval(client):
+    db = client.application.extensions["db"]
+    r = client.get("/api/stocks/aapl/history?from=2025-11-01&to=1763424000&interval=1h")
+    assert r.status_code == 200
+    q = db.last_query
+    assert q["start"].isoformat() == "2025-11-01T00:00:00+00:00"
+    assert q["end"].isoformat() == "2025-11-18T00:00:00+00:00"
+    assert q["interval"] == "1h"
+
+    assert client.get("/api/stocks/aapl/history?interval=2h").status_code == 400
+    assert client.get("/api/stocks/aapl/history?from=yesterday").status_code == 400
+
+
+def test_history_max_points(client):
+    db = client.application.extensions["db"]
+    # newest first, like the database returns it
+    db.rows = [{"timestamp": 1000 - i, "close": float((i * 7) % 13)} for i in range(1000)]
+    r = client.get("/api/stocks/aapl/history?max_points=50")
+    assert r.status_code == 200
+    rows = r.get_json()
+    assert len(rows) == 50
+    assert rows[0]["timestamp"] == 1000 and rows[-1]["timestamp"] == 1
+    assert db.last_query["limit"] == client.application.config["MAX_DOWNSAMPLE_ROWS"]
+    assert db.last_query["interval"] is None
+    assert "X-Truncated" not in r.headers
+
+    assert client.get("/api/stocks/aapl/history?max_points=2").status_code == 400
+
+
+def test_history_max_points_truncation_is_flagged(client):
+    db = client.application.extensions["db"]
+    db.rows = [{"timestamp": 1000 - i, "close": float(i)} for i in range(1000)]
+    r = client.get("/api/stocks/aapl/history?max_points=50&limit=400")
+    assert len(r.get_json()) == 50
+    assert r.headers["X-Truncated"] == "true"
+
+
+@pytest.mark.parametrize("query, interval", [
+    ("from=2024-11-18&to=2025-11-18&max_points=100", "1d"),
+    ("from=2025-11-01&to=2025-11-18&max_points=500", "5m"),
+    ("from=2025-11-17&to=2025-11-18&max_points=100", None),
+    ("from=2024-11-18&to=2025-11-18&max_points=100&interval=1h", "1h"),
+    ("from=2024-11-18&to=2025-11-18", None),
+])
+def test_history_max_points_resamples_long_ranges_in_sql(client, query, interval):
+    db = client.application.extensions["db"]
+    assert client.get(f"/api/stocks/aapl/history?{query}").status_code == 200
+    assert db.last_query["interval"] == interval
+
+
+def test_history_cursor(client):
+    db = client.application.extensions["db"]
+    db.rows = [{"timestamp": datetime(2025, 11, 18, 20, i), "close": 1.0} for i in range(5)][::-1]
+    r = client.get("/api/stocks/aapl/history?limit=2")
+    cursor = r.headers["X-Next-Cursor"]
+    assert 'rel="next"' in r.headers["Link"] and "cursor=" in r.headers["Link"]
+
+    client.get(f"/api/stocks/aapl/history?limit=2&cursor={cursor}")
+    assert db.last_query["end"] == datetime(2025, 11, 18, 20, 3, tzinfo=timezone.utc)
+
+    # a naive cursor timestamp is UTC, so it can be combined with ?to=
+    client.get(f"/api/stocks/aapl/history?to=2025-11-18T20:02:00Z&cursor={cursor}")
+    assert db.last_query["end"] == datetime(2025, 11, 18, 20, 2, tzinfo=timezone.utc)
+
+    # a cursor is bound to its listing and ticker
+    assert client.get(f"/api/stocks/msft/history?cursor={cursor}").status_code == 400
+    assert client.get(f"/api/stocks/aapl/news?cursor={cursor}").status_code == 400
+    assert client.get("/api/stocks/aapl/history?cursor=garbage").status_code == 400
+
+
+@pytest.mark.parametrize(
+    "path, kind, values",
+    [
+        ("history", "history", []),
+        ("history", "history", ["abc"]),
+        ("history?to=2025-11-18", "history", ["abc"]),
+        ("history", "history", [1, 2]),
+        ("news", "news", [1]),
+        ("news", "news", ["abc", 1]),
+        ("news", "news", [None, "1"]),
+        ("news", "news", [None, True]),
+    ],
+)
+def test_malformed_cursor_is_400(client, path, kind, values):
+    cursor = encode_cursor(kind, "AAPL", values)
+    sep = "&" if "?" in path else "?"
+    r = client.get(f"/api/stocks/aapl/{path}{sep}cursor={cursor}")
+    assert r.status_code == 400
+    assert "cursor" in r.get_json()["error"]
+
+
+def test_news_pages(client):
+    db = client.application.extensions["db"]
+    seen = []
+    url = "/api/stocks/aapl/news?limit=4"
+    while True:
+        r = client.get(url)
+        seen += [n["id"] for n in r.get_json()]
+        if "X-Next-Cursor" not in r.headers:
+            break
+        url = f"/api/stocks/aapl/news?limit=4&cursor={r.headers['X-Next-Cursor']}"
+    assert seen == list(range(10, 0, -1))
+    assert db.last_query["before"][1] == 3
+
+    assert client.get("/api/stocks/aapl/news?limit=100000").status_code == 400
+
+
+def test_overview(client):
+    db = client.application.extensions["db"]
+    db.get_latest_prediction = lambda ticker: {"ticker": ticker, "predicted_trend": "up"}
+    r = client.get("/api/stocks/aapl/overview?limit=3&news_limit=2")
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["ticker"] == "AAPL"
+    assert body["prediction"]["predicted_trend"] == "up"
+    assert len(body["news"]) == 2
+    assert db.last_query == {"limit": 2, "before": None}
@@ -0,0 +1,188 @@
+import io
+import os
+import threading
+import time
+
+import pytest
+
+from app import create_app
+from app.services.jobs import FINISHED, JobManager, QueueFull
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@localhost/test")
+    monkeypatch.setenv("PERSIST_MODE", "files")
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("UPLOAD_CHUNK_ROWS", "2")
+    return create_app()
+
+
+def upload(client, body, name="prices.csv"):
+    return client.post(
+        "/api/upload/csv",
+        data={"file": (io.BytesIO(body), name)},
+        content_type="multipart/form-data",
+    )
+
+
+def test_upload_streams_in_chunks(app):
+    body = b"open,close,volume\n" + b"".join(
+        f"{i},{i + 1},{i * 10}\n".encode() for i in range(7)
+    )
+    r = upload(app.test_client(), body)
+    assert r.status_code == 200
+    js = r.get_json()
+    assert js["summary"]["rows"] == 7
+    assert js["summary"]["columns"] == ["open", "close", "volume"]
+    assert len(js["summary"]["preview"]) == 5
+
+    ds = app.extensions["repo"].get_dataset(js["dataset_id"])
+    assert [row["open"] for row in ds["rows"]] == list(range(7))
+    assert ds["meta"]["filename"] == "prices.csv"
+
+
+def test_bad_csv_leaves_nothing_behind(app, tmp_path):
+    r = upload(app.test_client(), b"a,b\n1,2\n3,4\n5,6\n7,8,9,10\n")
+    assert r.status_code == 400
+    assert "Failed to parse CSV" in r.get_json()["error"]
+    assert app.extensions["repo"].list_datasets() == []
+    assert [p for p in os.listdir(tmp_path) if not p.startswith("catalog.sqlite3")] == []
+
+
+def wait_for(client, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/api/upload/jobs/{job_id}").get_json()
+        if job["state"] in FINISHED or time.monotonic() > deadline:
+            return job
+        time.sleep(0.01)
+
+
+def test_async_upload_job(app):
+    client = app.test_client()
+    body = b"open,close\n" + b"".join(f"{i},{i + 1}\n".encode() for i in range(5))
+    r = client.post(
+        "/api/upload/csv?mode=async",
+        data={"file": (io.BytesIO(body), "prices.csv")},
+        content_type="multipart/form-data",
+    )
+    assert r.status_code == 202
+    job = r.get_json()
+    assert r.headers["Location"] == f"/api/upload/jobs/{job['job_id']}"
+    assert job["bytes_total"] == len(body)
+
+    job = wait_for(client, job["job_id"])
+    assert job["state"] == "succeeded"
+    assert job["rows_processed"] == 5 and job["progress"] == 1.0
+    ds = app.extensions["repo"].get_dataset(job["dataset_id"])
+    assert [row["open"] for row in ds["rows"]] == list(range(5))
+    # the spooled upload is removed once the job is done
+    assert os.listdir(app.extensions["jobs"].directory) == [f"{job['job_id']}.json"]
+
+    assert client.delete(f"/api/upload/jobs/{job['job_id']}").status_code == 409
+    assert client.get("/api/upload/jobs/job_unknown").status_code == 404
+
+
+def test_async_upload_failure_is_reported(app):
+    client = app.test_client()
+    r = client.post(
+        "/api/upload/csv?mode=async",
+        data={"file": (io.BytesIO(b"a,b\n1,2\n3,4\n5,6\n7,8,9,10\n"), "bad.csv")},
+        content_type="multipart/form-data",
+    )
+    job = wait_for(client, r.get_json()["job_id"])
+    assert job["state"] == "failed" and job["error"]
+    assert app.extensions["repo"].list_datasets() == []
+
+
+def test_cancel_and_queue_depth(tmp_path):
+    started, release = threading.Event(), threading.Event()
+    manager = JobManager(str(tmp_path), workers=1, max_pending=2)
+
+    def slow_task(f, on_chunk):
+        started.set()
+        release.wait(5)
+        on_chunk(1)
+        return "ds", {"rows": 1}
+
+    running = manager.submit(io.BytesIO(b"x"), "a.csv", slow_task)
+    queued = manager.submit(io.BytesIO(b"y"), "b.csv", slow_task)
+    with pytest.raises(QueueFull):
+        manager.submit(io.BytesIO(b"z"), "c.csv", slow_task)
+
+    assert started.wait(5)
+    # queued here: cancelled right away; running: stops at its next chunk
+    assert manager.cancel(queued["job_id"])["state"] == "cancelled"
+    assert manager.cancel(running["job_id"])["state"] == "running"
+    release.set()
+    manager.shutdown()
+    assert manager.get(running["job_id"])["state"] == "cancelled"
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [f"{running['job_id']}.json", f"{queued['job_id']}.json"]
+    )
+
+
+class BlockingSource(io.RawIOBase):
+    """A request body that stalls until released, like a slow 1 GB upload."""
+
+    def __init__(self, reading, release, fail=False):
+        self.reading, self.release, self.fail = reading, release, fail
+        self.sent = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        self.reading.set()
+        assert self.release.wait(5)
+        if self.fail:
+            raise OSError("client went away")
+        if self.sent:
+            return 0
+        self.sent = True
+        buf[:1] = b"x"
+        return 1
+
+
+def test_queue_depth_counts_uploads_being_spooled(tmp_path):
+    manager = JobManager(str(tmp_path), workers=1, max_pending=1)
+    reading, release = threading.Event(), threading.Event()
+    result = {}
+
+    def upload(source):
+        try:
+            result["job"] = manager.submit(source, "big.csv", lambda f, on_chunk: ("ds", {}))
+        except OSError as e:
+            result["error"] = e
+
+    t = threading.Thread(target=upload, args=(BlockingSource(reading, release, fail=True),))
+    t.start()
+    assert reading.wait(5)
+    with pytest.raises(QueueFull):
+        manager.submit(io.BytesIO(b"y"), "b.csv", lambda f, on_chunk: ("ds", {}))
+    release.set()
+    t.join()
+    # a failed spool gives its slot back and leaves no files
+    assert isinstance(result["error"], OSError) and os.listdir(tmp_path) == []
+    job = manager.submit(io.BytesIO(b"y"), "b.csv", lambda f, on_chunk: ("ds", {"rows": 0}))
+    manager.shutdown()
+    assert manager.get(job["job_id"])["state"] == "succeeded"
+
+
+def test_finished_job_files_expire(tmp_path):
+    manager = JobManager(str(tmp_path), workers=1, ttl=60)
+    old = manager.submit(io.BytesIO(b"x"), "a.csv", lambda f, on_chunk: ("ds", {}))
+    manager.shutdown()
+    stale = time.time() - 120
+    os.utime(tmp_path / f"{old['job_id']}.json", (stale, stale))
+    # a queued job whose status file is just as old is kept
+    queued = dict(old, job_id="job_" + "0" * 32, state="queued")
+    manager._save(queued)
+    os.utime(tmp_path / f"{queued['job_id']}.json", (stale, stale))
+
+    new = manager.submit(io.BytesIO(b"y"), "b.csv", lambda f, on_chunk: ("ds", {}))
+    manager.shutdown()
+    assert manager.get(old["job_id"]) is None
+    assert manager.get(new["job_id"])["state"] == "succeeded"
+    assert manager.get(queued["job_id"])["state"] == "queued"
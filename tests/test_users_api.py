@@ -0,0 +1,67 @@
+import psycopg2
+
+from app import create_app
+from app.database import Database
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.calls = []
+
+    def get_user_dashboard(self, user_id, news_limit=3):
+        self.calls.append((user_id, news_limit))
+        return [{"ticker": "AAPL", "close": 190.5, "change_pct": 1.25,
+                 "prediction": None, "news": []}]
+
+
+def make_client(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", "postgresql://u:p@localhost/test")
+    app = create_app()
+    app.extensions["db"] = FakeDatabase()
+    return app.test_client()
+
+
+def test_dashboard(monkeypatch):
+    client = make_client(monkeypatch)
+    r = client.get("/api/users/7/dashboard?news_limit=5")
+    assert r.status_code == 200
+    assert r.get_json() == {
+        "user_id": 7,
+        "watchlist": [{"ticker": "AAPL", "close": 190.5, "change_pct": 1.25,
+                       "prediction": None, "news": []}],
+    }
+    assert client.application.extensions["db"].calls == [(7, 5)]
+
+    assert client.get("/api/users/7/dashboard?news_limit=50").status_code == 400
+    assert client.get("/api/users/abc/dashboard").status_code == 404
+
+
+def test_dashboard_is_one_statement(monkeypatch):
+    executed = []
+
+    class Cursor:
+        description = [("ticker",)]
+
+        def execute(self, sql, params=None):
+            executed.append((sql, params))
+
+        def fetchall(self):
+            return [("AAPL",)]
+
+    class Connection:
+        def cursor(self, *args, **kwargs):
+            return Cursor()
+
+        def commit(self):
+            pass
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(psycopg2, "connect", lambda url: Connection())
+    db = Database(db_url="postgresql://u:p@localhost/test")
+    assert db.get_user_dashboard(7, news_limit=2) == [{"ticker": "AAPL"}]
+    assert len(executed) == 1
+    sql, params = executed[0]
+    assert sql.count("LEFT JOIN LATERAL") == 4
+    assert params == (2, 7)